@@ -0,0 +1,808 @@
+import argparse
+import asyncio
+import hashlib
+import multiprocessing
+import os
+import re
+import signal
+import socket
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime
+from http import HTTPStatus
+from typing import List, Dict, Any, Optional, Tuple, Iterator
+from urllib.parse import urlsplit, parse_qs
+
+import config
+import serialization
+from app import SimpleRestaurantChatbot
+from change_feed import ChangeFeed
+from chat_session_store import ChatSessionStore
+from dish_validation import DishPreorderValidator
+from menu_schedule import ScheduledMenuService
+from replication import ReplicationLeader, ReservationReplica
+from reservation_parser import is_booking_request
+from reservation_service import ReservationService, covers_by_slot, validate_reservation
+from reservation_snapshot import ReservationSnapshot
+from tenants import TenantRegistry
+
+# File locking keeps several worker processes from overwriting each other's
+# changes; without it (e.g. on Windows) only one worker can be used
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+MAX_BODY_BYTES = 1024 * 1024
+KEEPALIVE_TIMEOUT = 15
+MAX_REQUESTS_PER_CONNECTION = 1000
+MENU_CACHE_SIZE = 256  # Menu responses kept per worker (most recently used)
+MAX_IDEMPOTENCY_KEY_LENGTH = 255
+
+# Fields clients may set on a booking; status changes go through DELETE
+BOOKING_FIELDS = ("customer_name", "contact_info", "date", "time", "party_size", "dish_ids")
+
+# Requests for one location: /t/<tenant ID>/<any other route>
+TENANT_PATH = re.compile(r"^/t/(?P<tenant_id>[^/]+)(?P<path>/.*)$")
+
+# Response: (status, extra headers, JSON-encoded body)
+Response = Tuple[int, Dict[str, str], bytes]
+
+
+class ApiError(Exception):
+    """An error returned to the client as a JSON error response."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class SharedReservationStore:
+    """ReservationService backed by a file that several processes share.
+
+    Every worker keeps its own in-memory ReservationService. Writes take an
+    exclusive lock on ``<store>.lock`` (and a thread lock, as requests run on
+    a thread pool), reload the file first if another process changed it, and
+    save before releasing the lock. Reads reload the file (under the lock)
+    only when its modification stamp has changed.
+
+    Each save also rewrites a memory-mapped snapshot (``<store>.snap``), so
+    lookups by ID or date after another worker's write read just the records
+    they need from the snapshot instead of reloading the whole file.
+    Idempotency keys are saved to ``<store>.keys`` under the same lock, so a
+    retried booking is recognized whichever worker it reaches.
+    """
+
+    def __init__(self, path: str, menu_service: ScheduledMenuService, archive_dir: Optional[str] = None,
+                 change_feed: Optional[ChangeFeed] = None):
+        self.path = path
+        self.menu_service = menu_service
+        self.archive_dir = archive_dir
+        self.change_feed = change_feed
+        self.snapshot_path = f"{path}.snap"
+        self.idempotency_path = f"{path}.keys"
+        self._snapshot: Optional[ReservationSnapshot] = None
+        self._thread_lock = threading.RLock()
+        self._lock_file = open(f"{path}.lock", 'a') if fcntl is not None else None
+        # Requests using the store; one closed while in use (e.g. an evicted
+        # location) is only released when the last of them finishes
+        self._users = 0
+        self._closing = False
+        self._users_lock = threading.Lock()
+        with self._locked():
+            self._open()
+
+    def _stamp(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def _open(self) -> None:
+        """(Re)load the reservation service from the shared file."""
+        if self.change_feed is not None and getattr(self, "service", None) is not None:
+            self.change_feed.detach(self.service)
+        self.dish_validator = DishPreorderValidator(self.menu_service)
+        self.service = ReservationService(self.path, archive_dir=self.archive_dir, dish_validator=self.dish_validator,
+                                          snapshot_path=self.snapshot_path, thread_safe=True,
+                                          idempotency_path=self.idempotency_path, archive_on_load=False)
+        if self.change_feed is not None:
+            self.change_feed.attach(self.service)
+        # Archive once the feed is attached, so replicas drop these too
+        self.service.archive_reservations()
+        self._loaded_stamp = self._stamp()
+        if self._loaded_stamp is not None and not self._snapshot_current():
+            self.service.write_snapshot(self.snapshot_path)
+
+    def _snapshot_current(self) -> bool:
+        """Check that the snapshot was written after the store file last changed."""
+        try:
+            return os.stat(self.snapshot_path).st_mtime_ns >= os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return False
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        # flock doesn't exclude other threads sharing the file, so take both
+        with self._thread_lock:
+            if self._lock_file is None:
+                yield
+                return
+            fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_UN)
+
+    def read(self) -> ReservationService:
+        """Get the service for reading, reloading it if another process saved changes."""
+        if self._stamp() != self._loaded_stamp:
+            with self._locked():
+                if self._stamp() != self._loaded_stamp:
+                    self._open()
+        return self.service
+
+    def read_snapshot(self, date: Optional[str] = None) -> Optional[ReservationSnapshot]:
+        """Get the memory-mapped snapshot for lookups, or None to use read() instead.
+
+        None is returned when the snapshot is older than the store file
+        (another kind of process saved it) or, with an archive, for past
+        dates, whose reservations only the service can find.
+        """
+        if date is not None and self.archive_dir and date < datetime.now().strftime("%Y-%m-%d"):
+            return None
+        if not self._snapshot_current():
+            return None
+        snapshot = self._snapshot
+        if snapshot is None or snapshot.is_stale():
+            # Map the new file rather than refreshing in place, as other
+            # threads may still be reading the old mapping
+            try:
+                snapshot = self._snapshot = ReservationSnapshot(self.snapshot_path)
+            except (OSError, ValueError):
+                return None
+        return snapshot
+
+    @contextmanager
+    def write(self) -> Iterator[ReservationService]:
+        """Hold the store lock while changing reservations."""
+        with self._locked():
+            if self._stamp() != self._loaded_stamp:
+                self._open()
+            try:
+                yield self.service
+            finally:
+                self._loaded_stamp = self._stamp()
+
+    def acquire(self) -> bool:
+        """Mark the store as in use by a request. Returns False once it is closing."""
+        with self._users_lock:
+            if self._closing:
+                return False
+            self._users += 1
+            return True
+
+    def release(self) -> None:
+        """End a request's use of the store, finishing a close that was waiting for it."""
+        with self._users_lock:
+            self._users -= 1
+            close_now = self._closing and self._users == 0
+        if close_now:
+            self._close()
+
+    def close(self) -> None:
+        """Release the service, the snapshot mapping and the lock file once no request uses them."""
+        with self._users_lock:
+            if self._closing:
+                return
+            self._closing = True
+            if self._users:
+                return
+        self._close()
+
+    def _close(self) -> None:
+        with self._thread_lock:
+            if self.change_feed is not None:
+                self.change_feed.detach(self.service)
+            self.service.close()
+            # Readers still using the mapping keep it open until they finish
+            self._snapshot = None
+            if self._lock_file is not None:
+                self._lock_file.close()
+                self._lock_file = None
+
+
+class ReplicaStore:
+    """Read-only store served from a replica that follows a replication leader."""
+
+    def __init__(self, leader_address: str):
+        self.service = ReservationReplica(leader_address)
+
+    def read(self) -> ReservationService:
+        """Get the replica for reading."""
+        return self.service
+
+    def read_snapshot(self, date: Optional[str] = None) -> None:
+        """The replica is already in memory, so there is no snapshot."""
+        return None
+
+    @contextmanager
+    def write(self) -> Iterator[ReservationService]:
+        """Refuse changes, which must go to the leader."""
+        raise ApiError(503, "This server is a read-only replica; send changes to the leader")
+        yield
+
+
+def _store_snapshot(store_path: str, change_feed: ChangeFeed):
+    """Snapshot function for a replication leader serving a shared store file.
+
+    Workers save the file and append to the feed while holding the store
+    lock, so reading both under the lock gives a matching pair.
+    """
+    lock_file = open(f"{store_path}.lock", 'a') if fcntl is not None else None
+
+    def snapshot() -> Tuple[List[Dict[str, Any]], int]:
+        if lock_file is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            rows = []
+            if os.path.exists(store_path):
+                with open(store_path, 'rb') as file:
+                    rows = serialization.decode_reservations(
+                        file.read(), binary=serialization.is_binary_path(store_path))
+            return rows, change_feed.latest_sequence()
+        finally:
+            if lock_file is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+    return snapshot
+
+
+def _parse_hours(hours: str) -> Tuple[int, int]:
+    """Parse "HH:MM-HH:MM" into first and last slot minutes."""
+    first, last = hours.split("-")
+    to_minutes = lambda value: int(value[:2]) * 60 + int(value[3:5])
+    return to_minutes(first.strip()), to_minutes(last.strip())
+
+
+class ApiServer:
+    """HTTP/1.1 JSON API over the menu and reservation services.
+
+    Connections are kept alive between requests. Menu responses carry an
+    ETag derived from their content, so clients (and other workers) can send
+    If-None-Match and get a 304 without a body.
+
+    With a TenantRegistry, every route is also served per location under
+    ``/t/<tenant ID>``, from that location's menu and reservation file.
+    """
+
+    def __init__(self, menu_service: ScheduledMenuService, store: SharedReservationStore,
+                 tenants: Optional[TenantRegistry] = None):
+        self.menu_service = menu_service
+        self.store = store
+        self.tenants = tenants
+        self._tenant_apis: Dict[str, "ApiServer"] = {}
+        self._menu_cache_key = None
+        self._menu_cache: "OrderedDict[str, Tuple[str, bytes]]" = OrderedDict()
+        # Handlers run on a thread pool, so shared caches are locked
+        self._lock = threading.Lock()
+        self.chat_sessions = ChatSessionStore()
+        self._routes = [
+            ("GET", re.compile(r"^/menu$"), self.get_menu),
+            ("GET", re.compile(r"^/menu/items$"), self.get_menu_items),
+            ("GET", re.compile(r"^/menu/items/(?P<item_id>[^/]+)$"), self.get_menu_item),
+            ("GET", re.compile(r"^/reservations$"), self.list_reservations),
+            ("POST", re.compile(r"^/reservations$"), self.create_reservation),
+            ("GET", re.compile(r"^/reservations/(?P<reservation_id>[^/]+)$"), self.get_reservation),
+            ("PATCH", re.compile(r"^/reservations/(?P<reservation_id>[^/]+)$"), self.update_reservation),
+            ("DELETE", re.compile(r"^/reservations/(?P<reservation_id>[^/]+)$"), self.cancel_reservation),
+            ("GET", re.compile(r"^/availability$"), self.get_availability),
+            ("POST", re.compile(r"^/chat$"), self.chat),
+        ]
+
+    # Connection handling
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve requests on one connection until it is closed or goes idle."""
+        try:
+            for _ in range(MAX_REQUESTS_PER_CONNECTION):
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), KEEPALIVE_TIMEOUT)
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+                    break
+                except asyncio.LimitOverrunError:
+                    await self._send(writer, self._error(431, "Request headers too large"), False)
+                    break
+
+                try:
+                    method, target, version, headers = self._parse_head(head)
+                except ValueError:
+                    await self._send(writer, self._error(400, "Malformed request"), False)
+                    break
+
+                if version == "HTTP/1.1":
+                    keep_alive = headers.get("connection", "").lower() != "close"
+                else:
+                    keep_alive = headers.get("connection", "").lower() == "keep-alive"
+
+                if "chunked" in headers.get("transfer-encoding", "").lower():
+                    await self._send(writer, self._error(411, "Content-Length is required"), False)
+                    break
+                try:
+                    length = int(headers.get("content-length", "0"))
+                except ValueError:
+                    await self._send(writer, self._error(400, "Invalid Content-Length"), False)
+                    break
+                if length > MAX_BODY_BYTES:
+                    await self._send(writer, self._error(413, "Request body too large"), False)
+                    break
+                try:
+                    body = await reader.readexactly(length) if length else b""
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+
+                # Handlers may wait on the store lock or reload the store file,
+                # so run them off the event loop
+                response = await asyncio.get_running_loop().run_in_executor(
+                    None, self.dispatch, method, target, headers, body)
+                await self._send(writer, response, keep_alive, head_only=method == "HEAD")
+                if not keep_alive:
+                    break
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    def _parse_head(self, head: bytes) -> Tuple[str, str, str, Dict[str, str]]:
+        """Parse the request line and headers (header names lowercased)."""
+        lines = head.decode("latin-1").split("\r\n")
+        method, target, version = lines[0].split(" ")
+        if not version.startswith("HTTP/1."):
+            raise ValueError(version)
+        headers = {}
+        for line in lines[1:]:
+            if line:
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+        return method.upper(), target, version, headers
+
+    async def _send(self, writer: asyncio.StreamWriter, response: Response,
+                    keep_alive: bool, head_only: bool = False) -> None:
+        status, headers, body = response
+        lines = [f"HTTP/1.1 {status} {HTTPStatus(status).phrase}"]
+        if body or status not in (204, 304):
+            lines.append("Content-Type: application/json")
+            lines.append(f"Content-Length: {len(body)}")
+        lines.extend(f"{name}: {value}" for name, value in headers.items())
+        if keep_alive:
+            lines.append("Connection: keep-alive")
+            lines.append(f"Keep-Alive: timeout={KEEPALIVE_TIMEOUT}")
+        else:
+            lines.append("Connection: close")
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+        if not head_only:
+            writer.write(body)
+        await writer.drain()
+
+    # Routing
+
+    def dispatch(self, method: str, target: str, headers: Dict[str, str], body: bytes) -> Response:
+        """Route a request to its handler and turn errors into JSON responses."""
+        url = urlsplit(target)
+        tenant_match = TENANT_PATH.match(url.path) if self.tenants is not None else None
+        if tenant_match:
+            while True:
+                try:
+                    api = self._tenant_api(tenant_match["tenant_id"])
+                except (KeyError, ValueError):
+                    return self._error(404, f"Unknown location '{tenant_match['tenant_id']}'")
+                # Hold the location's store so evicting it can't close it
+                # mid-request; if it was evicted just now, load it again
+                if api.store.acquire():
+                    break
+            path = tenant_match["path"] + (f"?{url.query}" if url.query else "")
+            try:
+                return api.dispatch(method, path, headers, body)
+            finally:
+                api.store.release()
+
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        lookup_method = "GET" if method == "HEAD" else method
+
+        allowed = []
+        for route_method, pattern, handler in self._routes:
+            match = pattern.match(url.path)
+            if not match:
+                continue
+            if route_method != lookup_method:
+                allowed.append(route_method)
+                continue
+            try:
+                return handler(query=query, headers=headers, body=body, **match.groupdict())
+            except ApiError as e:
+                return self._error(e.status, str(e))
+            except Exception as e:
+                print(f"Error handling {method} {url.path}: {e}")
+                return self._error(500, "Internal server error")
+
+        if allowed:
+            status, extra, payload = self._error(405, "Method not allowed")
+            return status, {**extra, "Allow": ", ".join(allowed)}, payload
+        return self._error(404, "Not found")
+
+    def _tenant_api(self, tenant_id: str) -> "ApiServer":
+        """Get the API for one location, rebuilding it if the registry reloaded its services."""
+        store = self.tenants.get_reservation_service(tenant_id)
+        menu_service = self.tenants.get_menu_service(tenant_id)
+        with self._lock:
+            api = self._tenant_apis.get(tenant_id)
+            if api is None or api.store is not store or api.menu_service is not menu_service:
+                api = ApiServer(menu_service, store)
+                self._tenant_apis[tenant_id] = api
+                # Let go of locations the registry has evicted
+                loaded = set(self.tenants.loaded_tenants())
+                for other in [other for other in self._tenant_apis if other not in loaded]:
+                    del self._tenant_apis[other]
+            return api
+
+    def _json(self, payload: Any, status: int = 200, headers: Optional[Dict[str, str]] = None) -> Response:
+        return status, headers or {}, serialization.dumps(payload)
+
+    def _error(self, status: int, message: str, details: Optional[List[str]] = None) -> Response:
+        payload = {"error": message}
+        if details:
+            payload["details"] = details
+        return self._json(payload, status)
+
+    def _read_json(self, body: bytes) -> Dict[str, Any]:
+        try:
+            data = serialization.loads(body or b"{}")
+        except Exception:
+            raise ApiError(400, "Request body must be valid JSON")
+        if not isinstance(data, dict):
+            raise ApiError(400, "Request body must be a JSON object")
+        return data
+
+    # Menu
+
+    def _cached_menu_response(self, cache_key: str, headers: Dict[str, str], build) -> Response:
+        """Serve a menu response with an ETag, building its body once per active menu.
+
+        Only the MENU_CACHE_SIZE most recently used responses are kept, as
+        clients choose the filters and could otherwise grow the cache forever.
+        """
+        menu = self.menu_service.menu
+        with self._lock:
+            if self._menu_cache_key is not menu:
+                # The active menu changed (reload or schedule switch)
+                self._menu_cache_key = menu
+                self._menu_cache = OrderedDict()
+            cached = self._menu_cache.get(cache_key)
+            if cached is not None:
+                self._menu_cache.move_to_end(cache_key)
+
+        if cached is None:
+            body = serialization.dumps(build())
+            cached = (f'"{hashlib.sha1(body).hexdigest()}"', body)
+            with self._lock:
+                if self._menu_cache_key is menu:
+                    self._menu_cache[cache_key] = cached
+                    while len(self._menu_cache) > MENU_CACHE_SIZE:
+                        self._menu_cache.popitem(last=False)
+        etag, body = cached
+
+        cache_headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if_none_match = headers.get("if-none-match")
+        if if_none_match:
+            tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+            if "*" in tags or etag in tags:
+                return 304, cache_headers, b""
+        return 200, cache_headers, body
+
+    def get_menu(self, query, headers, body) -> Response:
+        return self._cached_menu_response("menu", headers, self.menu_service.get_full_menu)
+
+    def get_menu_items(self, query, headers, body) -> Response:
+        """Find menu items by dietary tags, categories, availability, price and search text, with facet counts."""
+        def split(value: str) -> List[str]:
+            return sorted({part.strip() for part in value.split(",") if part.strip()})
+
+        def price(name: str) -> Optional[float]:
+            try:
+                return float(query[name]) if query.get(name) else None
+            except ValueError:
+                raise ApiError(400, f"Invalid {name}")
+
+        available = query.get("available", "").lower()
+        filters = {
+            "dietary": split(query.get("diet", "")),
+            "categories": split(query.get("category", "")),
+            "available": True if available in ("1", "true", "yes") else False if available in ("0", "false", "no") else None,
+            "min_price": price("min_price"),
+            "max_price": price("max_price"),
+            "search": query.get("q"),
+        }
+
+        def build() -> Dict[str, Any]:
+            result = self.menu_service.query_items(**filters)
+            return {"items": [dict(item) for item in result["items"]], "facets": result["facets"]}
+
+        # Key on the parsed filters, so unknown parameters and spelling
+        # variants of the same query share one entry
+        cache_key = "items?" + serialization.dumps(filters).decode("utf-8")
+        return self._cached_menu_response(cache_key, headers, build)
+
+    def get_menu_item(self, query, headers, body, item_id: str) -> Response:
+        item = self.menu_service.get_item_by_id(item_id)
+        if item is None:
+            raise ApiError(404, f"Menu item {item_id} not found")
+        return self._cached_menu_response(f"item/{item_id}", headers, lambda: dict(item))
+
+    # Reservations
+
+    def list_reservations(self, query, headers, body) -> Response:
+        """List reservations by contact (optionally upcoming only) or by date."""
+        if query.get("contact"):
+            upcoming = query.get("upcoming", "").lower() in ("1", "true", "yes")
+            reservations = self.store.read().get_reservations_by_contact(query["contact"], upcoming_only=upcoming)
+        elif query.get("date"):
+            snapshot = self.store.read_snapshot(query["date"])
+            reservations = (snapshot or self.store.read()).get_reservations_by_date(query["date"])
+        else:
+            raise ApiError(400, "Pass a contact or a date")
+        return self._json([r.to_dict() for r in reservations])
+
+    def create_reservation(self, query, headers, body) -> Response:
+        """Book a table. A retry with the same Idempotency-Key header returns the first booking."""
+        data = self._read_json(body)
+        error = validate_reservation(data)
+        if error:
+            raise ApiError(422, error)
+        idempotency_key = headers.get("idempotency-key") or None
+        if idempotency_key is not None and len(idempotency_key) > MAX_IDEMPOTENCY_KEY_LENGTH:
+            raise ApiError(400, "Idempotency-Key is too long")
+        # Only the booking details are used; clients can't choose the ID,
+        # creation time or status. The store lock covers the key check, so
+        # concurrent retries to different workers book once.
+        with self.store.write() as service:
+            try:
+                reservation = service.create_reservation(
+                    customer_name=data["customer_name"],
+                    contact_info=data["contact_info"],
+                    date=data["date"],
+                    time=data["time"],
+                    party_size=int(data["party_size"]),
+                    dish_ids=list(data.get("dish_ids") or []),
+                    idempotency_key=idempotency_key)
+            except ValueError as e:
+                raise ApiError(422, str(e))
+        return self._json(reservation.to_dict(), 201, {"Location": f"/reservations/{reservation.id}"})
+
+    def get_reservation(self, query, headers, body, reservation_id: str) -> Response:
+        snapshot = self.store.read_snapshot()
+        reservation = snapshot.get_reservation(reservation_id) if snapshot is not None else None
+        if reservation is None:
+            # Archived reservations are only in the service
+            reservation = self.store.read().get_reservation(reservation_id)
+        if reservation is None:
+            raise ApiError(404, f"Reservation {reservation_id} not found")
+        return self._json(reservation.to_dict())
+
+    def update_reservation(self, query, headers, body, reservation_id: str) -> Response:
+        """Change a booking's details. Only BOOKING_FIELDS can be changed."""
+        changes = self._read_json(body)
+        unknown = sorted(field for field in changes if field not in BOOKING_FIELDS)
+        if unknown:
+            raise ApiError(422, f"Can't change {', '.join(unknown)}")
+        with self.store.write() as service:
+            reservation = service.get_reservation(reservation_id)
+            if reservation is None:
+                raise ApiError(404, f"Reservation {reservation_id} not found")
+            if reservation.status == "cancelled":
+                raise ApiError(422, f"Reservation {reservation_id} is cancelled")
+            error = validate_reservation({**reservation, **changes})
+            if error:
+                raise ApiError(422, error)
+            updated, errors = service.bulk_update({reservation_id: changes})
+        if errors:
+            raise ApiError(422, errors[0].removeprefix(f"{reservation_id}: "))
+        return self._json(updated[0].to_dict())
+
+    def cancel_reservation(self, query, headers, body, reservation_id: str) -> Response:
+        with self.store.write() as service:
+            if not service.cancel_reservation(reservation_id):
+                raise ApiError(404, f"Reservation {reservation_id} not found")
+            reservation = service.get_reservation(reservation_id)
+        return self._json(reservation.to_dict())
+
+    def get_availability(self, query, headers, body) -> Response:
+        """Get the free seats per slot on a date, and whether a party fits."""
+        if not query.get("date"):
+            raise ApiError(400, "Pass a date")
+        try:
+            party_size = int(query.get("party_size", "1"))
+        except ValueError:
+            raise ApiError(400, "Invalid party_size")
+
+        snapshot = self.store.read_snapshot(query["date"])
+        if snapshot is not None:
+            covers = covers_by_slot(snapshot.get_reservations_by_date(query["date"]), config.SLOT_MINUTES)
+        else:
+            covers = self.store.read().get_covers_by_slot(query["date"], config.SLOT_MINUTES)
+        first, last = _parse_hours(config.RESERVATION_HOURS)
+        slots = []
+        for minutes in range(first, last + 1, config.SLOT_MINUTES):
+            slot = f"{minutes // 60:02d}:{minutes % 60:02d}"
+            free = max(0, config.SLOT_CAPACITY - covers.get(slot, 0))
+            slots.append({"time": slot, "booked": covers.get(slot, 0), "free": free, "fits": free >= party_size})
+
+        if query.get("time"):
+            slots = [slot for slot in slots if slot["time"] == query["time"]]
+            if not slots:
+                raise ApiError(404, f"No bookable slot at {query['time']}")
+        return self._json({"date": query["date"], "party_size": party_size, "slots": slots})
+
+    # Chat
+
+    def chat(self, query, headers, body) -> Response:
+        """Send a message to the chatbot within a session."""
+        data = self._read_json(body)
+        message = str(data.get("message", "")).strip()
+        if not message:
+            raise ApiError(400, "Pass a message")
+
+        session = self.chat_sessions.get(str(data["session_id"]) if data.get("session_id") else None)
+        if is_booking_request(message) or session.pending_booking is not None:
+            # Booking through chat changes reservations, so it needs the store lock
+            with self.store.write() as service:
+                bot = SimpleRestaurantChatbot(self.menu_service, service, session.pending_booking)
+                reply = bot.process_message(message)
+        else:
+            bot = SimpleRestaurantChatbot(self.menu_service, self.store.read())
+            reply = bot.process_message(message)
+        # Keep a booking that is still waiting for details for the session's next message
+        session.pending_booking = bot.pending_booking
+        session.append("user", message)
+        session.append("assistant", reply)
+        return self._json({"session_id": session.session_id, "reply": reply})
+
+
+def _create_socket(host: str, port: int) -> socket.socket:
+    """Bind the listening socket that every worker accepts connections on."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(1024)
+    sock.setblocking(False)
+    return sock
+
+
+def run_worker(sock: socket.socket, store_path: str, menu_path: str,
+               feed_dir: Optional[str] = None, leader: Optional[str] = None) -> None:
+    """Load the services and serve requests on the shared socket until stopped.
+
+    With a leader address the worker serves reads from a replica of the
+    leader's reservations and refuses changes.
+    """
+    menu_service = ScheduledMenuService(menu_path)
+    tenants = None
+    if leader:
+        store = ReplicaStore(leader)
+    else:
+        change_feed = ChangeFeed(feed_dir) if feed_dir else None
+        store = SharedReservationStore(store_path, menu_service, archive_dir=config.RESERVATION_ARCHIVE_DIR,
+                                       change_feed=change_feed)
+        if os.path.isdir(config.TENANTS_DIR):
+            tenants = _tenant_registry()
+    api = ApiServer(menu_service, store, tenants)
+
+    async def serve() -> None:
+        server = await asyncio.start_server(api.handle_connection, sock=sock)
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(signum, stop.set)
+            except (NotImplementedError, RuntimeError):
+                pass
+        async with server:
+            await stop.wait()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        menu_service.close()
+        if tenants is not None:
+            tenants.close()
+
+
+def _tenant_registry() -> TenantRegistry:
+    """Registry of the locations under TENANTS_DIR, each with a store shared by all workers."""
+    def open_store(tenant_id: str, path: str, archive_dir: Optional[str]) -> SharedReservationStore:
+        return SharedReservationStore(path, registry.get_menu_service(tenant_id), archive_dir=archive_dir)
+
+    registry = TenantRegistry(config.TENANTS_DIR,
+                              max_tenants=config.TENANT_CACHE_SIZE,
+                              max_bytes=config.TENANT_CACHE_MB * 1024 * 1024 or None,
+                              archive=bool(config.RESERVATION_ARCHIVE_DIR),
+                              menu_factory=ScheduledMenuService,
+                              reservation_factory=open_store)
+    return registry
+
+
+def _interrupt(signum, frame) -> None:
+    raise KeyboardInterrupt
+
+
+def main():
+    """Run the API server, optionally with several worker processes."""
+    parser = argparse.ArgumentParser(description="Serve the menu and reservations over HTTP.")
+    parser.add_argument("--host", default=config.API_HOST, help="Address to listen on")
+    parser.add_argument("--port", type=int, default=config.API_PORT, help="Port to listen on")
+    parser.add_argument("--workers", type=int, default=config.API_WORKERS, help="Number of worker processes")
+    parser.add_argument("--store", default="reservations.json", help="Reservation store file")
+    parser.add_argument("--menu", default="menu_data.json", help="Menu file")
+    parser.add_argument("--replicate", default=config.REPLICATION_LISTEN,
+                        help="Serve read replicas on this address (host:port or socket path)")
+    parser.add_argument("--follow", default=config.REPLICATION_LEADER,
+                        help="Serve reads from a replica of this leader address")
+    args = parser.parse_args()
+    if args.replicate and args.follow:
+        parser.error("--replicate and --follow can't be combined")
+
+    # The change feed is the journal that replicas follow
+    feed_dir = config.CHANGE_FEED_DIR or ("change_feed" if args.replicate else None)
+    leader = None
+    if args.replicate:
+        change_feed = ChangeFeed(feed_dir)
+        leader = ReplicationLeader(args.replicate, change_feed, _store_snapshot(args.store, change_feed))
+        print(f"Serving replicas on {args.replicate}")
+
+    workers = args.workers
+    if workers > 1 and (fcntl is None or "fork" not in multiprocessing.get_all_start_methods()):
+        print("Multiple workers need file locking and fork; using 1 worker")
+        workers = 1
+
+    sock = _create_socket(args.host, args.port)
+    print(f"Serving on http://{args.host}:{args.port} with {workers} worker(s)")
+    if workers == 1:
+        if leader is not None:
+            leader.start()
+        try:
+            run_worker(sock, args.store, args.menu, feed_dir, args.follow)
+        finally:
+            if leader is not None:
+                leader.close()
+        return
+
+    # Workers inherit the bound socket and share its accept queue
+    context = multiprocessing.get_context("fork")
+    processes = [context.Process(target=run_worker, args=(sock, args.store, args.menu, feed_dir, args.follow),
+                                 daemon=True)
+                 for _ in range(workers)]
+    for process in processes:
+        process.start()
+    if leader is not None:
+        leader.start()
+
+    signal.signal(signal.SIGTERM, _interrupt)
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.join()
+    finally:
+        if leader is not None:
+            leader.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,10 @@
 import os
 import json
-from menu_service import MenuService
+from menu_schedule import ScheduledMenuService
 from reservation_service import ReservationService
+from change_feed import ChangeFeed
+from reservation_parser import (merge_booking_answer, missing_fields, describe_missing, is_booking_request,
+                                validate_booking, FIELD_LABELS)
 import config
 
 def clear_screen():
@@ -20,12 +23,21 @@ def print_header():
     print("-" * 80)
 
 class SimpleRestaurantChatbot:
-    def __init__(self):
-        self.menu_service = MenuService()
-        self.reservation_service = ReservationService()
+    def __init__(self, menu_service=None, reservation_service=None, pending_booking=None):
+        self.menu_service = menu_service or ScheduledMenuService()
+        if reservation_service is None:
+            reservation_service = ReservationService(archive_dir=config.RESERVATION_ARCHIVE_DIR,
+                                                     archive_on_load=False)
+            if config.CHANGE_FEED_DIR:
+                ChangeFeed(config.CHANGE_FEED_DIR).attach(reservation_service)
+            reservation_service.archive_reservations()
+        self.reservation_service = reservation_service
+        # A booking still waiting for details: {"data": details so far, "asking": field asked for}
+        self.pending_booking = pending_booking
 
     def process_message(self, message: str) -> str:
         """Process a user message and return a response."""
+        text = message
         message = message.lower()
 
         # Menu-related commands
@@ -65,9 +77,26 @@ class SimpleRestaurantChatbot:
             else:
                 return "Please specify what you'd like to search for. For example: 'search salmon'"
 
+        # Reservation lookup by phone or email
+        elif message.startswith("my reservations") or message.startswith("my bookings"):
+            contact = message.replace("my reservations", "", 1).replace("my bookings", "", 1).strip()
+            if contact:
+                reservations = self.reservation_service.get_reservations_by_contact(contact, upcoming_only=True)
+                return self._format_reservations(reservations, "Your Upcoming Reservations")
+            else:
+                return "Please include the phone number or email you booked with. For example: 'my reservations 555-123-4567'"
+
         # Reservation functionality
-        elif "reserve" in message or "reservation" in message or "book" in message:
-            return "To make a reservation, please provide your name, contact information, date, time, and party size. For example: 'reserve John Doe, 555-123-4567, 2023-07-15, 19:00, 4'"
+        elif is_booking_request(message):
+            self.pending_booking = None
+            return self._make_reservation(text)
+
+        # Reply to a question about a booking in progress
+        elif self.pending_booking is not None and message != "help":
+            if message.strip() in ["cancel", "stop"]:
+                self.pending_booking = None
+                return "Reservation cancelled. How else can I help you today?"
+            return self._make_reservation(text)
 
         # Help command
         elif message == "help":
@@ -77,7 +106,9 @@ Here are the commands you can use:
 - 'vegetarian', 'vegan', 'gluten-free' - View dietary options
 - 'appetizers', 'main courses', 'desserts' - View specific categories
 - 'search [query]' - Search for dishes (e.g., 'search salmon')
-- 'reserve [details]' - Make a reservation
+- 'reserve [details]' - Make a reservation (e.g., 'book a table for 4 tomorrow at 7pm, Sam Lee, 555-123-4567')
+- 'my reservations [phone/email]' - Look up your upcoming reservations
+- 'cancel' - Stop a reservation that is still waiting for details
 - 'help' - Show this help message
 - 'exit' or 'quit' - End the conversation
 """
@@ -86,6 +117,43 @@ Here are the commands you can use:
         else:
             return "I'm not sure how to respond to that. Type 'help' to see available commands."
 
+    def _make_reservation(self, message):
+        """Book a table, merging the message into any booking already in progress.
+
+        Details that are still missing are asked for and kept in
+        ``pending_booking`` until the next message supplies them.
+        """
+        pending = self.pending_booking or {"data": {}, "asking": None}
+        details, asking = pending["data"], pending["asking"]
+        parsed = merge_booking_answer(details, message, expecting=asking)
+
+        problem = validate_booking(details)
+        if problem:
+            field, reason = problem
+            details.pop(field, None)
+            self.pending_booking = {"data": details, "asking": field}
+            return f"Sorry, I can't book that: {reason}. Please tell me {FIELD_LABELS[field]} again, or type 'cancel'."
+
+        missing = missing_fields(details)
+        if missing:
+            self.pending_booking = {"data": details, "asking": missing[0]}
+            if asking and not parsed:
+                return f"Sorry, I didn't catch {FIELD_LABELS[asking]}. Please tell me {describe_missing(details)}."
+            return (f"To make a reservation, please also tell me {describe_missing(details)}. "
+                    "For example: 'book a table for 4 tomorrow at 7pm, Sam Lee, 555-123-4567'")
+
+        self.pending_booking = None
+
+        reservation = self.reservation_service.create_reservation(
+            customer_name=details["customer_name"],
+            contact_info=details["contact_info"],
+            date=details["date"],
+            time=details["time"],
+            party_size=details["party_size"]
+        )
+        return (f"Reservation confirmed for {reservation['customer_name']}, party of {reservation['party_size']}, "
+                f"on {reservation['date']} at {reservation['time']}. Your reservation ID is {reservation['id']}.")
+
     def _format_menu_items(self, items, title):
         """Format a list of menu items for display."""
         if not items:
@@ -102,6 +170,20 @@ Here are the commands you can use:
 
         return result
 
+    def _format_reservations(self, reservations, title):
+        """Format a list of reservations for display."""
+        if not reservations:
+            return "No upcoming reservations found for that contact."
+
+        result = f"\n{title}:\n" + "-" * 40 + "\n"
+
+        for reservation in reservations:
+            result += f"{reservation['id']} - {reservation['date']} at {reservation['time']}\n"
+            result += f"  Name: {reservation['customer_name']}, Party Size: {reservation['party_size']}\n"
+            result += f"  Status: {reservation['status']}\n\n"
+
+        return result
+
     def _format_full_menu(self, menu):
         """Format the full menu for display."""
         result = f"\nToday's Menu ({menu.get('date', 'Today')}):\n" + "=" * 40 + "\n"
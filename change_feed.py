@@ -0,0 +1,317 @@
+import argparse
+import bisect
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Iterator, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: appends are only serialized within a process
+    fcntl = None
+
+import config
+import serialization
+from reservation_record import ReservationRecord
+from reservation_service import ReservationService, fsync_directory
+
+SEGMENT_SUFFIX = ".log"
+
+
+class ChangeFeed:
+    """Durable, ordered log of reservation changes that consumers can tail.
+
+    Every ReservationService event ("created", "updated", "cancelled",
+    "dish_added", "archived", "imported") is appended as one JSON line carrying a
+    sequence number, the event name and the full reservation. The log is
+    split into segment files named after their first sequence number, so a
+    consumer resuming from a cursor opens the right segment directly, and
+    old segments can be dropped whole. Appends take an exclusive lock on
+    ``feed.lock`` in the directory, so several processes can write to one
+    feed. Each append is fsynced before it returns (and a new segment's
+    directory entry with it), so a change a consumer may act on survives a
+    crash; pass ``fsync=False`` to trade that for cheaper appends.
+    """
+
+    def __init__(self,
+                 directory: str = config.CHANGE_FEED_DIR or "change_feed",
+                 segment_bytes: int = config.CHANGE_FEED_SEGMENT_BYTES,
+                 retain_segments: Optional[int] = None,
+                 fsync: bool = True):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.retain_segments = retain_segments
+        self.fsync = fsync
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._lock_file = open(os.path.join(directory, "feed.lock"), 'a') if fcntl is not None else None
+        self._services: List[ReservationService] = []
+        with self._locked():
+            self._recover()
+
+    def _segment_path(self, start: int) -> str:
+        return os.path.join(self.directory, f"{start:020d}{SEGMENT_SUFFIX}")
+
+    def _list_segments(self) -> List[int]:
+        """Get the first sequence numbers of the segments on disk, in order."""
+        return sorted(int(name[:-len(SEGMENT_SUFFIX)]) for name in os.listdir(self.directory)
+                      if name.endswith(SEGMENT_SUFFIX) and name[:-len(SEGMENT_SUFFIX)].isdigit())
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        with self._lock:
+            if self._lock_file is None:
+                yield
+                return
+            fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _recover(self) -> None:
+        """Find the last sequence number, dropping a torn final line left by a crash.
+
+        Reads the whole newest segment, so it is used at startup and after a
+        crash; _refresh catches up with other writers more cheaply. Must be
+        called with the lock held.
+        """
+        segments = self._list_segments()
+        self.last_sequence = 0
+        self._active: Optional[Tuple[int, int]] = None
+        if not segments:
+            return
+
+        path = self._segment_path(segments[-1])
+        with open(path, 'rb') as file:
+            data = file.read()
+        complete = data.rfind(b"\n") + 1
+        if complete < len(data):
+            with open(path, 'r+b') as file:
+                file.truncate(complete)
+        lines = data[:complete].splitlines()
+        self.last_sequence = serialization.loads(lines[-1])["seq"] if lines else segments[-1] - 1
+        self._active = (segments[-1], complete)
+
+    def _refresh(self) -> None:
+        """Pick up changes appended by other processes since we last looked.
+
+        Another process may have grown our active segment or rolled over to a
+        new one, so compare the newest segment on disk and its size with what
+        we last wrote. Must be called with the lock held.
+        """
+        segments = self._list_segments()
+        if not segments:
+            if self._active is not None:
+                self._recover()
+            return
+        newest = segments[-1]
+        try:
+            size = os.path.getsize(self._segment_path(newest))
+        except FileNotFoundError:
+            self._recover()
+            return
+        same = self._active is not None and newest == self._active[0]
+        if same and size == self._active[1]:
+            return
+
+        # Only the bytes written since we last looked need reading
+        offset = self._active[1] if same and size > self._active[1] else 0
+        if size == offset == 0:
+            self.last_sequence, self._active = newest - 1, (newest, 0)
+            return
+        line = self._last_line(self._segment_path(newest), offset, size)
+        if line is None:
+            # A torn line left by a crash; recovery trims it
+            self._recover()
+            return
+        self.last_sequence = serialization.loads(line)["seq"]
+        self._active = (newest, size)
+
+    @staticmethod
+    def _last_line(path: str, offset: int, size: int) -> Optional[bytes]:
+        """Read a segment's last line backwards from its end, stopping at ``offset`` (a line start).
+
+        Returns None if the file doesn't end with a complete line.
+        """
+        with open(path, 'rb') as file:
+            file.seek(size - 1)
+            if file.read(1) != b"\n":
+                return None
+            # The bytes from position up to (not including) the final newline
+            position, data = size - 1, b""
+            while position > offset:
+                step = min(4096, position - offset)
+                position -= step
+                file.seek(position)
+                data = file.read(step) + data
+                newline = data.rfind(b"\n")
+                if newline >= 0:
+                    return data[newline + 1:]
+            return data
+
+    def append(self, event: str, reservation: Dict[str, Any]) -> int:
+        """Append a change to the feed. Returns its sequence number."""
+        with self._locked():
+            self._refresh()
+
+            sequence = self.last_sequence + 1
+            if self._active is None or self._active[1] >= self.segment_bytes:
+                self._active = (sequence, 0)
+                self._drop_old_segments()
+
+            line = serialization.dumps({
+                "seq": sequence,
+                "event": event,
+                "at": datetime.now().isoformat(),
+                "reservation": reservation,
+            }) + b"\n"
+            new_segment = self._active[1] == 0
+            with open(self._segment_path(self._active[0]), 'ab') as file:
+                file.write(line)
+                file.flush()
+                if self.fsync:
+                    os.fsync(file.fileno())
+            if self.fsync and new_segment:
+                fsync_directory(self._segment_path(self._active[0]))
+            self.last_sequence = sequence
+            self._active = (self._active[0], self._active[1] + len(line))
+        return sequence
+
+    def _drop_old_segments(self) -> None:
+        """Delete the oldest segments beyond ``retain_segments`` (the new one included)."""
+        if self.retain_segments is None:
+            return
+        segments = self._list_segments()
+        for start in segments[:max(0, len(segments) + 1 - self.retain_segments)]:
+            try:
+                os.remove(self._segment_path(start))
+            except OSError as e:
+                print(f"Error removing change feed segment {start}: {e}")
+
+    def latest_sequence(self) -> int:
+        """Get the newest sequence number, including changes appended by other processes."""
+        with self._locked():
+            self._refresh()
+            return self.last_sequence
+
+    @property
+    def first_sequence(self) -> int:
+        """Sequence number of the oldest change still kept (0 when the feed is empty)."""
+        segments = self._list_segments()
+        return segments[0] if segments else 0
+
+    def read(self, after: int = 0, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Get the changes with sequence numbers above ``after``, oldest first.
+
+        If ``after`` is older than the retained segments, reading starts at
+        the oldest change kept; callers can spot the gap from the first
+        sequence number returned.
+        """
+        return self.read_batch(after, None, limit)[0]
+
+    def read_batch(self, after: int, position: Optional[Tuple[int, int]] = None,
+                   limit: Optional[int] = None) -> Tuple[List[Dict[str, Any]], Optional[Tuple[int, int]]]:
+        """Read the changes after ``after``, continuing from an earlier read's position.
+
+        Returns the changes and the (segment, byte offset) position to pass
+        to the next call, so a follower never rereads what it has seen.
+        """
+        segments = self._list_segments()
+        if not segments:
+            return [], position
+        if position is None or position[0] not in segments:
+            index = max(0, bisect.bisect_right(segments, after + 1) - 1)
+            position = (segments[index], 0)
+        index = segments.index(position[0])
+
+        changes: List[Dict[str, Any]] = []
+        while True:
+            start, offset = position
+            try:
+                with open(self._segment_path(start), 'rb') as file:
+                    file.seek(offset)
+                    data = file.read()
+            except FileNotFoundError:
+                data = b""
+            # Ignore a line that is still being written
+            data = data[:data.rfind(b"\n") + 1]
+            for line in data.splitlines(keepends=True):
+                offset += len(line)
+                change = serialization.loads(line)
+                if change["seq"] > after:
+                    changes.append(change)
+                    if limit is not None and len(changes) >= limit:
+                        return changes, (start, offset)
+            position = (start, offset)
+            if index + 1 >= len(segments):
+                return changes, position
+            index += 1
+            position = (segments[index], 0)
+
+    def tail(self, after: int = 0, poll_interval: float = 0.5,
+             stop: Optional[threading.Event] = None) -> Iterator[Dict[str, Any]]:
+        """Yield changes after a cursor as they are appended, until ``stop`` is set."""
+        position = None
+        while stop is None or not stop.is_set():
+            changes, position = self.read_batch(after, position, 1000)
+            for change in changes:
+                after = change["seq"]
+                yield change
+            if not changes:
+                if stop is not None:
+                    stop.wait(poll_interval)
+                else:
+                    time.sleep(poll_interval)
+
+    def attach(self, reservation_service: ReservationService) -> None:
+        """Record every change made through a reservation service."""
+        reservation_service.add_listener(self._on_change)
+        self._services.append(reservation_service)
+
+    def detach(self, reservation_service: ReservationService) -> None:
+        """Stop recording a reservation service's changes."""
+        reservation_service.remove_listener(self._on_change)
+        if reservation_service in self._services:
+            self._services.remove(reservation_service)
+
+    def close(self) -> None:
+        """Stop recording changes."""
+        for service in self._services:
+            service.remove_listener(self._on_change)
+        self._services = []
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+
+    def _on_change(self, event: str, reservation: ReservationRecord) -> None:
+        try:
+            self.append(event, reservation.to_dict())
+        except Exception as e:
+            print(f"Error writing to change feed: {e}")
+
+
+def main():
+    """Print changes from the feed, following new ones as they arrive."""
+    parser = argparse.ArgumentParser(description="Follow the reservation change feed.")
+    parser.add_argument("--dir", default=config.CHANGE_FEED_DIR or "change_feed", help="Feed directory")
+    parser.add_argument("--after", type=int, default=0, help="Start after this sequence number")
+    parser.add_argument("--no-follow", action="store_true", help="Exit after printing existing changes")
+    args = parser.parse_args()
+
+    feed = ChangeFeed(args.dir)
+    changes = feed.read(args.after) if args.no_follow else feed.tail(args.after)
+    try:
+        for change in changes:
+            reservation = change["reservation"]
+            print(f"{change['seq']:>8} {change['at']} {change['event']:<10} {reservation['id']} "
+                  f"{reservation['date']} {reservation['time']} {reservation['status']}")
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, List, Dict, Optional
+
+ROLE_LABELS = {"user": "You", "assistant": "Assistant"}
+
+
+class ChatMessage:
+    """One chat message with its history rendering prepared up front."""
+
+    __slots__ = ("role", "content", "rendered")
+
+    def __init__(self, role: str, content: str):
+        self.role = role
+        self.content = content
+        # Markdown block used when the message is shown in a history page
+        self.rendered = f"**{ROLE_LABELS.get(role, role.title())}:** {content}"
+
+
+class ChatSession:
+    """Append-only chat history split into fixed-size pages.
+
+    The most recent messages are shown live; everything before them falls
+    into full pages whose rendered markdown is built once and cached, since
+    full pages never change. Only the newest ``max_messages`` are kept; older
+    pages are dropped whole so page numbers stay stable.
+    """
+
+    def __init__(self, session_id: str, page_size: int = 20, max_messages: int = 500):
+        self.session_id = session_id
+        self.page_size = page_size
+        self.max_messages = max_messages
+        self.last_access = time.monotonic()
+        self._messages: List[ChatMessage] = []
+        self._dropped = 0
+        self._rendered_pages: Dict[int, str] = {}
+        self._lock = threading.Lock()
+        # A chat booking still waiting for details, kept between requests
+        self.pending_booking: Optional[Dict[str, Any]] = None
+
+    def __len__(self) -> int:
+        """Number of messages ever added, including dropped ones."""
+        return self._dropped + len(self._messages)
+
+    def append(self, role: str, content: str) -> ChatMessage:
+        """Add a message to the end of the history."""
+        message = ChatMessage(role, content)
+        with self._lock:
+            self._messages.append(message)
+            if len(self._messages) > self.max_messages + self.page_size:
+                self._drop_oldest_page()
+        return message
+
+    def _drop_oldest_page(self) -> None:
+        del self._messages[:self.page_size]
+        self._rendered_pages.pop(self._dropped // self.page_size, None)
+        self._dropped += self.page_size
+
+    def _live_start(self, window: int) -> int:
+        """Absolute index of the first live message (always at a page boundary)."""
+        start = (max(0, len(self) - window) // self.page_size) * self.page_size
+        return max(start, self._dropped)
+
+    def live_messages(self, window: int) -> List[ChatMessage]:
+        """Get the newest messages to render individually (at least ``window`` of them)."""
+        with self._lock:
+            return self._messages[self._live_start(window) - self._dropped:]
+
+    def history_pages(self, window: int) -> range:
+        """Get the numbers of the full pages that come before the live messages."""
+        with self._lock:
+            return range(self._dropped // self.page_size, self._live_start(window) // self.page_size)
+
+    def render_page(self, page: int) -> str:
+        """Get the markdown for a full history page, rendering it only once."""
+        with self._lock:
+            rendered = self._rendered_pages.get(page)
+            if rendered is None:
+                start = page * self.page_size - self._dropped
+                if start < 0 or start + self.page_size > len(self._messages):
+                    return ""
+                rendered = "\n\n".join(m.rendered for m in self._messages[start:start + self.page_size])
+                self._rendered_pages[page] = rendered
+            return rendered
+
+    def messages(self) -> List[ChatMessage]:
+        """Get every kept message, oldest first."""
+        with self._lock:
+            return list(self._messages)
+
+
+class ChatSessionStore:
+    """Server-side store of chat sessions, shared by every user of a process.
+
+    Only the session ID needs to live in client/UI state. Sessions idle for
+    longer than ``idle_timeout`` seconds are expired, and the least recently
+    used ones are evicted beyond ``max_sessions``.
+    """
+
+    def __init__(self,
+                 max_sessions: int = 1000,
+                 idle_timeout: float = 3600,
+                 page_size: int = 20,
+                 max_messages: int = 500):
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.page_size = page_size
+        self.max_messages = max_messages
+        self._sessions: "OrderedDict[str, ChatSession]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def get(self, session_id: Optional[str] = None) -> ChatSession:
+        """Get a session by ID, creating it (with a new ID if none is given) when missing."""
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            session = self._sessions.get(session_id) if session_id else None
+            if session is None:
+                session = ChatSession(session_id or uuid.uuid4().hex, self.page_size, self.max_messages)
+                self._sessions[session.session_id] = session
+                while len(self._sessions) > self.max_sessions:
+                    self._sessions.popitem(last=False)
+            else:
+                self._sessions.move_to_end(session_id)
+            session.last_access = now
+            return session
+
+    def _expire(self, now: float) -> None:
+        """Drop sessions idle for too long (the oldest are at the front)."""
+        while self._sessions:
+            session = next(iter(self._sessions.values()))
+            if now - session.last_access <= self.idle_timeout:
+                break
+            self._sessions.popitem(last=False)
+
+    def discard(self, session_id: str) -> None:
+        """Delete a session."""
+        with self._lock:
+            self._sessions.pop(session_id, None)
@@ -1,18 +1,21 @@
 from typing import Dict, List, Any, Optional
 import json
+import re
 from datetime import datetime
 from openai import OpenAI
 from menu_service import MenuService
+from menu_retrieval import MenuRetriever, format_menu_context
 from reservation_service import ReservationService
 import config
 
 class RestaurantChatbot:
     def __init__(self):
         self.menu_service = MenuService()
-        self.reservation_service = ReservationService()
+        self.reservation_service = ReservationService(archive_dir=config.RESERVATION_ARCHIVE_DIR)
         self.client = OpenAI(api_key=config.OPENAI_API_KEY)
         self.model = config.MODEL_NAME
         self.conversation_history = []
+        self._retriever = None
 
         # Add system message to conversation history
         self._add_to_history("system", self._get_system_message())
@@ -108,6 +111,13 @@ class RestaurantChatbot:
 
     def _handle_reservation_query(self, message: str) -> str:
         """Handle reservation-related queries."""
+        # Look up existing bookings when the guest gives their phone or email
+        if "my reservation" in message.lower() or "my booking" in message.lower():
+            contact = re.search(r"[\w.+-]+@[\w-]+\.[\w.-]+|\+?\d[\d\s().-]{6,}\d", message)
+            if contact:
+                reservations = self.reservation_service.get_reservations_by_contact(contact.group(0), upcoming_only=True)
+                return self._format_reservations(reservations)
+
         # For now, just use the AI to respond to reservation queries
         # In a real implementation, we would parse the message for reservation details
         return self._get_ai_response()
@@ -127,6 +137,18 @@ class RestaurantChatbot:
 
         return result
 
+    def _format_reservations(self, reservations: List[Dict[str, Any]]) -> str:
+        """Format a list of reservations for display."""
+        if not reservations:
+            return "I couldn't find any upcoming reservations for that contact."
+
+        result = "**Your upcoming reservations:**\n\n"
+        for reservation in reservations:
+            result += f"**{reservation['id']}** - {reservation['date']} at {reservation['time']}\n"
+            result += f"Party of {reservation['party_size']} under {reservation['customer_name']}\n\n"
+
+        return result
+
     def _format_full_menu(self, menu: Dict[str, Any]) -> str:
         """Format the full menu for display."""
         result = f"**Today's Menu ({menu.get('date', 'Today')}):**\n\n"
@@ -143,12 +165,31 @@ class RestaurantChatbot:
 
         return result
 
+    def _get_menu_context(self) -> Optional[str]:
+        """Describe the menu items most relevant to the latest user message."""
+        if self._retriever is None or self._retriever.menu is not self.menu_service.menu:
+            # Index the menu once per loaded (or newly scheduled) menu
+            self._retriever = MenuRetriever(self.menu_service.menu)
+
+        question = next((m["content"] for m in reversed(self.conversation_history) if m["role"] == "user"), "")
+        results = self._retriever.search(question, k=config.MENU_CONTEXT_ITEMS)
+        if not results:
+            return None
+        return ("Menu items relevant to the customer's last message (only recommend dishes "
+                "from the menu):\n" + format_menu_context(results))
+
     def _get_ai_response(self) -> str:
         """Get a response from the OpenAI API."""
         try:
+            # Add only the relevant menu items for this request, not the whole menu
+            messages = list(self.conversation_history)
+            menu_context = self._get_menu_context()
+            if menu_context:
+                messages.insert(len(messages) - 1, {"role": "system", "content": menu_context})
+
             response = self.client.chat.completions.create(
                 model=self.model,
-                messages=self.conversation_history,
+                messages=messages,
                 temperature=0.7,
                 max_tokens=500
             )
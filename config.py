@@ -12,3 +12,35 @@ MODEL_NAME = "gpt-4o"
 
 # Application settings
 APP_NAME = "Restaurant Chatbot"
+
+# Reservation storage settings
+RESERVATION_ARCHIVE_DIR = os.getenv("RESERVATION_ARCHIVE_DIR")  # Archive past/cancelled bookings when set
+CHANGE_FEED_DIR = os.getenv("CHANGE_FEED_DIR")  # Log every reservation change here when set
+CHANGE_FEED_SEGMENT_BYTES = int(os.getenv("CHANGE_FEED_SEGMENT_BYTES", str(4 * 1024 * 1024)))  # Size of one feed file
+
+# Multi-location settings
+TENANTS_DIR = os.getenv("TENANTS_DIR", "tenants")  # One subdirectory per location
+TENANT_CACHE_SIZE = int(os.getenv("TENANT_CACHE_SIZE", "8"))  # Locations kept loaded at once
+TENANT_CACHE_MB = int(os.getenv("TENANT_CACHE_MB", "0"))  # Cap on loaded data size in MB (0 = no cap)
+
+# Booking capacity
+SLOT_MINUTES = 30  # Length of a seating slot
+SLOT_CAPACITY = int(os.getenv("SLOT_CAPACITY", "40"))  # Guests that can be seated per slot
+RESERVATION_HOURS = os.getenv("RESERVATION_HOURS", "17:00-22:00")  # First and last bookable slot
+
+# HTTP API settings
+API_HOST = os.getenv("API_HOST", "127.0.0.1")
+API_PORT = int(os.getenv("API_PORT", "8000"))
+API_WORKERS = int(os.getenv("API_WORKERS", "1"))
+REPLICATION_LISTEN = os.getenv("REPLICATION_LISTEN")  # Serve read replicas on this address (leader)
+REPLICATION_LEADER = os.getenv("REPLICATION_LEADER")  # Follow this leader and serve reads only
+
+# Chat settings
+CHAT_WINDOW = int(os.getenv("CHAT_WINDOW", "20"))  # Recent messages rendered live; older ones are paged
+MENU_CONTEXT_ITEMS = int(os.getenv("MENU_CONTEXT_ITEMS", "5"))  # Menu items added to each AI prompt
+
+# Reminder settings
+REMINDER_HOURS = os.getenv("REMINDER_HOURS", "24,2")  # Hours before a booking to send reminders
+NO_SHOW_GRACE_MINUTES = int(os.getenv("NO_SHOW_GRACE_MINUTES", "30"))  # Mark a no-show this long after the booking time
+REMINDER_WORKERS = int(os.getenv("REMINDER_WORKERS", "4"))  # Threads sending messages
+REMINDER_LOG = os.getenv("REMINDER_LOG")  # Append messages to this file instead of printing them
@@ -0,0 +1,142 @@
+import heapq
+from collections import Counter
+from typing import List, Dict, Optional, Tuple, Iterable
+
+from menu_service import MenuService
+from reservation_record import ReservationRecord
+from reservation_service import ReservationService
+
+
+class DishRecommender:
+    """Recommends dishes from reservation pre-orders ("guests who ordered X also ordered Y").
+
+    Keeps a sparse item x item co-occurrence matrix (one Counter row per
+    dish), overall dish popularity and popularity per dietary tag, all
+    updated incrementally from ReservationService change events. After each
+    change only the rows of the dishes involved are re-ranked, so the top-k
+    lists are always precomputed and a lookup is a dictionary read.
+    Archived reservations keep counting, since they are still history: the
+    counts are seeded from the service's archive (if any) at startup, which
+    reads every archive shard once.
+    """
+
+    def __init__(self, reservation_service: ReservationService, menu_service: MenuService, k: int = 5):
+        self.reservation_service = reservation_service
+        self.menu_service = menu_service
+        self.k = k
+
+        self._co_occurrence: Dict[str, Counter] = {}
+        self._popularity: Counter = Counter()
+        self._tag_popularity: Dict[str, Counter] = {}
+        self._counted: Dict[str, Tuple[str, ...]] = {}
+
+        # Precomputed rankings, (dish ID, count) best first
+        self._top_also_ordered: Dict[str, List[Tuple[str, int]]] = {}
+        self._top_by_tag: Dict[str, List[Tuple[str, int]]] = {}
+        self._top_overall: List[Tuple[str, int]] = []
+
+        changed = set()
+        with reservation_service.write_lock:
+            hot_ids = set()
+            for reservation in reservation_service.reservations:
+                hot_ids.add(reservation.id)
+                changed.update(self._count(reservation))
+            if reservation_service.archive is not None:
+                for row in reservation_service.archive.iter_reservations():
+                    if row.get("dish_ids") and row["id"] not in hot_ids:
+                        changed.update(self._count(ReservationRecord.from_dict(row)))
+            self._rerank(changed)
+            reservation_service.add_listener(self._on_change)
+
+    def close(self) -> None:
+        """Stop following reservation changes."""
+        self.reservation_service.remove_listener(self._on_change)
+
+    def _on_change(self, event: str, reservation: ReservationRecord) -> None:
+        """Apply a reservation change to the counts and re-rank the affected dishes."""
+        if event != "archived":
+            self._rerank(self._count(reservation))
+
+    def _tags(self, dish_id: str) -> Iterable[str]:
+        item = self.menu_service.get_item_by_id(dish_id)
+        return [tag.lower() for tag in item["dietary_info"]] if item else []
+
+    def _apply(self, dish_ids: Tuple[str, ...], sign: int) -> None:
+        """Add (sign=1) or remove (sign=-1) one reservation's dishes from the counts."""
+        for dish_id in dish_ids:
+            self._popularity[dish_id] += sign
+            for tag in self._tags(dish_id):
+                self._tag_popularity.setdefault(tag, Counter())[dish_id] += sign
+            row = self._co_occurrence.setdefault(dish_id, Counter())
+            for other in dish_ids:
+                if other != dish_id:
+                    row[other] += sign
+
+    def _count(self, reservation: ReservationRecord) -> Iterable[str]:
+        """Replace a reservation's contribution. Returns the dishes whose counts changed."""
+        previous = self._counted.pop(reservation.id, ())
+        current = ()
+        if reservation.status != "cancelled":
+            current = tuple(dict.fromkeys(reservation.dish_ids))
+        if previous == current:
+            if current:
+                self._counted[reservation.id] = current
+            return ()
+
+        self._apply(previous, -1)
+        self._apply(current, 1)
+        if current:
+            self._counted[reservation.id] = current
+        return set(previous) | set(current)
+
+    def _rerank(self, dish_ids: Iterable[str]) -> None:
+        """Recompute the top-k lists touched by changes to some dishes."""
+        dish_ids = set(dish_ids)
+        if not dish_ids:
+            return
+
+        # A dish's row changes when it, or a dish ordered with it, changes
+        affected = set(dish_ids)
+        for dish_id in dish_ids:
+            affected.update(self._co_occurrence.get(dish_id, ()))
+        for dish_id in affected:
+            self._top_also_ordered[dish_id] = self._top(self._co_occurrence.get(dish_id, Counter()))
+
+        for tag in {tag for dish_id in dish_ids for tag in self._tags(dish_id)}:
+            self._top_by_tag[tag] = self._top(self._tag_popularity.get(tag, Counter()))
+        self._top_overall = self._top(self._popularity)
+
+    def _top(self, counts: Counter) -> List[Tuple[str, int]]:
+        # Keep a few extra so unavailable dishes can be skipped at lookup time
+        return heapq.nsmallest(self.k * 2, ((dish_id, count) for dish_id, count in counts.items() if count > 0),
+                               key=lambda entry: (-entry[1], entry[0]))
+
+    def _available(self, ranking: List[Tuple[str, int]], exclude: Iterable[str] = (), k: Optional[int] = None) -> List[str]:
+        """Take the first k dishes of a ranking that are on the menu and available."""
+        exclude = set(exclude)
+        result = []
+        for dish_id, _ in ranking:
+            item = self.menu_service.get_item_by_id(dish_id)
+            if dish_id not in exclude and item and item.get("available", False):
+                result.append(dish_id)
+                if len(result) == (k or self.k):
+                    break
+        return result
+
+    def also_ordered(self, dish_id: str, k: Optional[int] = None) -> List[str]:
+        """Get the dishes most often pre-ordered together with a dish."""
+        return self._available(self._top_also_ordered.get(dish_id, []), exclude=[dish_id], k=k)
+
+    def recommend_for(self, dish_ids: List[str], k: Optional[int] = None) -> List[str]:
+        """Get dishes to suggest for a selection, merging each selected dish's top list."""
+        scores: Counter = Counter()
+        for dish_id in dish_ids:
+            for other, count in self._top_also_ordered.get(dish_id, []):
+                scores[other] += count
+        ranking = sorted(scores.items(), key=lambda entry: (-entry[1], entry[0]))
+        return self._available(ranking, exclude=dish_ids, k=k)
+
+    def popular(self, tag: Optional[str] = None, k: Optional[int] = None) -> List[str]:
+        """Get the most pre-ordered dishes, overall or with a dietary tag."""
+        ranking = self._top_by_tag.get(tag.lower(), []) if tag else self._top_overall
+        return self._available(ranking, k=k)
@@ -0,0 +1,124 @@
+from collections import Counter
+from datetime import datetime
+from typing import List, Dict, Optional, Tuple, TYPE_CHECKING
+
+from menu_model import Menu
+from menu_service import MenuService
+from reservation_record import ReservationRecord
+
+if TYPE_CHECKING:
+    from reservation_service import ReservationService
+
+
+class DishValidationError(ValueError):
+    """Raised when pre-ordered dishes are unknown, unavailable or sold out."""
+
+    def __init__(self, errors: List[str]):
+        super().__init__("; ".join(errors))
+        self.errors = errors
+
+
+class DishPreorderValidator:
+    """Checks pre-ordered dishes against the menu and the kitchen's daily limits.
+
+    Menu items may set ``daily_portions`` to cap how many reservations can
+    pre-order them on one date; items without it are unlimited. Portions in
+    use are counted per date and kept current from ReservationService change
+    events instead of being recounted for every booking. With a scheduled
+    menu, dishes are checked against the menu served at the reservation's
+    date and time rather than the one being served now.
+    """
+
+    def __init__(self, menu_service: MenuService):
+        self.menu_service = menu_service
+        self._portions: Dict[str, Counter] = {}
+        self._counted: Dict[str, Tuple[str, Tuple[str, ...]]] = {}
+
+    def attach(self, reservation_service: "ReservationService") -> None:
+        """Count the portions already booked and follow further changes."""
+        for reservation in reservation_service.reservations:
+            self._count(reservation)
+        reservation_service.add_listener(self._on_change)
+
+    def _on_change(self, event: str, reservation: ReservationRecord) -> None:
+        """Keep the portion counters in sync with a reservation change."""
+        if event == "archived":
+            self._uncount(reservation.id)
+        else:
+            self._count(reservation)
+
+    def _uncount(self, reservation_id: str) -> None:
+        """Remove a reservation's portions from the counters."""
+        previous = self._counted.pop(reservation_id, None)
+        if previous:
+            date, dish_ids = previous
+            self._portions[date].subtract(dish_ids)
+
+    def _count(self, reservation: ReservationRecord) -> None:
+        """Replace a reservation's portions in the counters."""
+        self._uncount(reservation.id)
+        if reservation.status != "cancelled" and reservation.dish_ids:
+            date = reservation["date"]
+            self._portions.setdefault(date, Counter()).update(reservation.dish_ids)
+            self._counted[reservation.id] = (date, reservation.dish_ids)
+
+    def portions_booked(self, dish_id: str, date: str) -> int:
+        """Get how many reservations have pre-ordered a dish on a date."""
+        return self._portions.get(date, Counter())[dish_id]
+
+    def portions_left(self, dish_id: str, date: str) -> Optional[int]:
+        """Get the remaining portions of a dish on a date (None if unlimited)."""
+        item = self.menu_service.get_item_by_id(dish_id)
+        if not item or item.get("daily_portions") is None:
+            return None
+        return max(0, item["daily_portions"] - self.portions_booked(dish_id, date))
+
+    def _menu_for(self, date: str, time: Optional[str]) -> Menu:
+        """Get the menu served at a reservation (the current one if it has no time or no schedule)."""
+        menu_at = getattr(self.menu_service, "menu_at", None)
+        if menu_at is not None and time:
+            try:
+                return menu_at(datetime.strptime(f"{date} {time}", "%Y-%m-%d %H:%M"))
+            except ValueError:
+                pass
+        return self.menu_service.menu
+
+    def validate(self,
+                 dish_ids: List[str],
+                 date: str,
+                 reservation_id: Optional[str] = None,
+                 pending: Optional[Counter] = None,
+                 time: Optional[str] = None) -> None:
+        """Check that dishes can be pre-ordered for a date (and time, with a scheduled menu).
+
+        Dishes already counted for ``reservation_id`` on that date don't need
+        another portion. ``pending`` holds portions claimed by a batch that
+        hasn't been saved yet. Raises DishValidationError listing every problem.
+        """
+        menu = self._menu_for(date, time)
+        already_counted = ()
+        if reservation_id in self._counted and self._counted[reservation_id][0] == date:
+            already_counted = self._counted[reservation_id][1]
+
+        errors = []
+        for dish_id in dict.fromkeys(dish_ids):
+            item = menu.items_by_id.get(dish_id)
+            if not item:
+                known = self.menu_service.get_item_by_id(dish_id)
+                if known and menu is not self.menu_service.menu:
+                    errors.append(f"{known['name']} is not served at {time} on {date}")
+                else:
+                    errors.append(f"Unknown dish '{dish_id}'")
+            elif not item.get("available", False):
+                errors.append(f"{item['name']} is not available")
+            elif dish_id not in already_counted and item.get("daily_portions") is not None:
+                booked = self.portions_booked(dish_id, date) + (pending or Counter())[dish_id]
+                if booked >= item["daily_portions"]:
+                    errors.append(f"{item['name']} is sold out for pre-orders on {date}")
+
+        if errors:
+            raise DishValidationError(errors)
+
+    def resolve_names(self, dish_ids: List[str]) -> List[str]:
+        """Get the names of several dishes in one call."""
+        return [item["name"] for item in self.menu_service.get_items_by_ids(dish_ids)]
@@ -0,0 +1,257 @@
+from bisect import bisect_left, bisect_right
+from collections.abc import Mapping
+from typing import List, Dict, Any, Iterator, Iterable, Tuple, Optional
+
+# Keys every menu item must have, with their expected types
+ITEM_SCHEMA = {
+    "id": str,
+    "name": str,
+    "description": str,
+    "price": (int, float),
+}
+
+
+class _Frozen:
+    """Mixin that makes instances read-only once built."""
+
+    __slots__ = ()
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+
+class MenuItem(_Frozen, Mapping):
+    """Immutable menu item with precomputed derived fields.
+
+    Besides the fields from menu_data.json it carries lowercased name and
+    description for searching, a set of lowercased dietary tags, the
+    formatted price and a reference to its MenuCategory. It is a read-only
+    mapping with the JSON keys plus "category" (the category name), so it can
+    be shared between callers instead of copied.
+    """
+
+    __slots__ = ("id", "name", "description", "price", "available", "dietary_info",
+                 "category", "name_lower", "description_lower", "dietary_tags",
+                 "price_text", "extra")
+
+    def __init__(self, data: Dict[str, Any], category: "MenuCategory"):
+        for key, expected in ITEM_SCHEMA.items():
+            if not isinstance(data.get(key), expected) or isinstance(data.get(key), bool):
+                raise ValueError(f"Menu item {data.get('id', '?')} has an invalid or missing '{key}'")
+        dietary_info = data.get("dietary_info") or []
+        if not isinstance(dietary_info, list) or not all(isinstance(tag, str) for tag in dietary_info):
+            raise ValueError(f"Menu item {data['id']} has an invalid 'dietary_info'")
+
+        fields = {
+            "id": data["id"],
+            "name": data["name"],
+            "description": data["description"],
+            "price": float(data["price"]),
+            "available": bool(data.get("available", False)),
+            "dietary_info": tuple(dietary_info),
+            "category": category,
+            "name_lower": data["name"].lower(),
+            "description_lower": data["description"].lower(),
+            "dietary_tags": frozenset(tag.lower() for tag in dietary_info),
+            "price_text": f"${float(data['price']):.2f}",
+            # Any other fields (e.g. daily_portions) stay available by key
+            "extra": {key: value for key, value in data.items()
+                      if key not in ITEM_SCHEMA and key not in ("available", "dietary_info", "category")},
+        }
+        for name, value in fields.items():
+            object.__setattr__(self, name, value)
+
+    def _keys(self) -> List[str]:
+        return ["id", "name", "description", "price", "available", *self.extra, "dietary_info", "category"]
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "category":
+            return self.category.name
+        if key in ("id", "name", "description", "price", "available", "dietary_info"):
+            return getattr(self, key)
+        return self.extra[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys())
+
+    def __len__(self) -> int:
+        return len(self._keys())
+
+    def __hash__(self) -> int:
+        return hash(self.id)
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, MenuItem):
+            return self is other
+        return Mapping.__eq__(self, other)
+
+    def __repr__(self) -> str:
+        return f"MenuItem({self.id!r}, {self.name!r})"
+
+
+class MenuCategory(_Frozen):
+    """Immutable menu category holding its items."""
+
+    __slots__ = ("name", "name_lower", "items")
+
+    def __init__(self, data: Dict[str, Any]):
+        if not isinstance(data.get("name"), str):
+            raise ValueError("Menu category is missing a 'name'")
+        object.__setattr__(self, "name", data["name"])
+        object.__setattr__(self, "name_lower", data["name"].lower())
+        object.__setattr__(self, "items", tuple(MenuItem(item, self) for item in data.get("items", [])))
+
+    def __repr__(self) -> str:
+        return f"MenuCategory({self.name!r}, {len(self.items)} items)"
+
+
+class MenuFacets(_Frozen):
+    """Bitset indexes over a menu's items for combined (faceted) filtering.
+
+    Item ``i`` of the menu is bit ``i`` of a Python int. There is one mask
+    per dietary tag, per category and for availability, plus item positions
+    sorted by price with prefix masks, so a price range is two bisects and
+    one AND. A query is a handful of integer ANDs/ORs, and facet counts are
+    popcounts of the result masked with each facet value.
+    """
+
+    __slots__ = ("items", "all_mask", "tag_masks", "category_masks", "category_names",
+                 "available_mask", "sorted_prices", "price_prefix_masks")
+
+    def __init__(self, items: Tuple["MenuItem", ...]):
+        tag_masks: Dict[str, int] = {}
+        category_masks: Dict[str, int] = {}
+        category_names: Dict[str, str] = {}
+        available_mask = 0
+        for position, item in enumerate(items):
+            bit = 1 << position
+            for tag in item.dietary_tags:
+                tag_masks[tag] = tag_masks.get(tag, 0) | bit
+            category = item.category
+            category_masks[category.name_lower] = category_masks.get(category.name_lower, 0) | bit
+            category_names[category.name_lower] = category.name
+            if item.available:
+                available_mask |= bit
+
+        by_price = sorted(range(len(items)), key=lambda position: items[position].price)
+        prefix_masks = [0]
+        for position in by_price:
+            prefix_masks.append(prefix_masks[-1] | (1 << position))
+
+        object.__setattr__(self, "items", items)
+        object.__setattr__(self, "all_mask", (1 << len(items)) - 1)
+        object.__setattr__(self, "tag_masks", tag_masks)
+        object.__setattr__(self, "category_masks", category_masks)
+        object.__setattr__(self, "category_names", category_names)
+        object.__setattr__(self, "available_mask", available_mask)
+        object.__setattr__(self, "sorted_prices", [items[position].price for position in by_price])
+        object.__setattr__(self, "price_prefix_masks", prefix_masks)
+
+    def price_mask(self, min_price: Optional[float] = None, max_price: Optional[float] = None) -> int:
+        """Get the mask of items priced within an inclusive range."""
+        low = bisect_left(self.sorted_prices, min_price) if min_price is not None else 0
+        high = bisect_right(self.sorted_prices, max_price) if max_price is not None else len(self.sorted_prices)
+        if high <= low:
+            return 0
+        return self.price_prefix_masks[high] & ~self.price_prefix_masks[low]
+
+    def filter(self,
+               tags: Iterable[str] = (),
+               categories: Iterable[str] = (),
+               available: Optional[bool] = None,
+               min_price: Optional[float] = None,
+               max_price: Optional[float] = None) -> int:
+        """Get the mask of items having every tag, in any of the categories, and matching availability and price."""
+        mask = self.all_mask
+        for tag in tags:
+            mask &= self.tag_masks.get(tag.lower(), 0)
+        categories = [category.lower() for category in categories]
+        if categories:
+            category_mask = 0
+            for category in categories:
+                category_mask |= self.category_masks.get(category, 0)
+            mask &= category_mask
+        if available is not None:
+            mask &= self.available_mask if available else ~self.available_mask
+        if min_price is not None or max_price is not None:
+            mask &= self.price_mask(min_price, max_price)
+        return mask
+
+    def mask_of(self, items: Iterable["MenuItem"]) -> int:
+        """Get the mask of some of the menu's items."""
+        positions = {id(item): position for position, item in enumerate(self.items)}
+        mask = 0
+        for item in items:
+            position = positions.get(id(item))
+            if position is not None:
+                mask |= 1 << position
+        return mask
+
+    def items_in(self, mask: int) -> List["MenuItem"]:
+        """Get the items in a mask, in menu order."""
+        items = []
+        while mask:
+            lowest = mask & -mask
+            items.append(self.items[lowest.bit_length() - 1])
+            mask ^= lowest
+        return items
+
+    def counts(self, mask: int) -> Dict[str, Dict[str, int]]:
+        """Count the items in a mask per dietary tag, category and availability."""
+        return {
+            "dietary": {tag: count for tag, tag_mask in sorted(self.tag_masks.items())
+                        if (count := bin(mask & tag_mask).count("1"))},
+            "category": {self.category_names[name]: count for name, category_mask in self.category_masks.items()
+                         if (count := bin(mask & category_mask).count("1"))},
+            "available": {
+                "available": bin(mask & self.available_mask).count("1"),
+                "unavailable": bin(mask & ~self.available_mask & self.all_mask).count("1"),
+            },
+        }
+
+
+class Menu(_Frozen):
+    """Immutable, validated menu built once from menu_data.json, with lookup tables."""
+
+    __slots__ = ("date", "categories", "items", "items_by_id", "categories_by_name",
+                 "available_items", "items_by_tag", "facets")
+
+    def __init__(self, data: Dict[str, Any]):
+        if not isinstance(data, dict) or not isinstance(data.get("categories", []), list):
+            raise ValueError("Menu data must be an object with a 'categories' list")
+
+        categories = tuple(MenuCategory(category) for category in data.get("categories", []))
+        items = tuple(item for category in categories for item in category.items)
+
+        items_by_id: Dict[str, MenuItem] = {}
+        for item in items:
+            if item.id in items_by_id:
+                raise ValueError(f"Duplicate menu item ID '{item.id}'")
+            items_by_id[item.id] = item
+
+        items_by_tag: Dict[str, List[MenuItem]] = {}
+        for item in items:
+            for tag in item.dietary_tags:
+                items_by_tag.setdefault(tag, []).append(item)
+
+        object.__setattr__(self, "date", data.get("date", ""))
+        object.__setattr__(self, "categories", categories)
+        object.__setattr__(self, "items", items)
+        object.__setattr__(self, "items_by_id", items_by_id)
+        object.__setattr__(self, "categories_by_name", {c.name_lower: c for c in categories})
+        object.__setattr__(self, "available_items", tuple(item for item in items if item.available))
+        object.__setattr__(self, "items_by_tag", {tag: tuple(tag_items) for tag, tag_items in items_by_tag.items()})
+        object.__setattr__(self, "facets", MenuFacets(items))
+
+    def get_category(self, name: str) -> Optional[MenuCategory]:
+        """Get a category by name (case-insensitive)."""
+        return self.categories_by_name.get(name.lower())
+
+    def search(self, query: str) -> Tuple[MenuItem, ...]:
+        """Get items whose name or description contains the query (case-insensitive)."""
+        query = query.lower()
+        return tuple(item for item in self.items
+                     if query in item.name_lower or query in item.description_lower)
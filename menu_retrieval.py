@@ -0,0 +1,95 @@
+import re
+from typing import List, Dict, Tuple
+
+import numpy as np
+
+from menu_model import Menu, MenuItem
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Words that carry no meaning for matching dishes
+STOP_WORDS = frozenset("""
+a an and any are as at be can could do does for from have i if in is it me my
+of on or our please show some tell than that the there this to want what which
+with would you your
+""".split())
+
+# How much more the dish name counts than its description
+NAME_WEIGHT = 2
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase word tokens, dropping stop words and plural 's'."""
+    tokens = []
+    for token in _TOKEN_PATTERN.findall(text.lower()):
+        if token in STOP_WORDS:
+            continue
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+class MenuRetriever:
+    """BM25 index over a menu's items, built with NumPy when the menu is loaded.
+
+    Each item is indexed by its name (counted NAME_WEIGHT times), description,
+    category and dietary tags. The BM25 weight of every (item, term) pair is
+    precomputed into one matrix, so scoring a question is a column gather and
+    a row sum, and the top matches come from argpartition.
+    """
+
+    def __init__(self, menu: Menu, k1: float = 1.2, b: float = 0.75):
+        self.menu = menu
+        self.items = menu.items
+
+        documents = []
+        for item in self.items:
+            tokens = tokenize(item.name) * NAME_WEIGHT
+            tokens += tokenize(item.description)
+            tokens += tokenize(item.category.name)
+            tokens += tokenize(" ".join(item.dietary_info))
+            documents.append(tokens)
+
+        self.vocabulary: Dict[str, int] = {}
+        for tokens in documents:
+            for token in tokens:
+                self.vocabulary.setdefault(token, len(self.vocabulary))
+
+        term_counts = np.zeros((len(documents), len(self.vocabulary)), dtype=np.float32)
+        for row, tokens in enumerate(documents):
+            for token in tokens:
+                term_counts[row, self.vocabulary[token]] += 1
+
+        lengths = term_counts.sum(axis=1, keepdims=True)
+        average_length = float(lengths.mean()) if len(documents) else 0.0
+        document_frequency = np.count_nonzero(term_counts, axis=0)
+        idf = np.log1p((len(documents) - document_frequency + 0.5) / (document_frequency + 0.5))
+
+        normalization = k1 * (1 - b + b * lengths / max(average_length, 1e-9))
+        self.weights = (idf * term_counts * (k1 + 1) / (term_counts + normalization)).astype(np.float32)
+
+    def search(self, query: str, k: int = 5) -> List[Tuple[MenuItem, float]]:
+        """Get up to k items most relevant to a question, best first, with their scores."""
+        term_ids = [self.vocabulary[token] for token in tokenize(query) if token in self.vocabulary]
+        if not term_ids or not self.items:
+            return []
+
+        scores = self.weights[:, term_ids].sum(axis=1)
+        k = min(k, len(self.items))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(self.items[row], float(scores[row])) for row in top.tolist() if scores[row] > 0]
+
+
+def format_menu_context(results: List[Tuple[MenuItem, float]]) -> str:
+    """Describe retrieved items compactly for a model prompt."""
+    lines = []
+    for item, _ in results:
+        details = [item.price_text, f"ID {item.id}", item.category.name]
+        if item.dietary_info:
+            details.append(", ".join(item.dietary_info))
+        if not item.available:
+            details.append("not available today")
+        lines.append(f"- {item.name} ({'; '.join(details)}): {item.description}")
+    return "\n".join(lines)
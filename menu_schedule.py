@@ -0,0 +1,223 @@
+import threading
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional, Callable, Tuple, FrozenSet
+
+from menu_model import Menu
+from menu_service import MenuService
+
+WEEKDAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+MINUTES_PER_DAY = 24 * 60
+
+
+def _parse_minutes(value: str) -> int:
+    """Convert "HH:MM" to minutes since midnight."""
+    parsed = datetime.strptime(value, "%H:%M")
+    return parsed.hour * 60 + parsed.minute
+
+
+class ServicePeriod:
+    """A named service period (e.g. brunch) on some or all days of the week.
+
+    Periods whose end is before their start run past midnight.
+    """
+
+    def __init__(self, data: Dict[str, Any]):
+        self.name = data["name"]
+        self.start = _parse_minutes(data["start"])
+        self.end = _parse_minutes(data["end"])
+        days = data.get("days") or WEEKDAYS
+        unknown = [day for day in days if day.lower()[:3] not in WEEKDAYS]
+        if unknown:
+            raise ValueError(f"Service period {self.name} has unknown days: {', '.join(unknown)}")
+        self.weekdays = frozenset(WEEKDAYS.index(day.lower()[:3]) for day in days)
+
+    def is_active(self, weekday: int, minute: int) -> bool:
+        """Check whether the period is being served at a minute of a weekday."""
+        if self.start <= self.end:
+            return weekday in self.weekdays and self.start <= minute < self.end
+        # Overnight: the late part belongs to the day the period started
+        if minute >= self.start:
+            return weekday in self.weekdays
+        return minute < self.end and (weekday - 1) % 7 in self.weekdays
+
+
+class ScheduledMenuService(MenuService):
+    """MenuService whose menu follows the time of day.
+
+    The menu file may define ``service_periods`` (e.g. brunch on weekends,
+    lunch, dinner). Categories and items can list the ``periods`` they are
+    served in, and items can set ``available_from``/``available_until`` to
+    be 86'd (shown as unavailable) outside those times. Anything without
+    these fields is always on the menu.
+
+    Rules are not evaluated per call. For each day the service computes the
+    times at which the menu changes and builds one Menu snapshot (with its
+    indexes) per interval; identical intervals share a snapshot. A timer
+    swaps the active snapshot at each boundary, so queries read ``self.menu``
+    exactly as the plain MenuService does.
+    """
+
+    def __init__(self,
+                 menu_file_path: str = "menu_data.json",
+                 clock: Optional[Callable[[], datetime]] = None,
+                 auto_switch: bool = True):
+        self.clock = clock or datetime.now
+        self.auto_switch = auto_switch
+        self.periods: List[ServicePeriod] = []
+        self.active_periods: FrozenSet[str] = frozenset()
+        self._snapshots: Dict[Tuple[FrozenSet[str], FrozenSet[str]], Tuple[Dict[str, Any], Menu]] = {}
+        self._plan_date = None
+        self._plan: List[Tuple[int, FrozenSet[str], Dict[str, Any], Menu]] = []
+        self._active_data: Dict[str, Any] = {}
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+        super().__init__(menu_file_path)
+
+    def _build_menu(self) -> Menu:
+        """Load the schedule and return the snapshot for the current time."""
+        try:
+            self.periods = [ServicePeriod(p) for p in self.menu_data.get("service_periods", [])]
+            self._check_item_times()
+        except (KeyError, TypeError, ValueError) as e:
+            print(f"Error in menu schedule: {e}")
+            self.periods = []
+            return super()._build_menu()
+
+        now = self.clock()
+        self.active_periods, self._active_data, menu = self._snapshot_at(now)
+        if self.auto_switch:
+            self._schedule_switch(now)
+        return menu
+
+    def _check_item_times(self) -> None:
+        """Validate item availability times up front."""
+        for item in self._iter_items():
+            for key in ("available_from", "available_until"):
+                if key in item:
+                    _parse_minutes(item[key])
+
+    def _iter_items(self):
+        for category in self.menu_data.get("categories", []):
+            yield from category.get("items", [])
+
+    def _boundaries(self) -> List[int]:
+        """Get the minutes of a day at which the menu can change."""
+        boundaries = {0}
+        for period in self.periods:
+            boundaries.update((period.start, period.end))
+        for item in self._iter_items():
+            for key in ("available_from", "available_until"):
+                if key in item:
+                    boundaries.add(_parse_minutes(item[key]))
+        return sorted(boundaries)
+
+    def _state_at(self, weekday: int, minute: int) -> Tuple[FrozenSet[str], FrozenSet[str]]:
+        """Get the active periods and the 86'd item IDs at a minute of a weekday."""
+        periods = frozenset(p.name for p in self.periods if p.is_active(weekday, minute))
+        eighty_sixed = set()
+        for item in self._iter_items():
+            start = _parse_minutes(item["available_from"]) if "available_from" in item else 0
+            end = _parse_minutes(item["available_until"]) if "available_until" in item else MINUTES_PER_DAY
+            # A window that ends at or before its start runs past midnight
+            available = start <= minute < end if start < end else minute >= start or minute < end
+            if not available:
+                eighty_sixed.add(item["id"])
+        return periods, frozenset(eighty_sixed)
+
+    def _build_snapshot(self, periods: FrozenSet[str], eighty_sixed: FrozenSet[str]) -> Tuple[Dict[str, Any], Menu]:
+        """Build the menu data and Menu for one schedule state."""
+        def served(entry: Dict[str, Any]) -> bool:
+            return "periods" not in entry or bool(periods.intersection(entry["periods"]))
+
+        categories = []
+        for category in self.menu_data.get("categories", []):
+            if not served(category):
+                continue
+            items = []
+            for item in category.get("items", []):
+                if served(item):
+                    items.append(dict(item, available=False) if item["id"] in eighty_sixed else item)
+            categories.append(dict(category, items=items))
+
+        data = dict(self.menu_data, categories=categories)
+        try:
+            return data, Menu(data)
+        except ValueError as e:
+            print(f"Error in menu data: {e}")
+            data = {"date": self.menu_data.get("date", ""), "categories": []}
+            return data, Menu(data)
+
+    def _build_plan(self, day: datetime) -> List[Tuple[int, FrozenSet[str], Dict[str, Any], Menu]]:
+        """Get (start minute, periods, data, menu) for every interval of a day, building snapshots once."""
+        plan = []
+        previous = None
+        for minute in self._boundaries():
+            if minute >= MINUTES_PER_DAY:
+                continue
+            state = self._state_at(day.weekday(), minute)
+            if state == previous:
+                continue
+            previous = state
+            if state not in self._snapshots:
+                self._snapshots[state] = self._build_snapshot(*state)
+            data, menu = self._snapshots[state]
+            plan.append((minute, state[0], data, menu))
+        return plan
+
+    def _day_plan(self, day: datetime) -> List[Tuple[int, FrozenSet[str], Dict[str, Any], Menu]]:
+        """Get the interval plan for the current day, rebuilding it when the day changes."""
+        if self._plan_date != day.date():
+            self._plan = self._build_plan(day)
+            self._plan_date = day.date()
+        return self._plan
+
+    def _snapshot_at(self, when: datetime, plan: Optional[list] = None) -> Tuple[FrozenSet[str], Dict[str, Any], Menu]:
+        minute = when.hour * 60 + when.minute
+        current = None
+        for entry in plan or self._day_plan(when):
+            if entry[0] > minute:
+                break
+            current = entry
+        _, periods, data, menu = current
+        return periods, data, menu
+
+    def menu_at(self, when: datetime) -> Menu:
+        """Get the menu served at a given date and time (e.g. for a reservation)."""
+        with self._lock:
+            plan = self._plan if self._plan_date == when.date() else self._build_plan(when)
+            return self._snapshot_at(when, plan)[2]
+
+    def _next_boundary(self, now: datetime) -> datetime:
+        """Get the time of the next menu change after now (at the latest, midnight)."""
+        minute = now.hour * 60 + now.minute
+        midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+        for start, *_ in self._day_plan(now):
+            if start > minute:
+                return midnight - timedelta(minutes=MINUTES_PER_DAY - start)
+        return midnight
+
+    def _schedule_switch(self, now: datetime) -> None:
+        delay = max(0.0, (self._next_boundary(now) - now).total_seconds())
+        self._timer = threading.Timer(delay, self._switch)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _switch(self) -> None:
+        """Activate the snapshot for the current time and wait for the next boundary."""
+        with self._lock:
+            if self._timer is None:
+                return
+            now = self.clock()
+            self.active_periods, self._active_data, self.menu = self._snapshot_at(now)
+            self._schedule_switch(now)
+
+    def close(self) -> None:
+        """Stop switching menus."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+    def get_full_menu(self) -> Dict[str, Any]:
+        """Get the menu currently being served."""
+        return self._active_data
@@ -1,20 +1,29 @@
-import json
 from typing import List, Dict, Any, Optional
+import serialization
+from menu_model import Menu, MenuItem
 
 class MenuService:
     def __init__(self, menu_file_path: str = "menu_data.json"):
         self.menu_file_path = menu_file_path
         self.menu_data = self._load_menu_data()
+        self.menu = self._build_menu()
     
     def _load_menu_data(self) -> Dict[str, Any]:
         """Load menu data from JSON file."""
         try:
-            with open(self.menu_file_path, 'r') as file:
-                return json.load(file)
+            return serialization.load_file(self.menu_file_path)
         except Exception as e:
             print(f"Error loading menu data: {e}")
             return {"date": "", "categories": []}
     
+    def _build_menu(self) -> Menu:
+        """Build the typed, validated menu model from the raw menu data."""
+        try:
+            return Menu(self.menu_data)
+        except ValueError as e:
+            print(f"Error in menu data: {e}")
+            return Menu({"date": "", "categories": []})
+    
     def get_full_menu(self) -> Dict[str, Any]:
         """Get the complete menu."""
         return self.menu_data
@@ -25,66 +34,50 @@ class MenuService:
     
     def get_categories(self) -> List[str]:
         """Get all menu categories."""
-        return [category["name"] for category in self.menu_data.get("categories", [])]
+        return [category.name for category in self.menu.categories]
     
-    def get_items_by_category(self, category_name: str) -> List[Dict[str, Any]]:
+    def get_items_by_category(self, category_name: str) -> List[MenuItem]:
         """Get all items in a specific category."""
-        for category in self.menu_data.get("categories", []):
-            if category["name"].lower() == category_name.lower():
-                return category.get("items", [])
-        return []
+        category = self.menu.get_category(category_name)
+        return list(category.items) if category else []
     
-    def search_items(self, query: str) -> List[Dict[str, Any]]:
+    def search_items(self, query: str) -> List[MenuItem]:
         """Search for menu items by name or description."""
-        results = []
-        query = query.lower()
-        
-        for category in self.menu_data.get("categories", []):
-            for item in category.get("items", []):
-                if (query in item["name"].lower() or 
-                    query in item["description"].lower()):
-                    # Add category name to the item for context
-                    item_with_category = item.copy()
-                    item_with_category["category"] = category["name"]
-                    results.append(item_with_category)
-        
-        return results
+        return list(self.menu.search(query))
     
-    def get_item_by_id(self, item_id: str) -> Optional[Dict[str, Any]]:
+    def get_item_by_id(self, item_id: str) -> Optional[MenuItem]:
         """Get a specific menu item by ID."""
-        for category in self.menu_data.get("categories", []):
-            for item in category.get("items", []):
-                if item["id"] == item_id:
-                    # Add category name to the item for context
-                    item_with_category = item.copy()
-                    item_with_category["category"] = category["name"]
-                    return item_with_category
-        return None
+        return self.menu.items_by_id.get(item_id)
+
+    def get_items_by_ids(self, item_ids: List[str]) -> List[MenuItem]:
+        """Get several menu items by ID in one call, skipping unknown IDs."""
+        items_by_id = self.menu.items_by_id
+        return [items_by_id[item_id] for item_id in item_ids if item_id in items_by_id]
     
-    def get_available_items(self) -> List[Dict[str, Any]]:
+    def get_available_items(self) -> List[MenuItem]:
         """Get all available menu items."""
-        available_items = []
-        
-        for category in self.menu_data.get("categories", []):
-            for item in category.get("items", []):
-                if item.get("available", False):
-                    # Add category name to the item for context
-                    item_with_category = item.copy()
-                    item_with_category["category"] = category["name"]
-                    available_items.append(item_with_category)
-        
-        return available_items
+        return list(self.menu.available_items)
     
-    def get_items_by_dietary_preference(self, preference: str) -> List[Dict[str, Any]]:
+    def get_items_by_dietary_preference(self, preference: str) -> List[MenuItem]:
         """Get items matching a dietary preference."""
-        matching_items = []
-        
-        for category in self.menu_data.get("categories", []):
-            for item in category.get("items", []):
-                if preference.lower() in [p.lower() for p in item.get("dietary_info", [])]:
-                    # Add category name to the item for context
-                    item_with_category = item.copy()
-                    item_with_category["category"] = category["name"]
-                    matching_items.append(item_with_category)
-        
-        return matching_items
+        return list(self.menu.items_by_tag.get(preference.lower(), ()))
+
+    def query_items(self,
+                    dietary: Optional[List[str]] = None,
+                    categories: Optional[List[str]] = None,
+                    available: Optional[bool] = None,
+                    min_price: Optional[float] = None,
+                    max_price: Optional[float] = None,
+                    search: Optional[str] = None) -> Dict[str, Any]:
+        """Get items matching several filters at once, with facet counts.
+
+        Items must have every dietary tag, be in any of the categories, match
+        the availability and price range (inclusive) and, if given, the search
+        text. Returns {"items": [...], "facets": {"dietary": ..., "category":
+        ..., "available": ...}} where the facets count the matching items.
+        """
+        facets = self.menu.facets
+        mask = facets.filter(dietary or (), categories or (), available, min_price, max_price)
+        if search:
+            mask &= facets.mask_of(self.menu.search(search))
+        return {"items": facets.items_in(mask), "facets": facets.counts(mask)}
@@ -0,0 +1,280 @@
+import heapq
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import List, Dict, Optional, Callable, Iterable, Tuple
+
+import config
+import serialization
+from reservation_record import ReservationRecord
+from reservation_service import ReservationService
+
+
+class Notifier(ABC):
+    """Destination for confirmation, reminder and no-show messages."""
+
+    @abstractmethod
+    def send(self, kind: str, reservation: ReservationRecord, message: str) -> None:
+        """Deliver one message about a reservation."""
+
+
+class StdoutNotifier(Notifier):
+    """Prints messages instead of delivering them."""
+
+    def send(self, kind: str, reservation: ReservationRecord, message: str) -> None:
+        print(f"[{kind}] to {reservation['contact_info']}: {message}")
+
+
+class FileNotifier(Notifier):
+    """Appends messages to a file as JSON lines, e.g. for a mailer to pick up."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def send(self, kind: str, reservation: ReservationRecord, message: str) -> None:
+        line = serialization.dumps({
+            "sent_at": datetime.now().isoformat(),
+            "kind": kind,
+            "reservation_id": reservation["id"],
+            "contact_info": reservation["contact_info"],
+            "message": message,
+        })
+        with self._lock:
+            with open(self.path, "ab") as file:
+                file.write(line + b"\n")
+
+
+def parse_reminder_hours(value: str) -> List[float]:
+    """Parse a comma-separated list of hours before a booking, e.g. "24,2"."""
+    return [float(hours) for hours in value.split(",") if hours.strip()]
+
+
+class ReminderScheduler:
+    """Sends confirmations and reminders for reservations and marks no-shows.
+
+    Upcoming deadlines (a reminder ``hours`` before each booking for every
+    entry of ``reminder_hours``, and a no-show check ``no_show_grace``
+    minutes after it) are kept in one min-heap, maintained from
+    ReservationService change events, so nothing is ever rescanned. When a
+    booking moves or is cancelled its old deadlines are not searched for:
+    the reservation's version is bumped and stale heap entries are dropped
+    when they come up. A single timer thread sleeps until the earliest
+    deadline; messages are handed to a bounded pool of sender threads.
+
+    New bookings get a confirmation straight away; rows added by
+    bulk_create ("imported" events) are scheduled without one, so a
+    migration doesn't message every imported guest.
+
+    A reservation whose status is still "confirmed" when its no-show check
+    comes up is marked "no_show"; hosts record arrivals by changing the
+    status (e.g. to "seated"). Deadlines that have already passed when a
+    booking is loaded or changed are skipped.
+    """
+
+    def __init__(self,
+                 reservation_service: ReservationService,
+                 notifiers: Optional[List[Notifier]] = None,
+                 reminder_hours: Iterable[float] = parse_reminder_hours(config.REMINDER_HOURS),
+                 no_show_grace: int = config.NO_SHOW_GRACE_MINUTES,
+                 max_workers: int = config.REMINDER_WORKERS,
+                 clock: Optional[Callable[[], datetime]] = None,
+                 start: bool = True):
+        self.reservation_service = reservation_service
+        if notifiers is None:
+            notifiers = [FileNotifier(config.REMINDER_LOG)] if config.REMINDER_LOG else [StdoutNotifier()]
+        self.notifiers = notifiers
+        self.reminder_hours = sorted(reminder_hours, reverse=True)
+        self.no_show_grace = no_show_grace
+        self.clock = clock or datetime.now
+
+        # (due, sequence, reservation ID, kind, version); confirmations carry
+        # no version since they stay valid however the booking changes
+        self._heap: List[Tuple[datetime, int, str, str, Optional[int]]] = []
+        self._sequence = 0
+        # Reservation ID -> ((date, time, status), version, live heap entries)
+        self._scheduled: Dict[str, Tuple[Tuple[str, str, str], int, int]] = {}
+        self._live = 0
+        self._cond = threading.Condition()
+        self._changed = False
+        self._closed = False
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="reminder")
+        # Bounds messages queued for the senders, so a burst of due reminders
+        # holds up the timer thread instead of piling up in memory
+        self._send_slots = threading.BoundedSemaphore(max_workers * 4)
+
+        now = self.clock()
+        with self._cond:
+            for reservation in reservation_service.reservations:
+                self._schedule(reservation, now)
+        reservation_service.add_listener(self._on_change)
+
+        self._thread: Optional[threading.Thread] = None
+        if start:
+            self._thread = threading.Thread(target=self._run, name="reminder-scheduler", daemon=True)
+            self._thread.start()
+
+    def close(self) -> None:
+        """Stop the timer thread and wait for queued messages to be sent."""
+        self.reservation_service.remove_listener(self._on_change)
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join()
+        self._executor.shutdown(wait=True)
+
+    def __len__(self) -> int:
+        """Number of pending deadlines."""
+        return self._live
+
+    def _push(self, due: datetime, reservation_id: str, kind: str, version: Optional[int]) -> None:
+        self._sequence += 1
+        heapq.heappush(self._heap, (due, self._sequence, reservation_id, kind, version))
+        self._changed = True
+
+    def _unschedule(self, reservation_id: str) -> None:
+        """Invalidate a reservation's deadlines. Must be called with the lock held."""
+        scheduled = self._scheduled.pop(reservation_id, None)
+        if scheduled is not None:
+            self._live -= scheduled[2]
+
+    def _schedule(self, reservation: ReservationRecord, now: datetime) -> None:
+        """(Re)schedule a reservation's deadlines if its time or status changed.
+
+        Must be called with the lock held.
+        """
+        key = (reservation["date"], reservation["time"], reservation.status)
+        previous = self._scheduled.get(reservation.id)
+        if previous is not None and previous[0] == key:
+            return
+        self._unschedule(reservation.id)
+        version = previous[1] + 1 if previous is not None else 0
+
+        count = 0
+        if reservation.status == "confirmed":
+            try:
+                start = datetime.strptime(f"{key[0]} {key[1]}", "%Y-%m-%d %H:%M")
+            except ValueError:
+                start = None
+            if start is not None:
+                deadlines = [(start - timedelta(hours=hours), "reminder") for hours in self.reminder_hours]
+                deadlines.append((start + timedelta(minutes=self.no_show_grace), "no_show"))
+                for due, kind in deadlines:
+                    if due > now:
+                        self._push(due, reservation.id, kind, version)
+                        count += 1
+
+        self._scheduled[reservation.id] = (key, version, count)
+        self._live += count
+        self._compact()
+
+    def _compact(self) -> None:
+        """Rebuild the heap once stale entries outnumber live ones."""
+        if len(self._heap) > 2 * self._live + 64:
+            self._heap = [entry for entry in self._heap if self._is_live(entry)]
+            heapq.heapify(self._heap)
+
+    def _is_live(self, entry: Tuple[datetime, int, str, str, Optional[int]]) -> bool:
+        _, _, reservation_id, _, version = entry
+        if version is None:
+            return True
+        scheduled = self._scheduled.get(reservation_id)
+        return scheduled is not None and scheduled[1] == version
+
+    def _on_change(self, event: str, reservation: ReservationRecord) -> None:
+        """Keep deadlines in step with reservation changes."""
+        with self._cond:
+            if event == "archived":
+                self._unschedule(reservation.id)
+            else:
+                if event == "created" and reservation.status == "confirmed":
+                    self._push(self.clock(), reservation.id, "confirmation", None)
+                self._schedule(reservation, self.clock())
+            if self._changed:
+                self._cond.notify()
+
+    def run_pending(self) -> int:
+        """Handle every deadline that is due now. Returns how many were handled."""
+        due = []
+        with self._cond:
+            now = self.clock()
+            while self._heap and self._heap[0][0] <= now:
+                entry = heapq.heappop(self._heap)
+                if not self._is_live(entry):
+                    continue
+                if entry[4] is not None:
+                    key, version, count = self._scheduled[entry[2]]
+                    self._scheduled[entry[2]] = (key, version, count - 1)
+                    self._live -= 1
+                due.append(entry)
+
+        for _, _, reservation_id, kind, _ in due:
+            if kind == "no_show":
+                self._mark_no_show(reservation_id)
+            else:
+                self._dispatch(kind, reservation_id)
+        return len(due)
+
+    def _next_delay(self) -> Optional[float]:
+        """Seconds until the earliest deadline, or None when there is none."""
+        if not self._heap:
+            return None
+        return max(0.0, (self._heap[0][0] - self.clock()).total_seconds())
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                self._changed = False
+            self.run_pending()
+            with self._cond:
+                if self._closed:
+                    return
+                self._cond.wait_for(lambda: self._changed or self._closed, timeout=self._next_delay())
+
+    def _mark_no_show(self, reservation_id: str) -> None:
+        reservation = self.reservation_service.get_reservation(reservation_id)
+        if reservation is None or reservation.status != "confirmed":
+            return
+        try:
+            updated = self.reservation_service.update_reservation(reservation_id, {"status": "no_show"})
+        except Exception as e:
+            print(f"Error marking reservation {reservation_id} as no-show: {e}")
+            return
+        if updated is not None:
+            self._submit("no_show", updated)
+
+    def _dispatch(self, kind: str, reservation_id: str) -> None:
+        reservation = self.reservation_service.get_reservation(reservation_id)
+        if reservation is not None and reservation.status == "confirmed":
+            self._submit(kind, reservation)
+
+    def _submit(self, kind: str, reservation: ReservationRecord) -> None:
+        """Queue a message for the sender threads, waiting while they are backed up."""
+        self._send_slots.acquire()
+        try:
+            future = self._executor.submit(self._send, kind, reservation, self.format_message(kind, reservation))
+        except RuntimeError:
+            # The executor has been shut down
+            self._send_slots.release()
+            return
+        future.add_done_callback(lambda _: self._send_slots.release())
+
+    def _send(self, kind: str, reservation: ReservationRecord, message: str) -> None:
+        for notifier in self.notifiers:
+            try:
+                notifier.send(kind, reservation, message)
+            except Exception as e:
+                print(f"Error sending {kind} for reservation {reservation.id}: {e}")
+
+    def format_message(self, kind: str, reservation: ReservationRecord) -> str:
+        """Get the text of a message about a reservation."""
+        booking = (f"your table for {reservation['party_size']} on {reservation['date']} "
+                   f"at {reservation['time']} (reservation {reservation.id})")
+        if kind == "confirmation":
+            return f"Hi {reservation['customer_name']}, {booking} is confirmed."
+        if kind == "no_show":
+            return f"We missed you, {reservation['customer_name']}: {booking} was marked as a no-show."
+        return f"Hi {reservation['customer_name']}, a reminder of {booking}. We look forward to seeing you!"
@@ -0,0 +1,310 @@
+import argparse
+import os
+import socket
+import socketserver
+import threading
+import time
+from typing import List, Dict, Any, Optional, Callable, Tuple
+
+import serialization
+from change_feed import ChangeFeed
+from reservation_record import ReservationRecord
+from reservation_service import ReservationService, ReservationState
+
+# Seconds between heartbeats on an idle connection; a follower that hears
+# nothing for three of them reconnects
+HEARTBEAT_INTERVAL = 5.0
+
+
+class ReadOnlyReplicaError(RuntimeError):
+    """Raised when a change is attempted on a read replica."""
+
+
+def parse_address(address: str) -> Tuple[int, Any]:
+    """Parse "host:port" (TCP) or a filesystem path (Unix socket) into a family and address."""
+    if "/" in address or address.endswith(".sock"):
+        return socket.AF_UNIX, address
+    host, _, port = address.rpartition(":")
+    return socket.AF_INET, (host or "127.0.0.1", int(port))
+
+
+def service_snapshot(reservation_service: ReservationService,
+                     change_feed: ChangeFeed) -> Callable[[], Tuple[List[Dict[str, Any]], int]]:
+    """Make a snapshot function for a leader whose writes all go through one service.
+
+    The reservations and the feed position are read under the service's
+    write lock, so the snapshot is exactly the state after that change.
+    """
+    def snapshot() -> Tuple[List[Dict[str, Any]], int]:
+        with reservation_service.write_lock:
+            return [r.to_dict() for r in reservation_service.reservations], change_feed.latest_sequence()
+    return snapshot
+
+
+class _FollowerHandler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        self.server.leader._serve_follower(self.rfile, self.wfile)
+
+
+class _TCPServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+class _UnixServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+
+class ReplicationLeader:
+    """Streams the reservation change feed to follower processes over a socket.
+
+    A follower sends the last sequence number it has applied. If the feed
+    still holds everything after it, the leader streams from there;
+    otherwise (a new follower, or one that fell behind the retained
+    segments) it first sends a full snapshot tagged with the sequence
+    number it corresponds to. New changes are picked up by polling the feed,
+    so they may come from any process appending to it.
+    """
+
+    def __init__(self,
+                 address: str,
+                 change_feed: ChangeFeed,
+                 snapshot: Callable[[], Tuple[List[Dict[str, Any]], int]],
+                 poll_interval: float = 0.05):
+        self.address = address
+        self.change_feed = change_feed
+        self.snapshot = snapshot
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+
+        family, bind_address = parse_address(address)
+        if family == socket.AF_UNIX:
+            if os.path.exists(bind_address):
+                os.remove(bind_address)
+            server_class = _UnixServer
+        else:
+            server_class = _TCPServer
+        self._server = server_class(bind_address, _FollowerHandler)
+        self._server.leader = self
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Accept followers on a background thread."""
+        self._thread = threading.Thread(target=self._server.serve_forever, name="replication-leader", daemon=True)
+        self._thread.start()
+
+    def serve_forever(self) -> None:
+        """Accept followers on the calling thread until closed."""
+        self._server.serve_forever()
+
+    def close(self) -> None:
+        """Stop accepting followers and end their streams."""
+        self._stop.set()
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+        family, bind_address = parse_address(self.address)
+        if family == socket.AF_UNIX and os.path.exists(bind_address):
+            os.remove(bind_address)
+
+    def _serve_follower(self, rfile, wfile) -> None:
+        def send(message: Dict[str, Any]) -> None:
+            wfile.write(serialization.dumps(message) + b"\n")
+            wfile.flush()
+
+        try:
+            hello = serialization.loads(rfile.readline() or b"{}")
+            after = int(hello.get("after", 0))
+            latest = self.change_feed.latest_sequence()
+            position = None
+            if after <= 0 or after > latest or after + 1 < self.change_feed.first_sequence:
+                rows, after = self.snapshot()
+                send({"snapshot": rows, "seq": after})
+
+            last_sent = time.monotonic()
+            while not self._stop.is_set():
+                changes, position = self.change_feed.read_batch(after, position, 1000)
+                if changes and changes[0]["seq"] != after + 1:
+                    # The changes this follower needs were dropped; start it over
+                    rows, after = self.snapshot()
+                    send({"snapshot": rows, "seq": after})
+                    position = None
+                    continue
+
+                for change in changes:
+                    send(change)
+                    after = change["seq"]
+                now = time.monotonic()
+                if changes:
+                    last_sent = now
+                elif now - last_sent >= HEARTBEAT_INTERVAL:
+                    send({"heartbeat": True, "seq": after})
+                    last_sent = now
+                else:
+                    self._stop.wait(self.poll_interval)
+        except (OSError, ValueError):
+            # The follower went away; it reconnects with its last sequence
+            pass
+
+
+class ReservationReplica(ReservationService):
+    """Read-only ReservationService kept in step with a ReplicationLeader.
+
+    All the read methods work as usual against the in-memory replica, which
+    is updated copy-on-write so readers never see a half-applied change.
+    Writes raise ReadOnlyReplicaError and must go to the leader. After a
+    lost connection the replica reconnects and resumes from the last
+    sequence number it applied.
+    """
+
+    def __init__(self,
+                 leader_address: str,
+                 archive_dir: Optional[str] = None,
+                 reconnect_interval: float = 1.0,
+                 start: bool = True):
+        self.leader_address = leader_address
+        self.reconnect_interval = reconnect_interval
+        self.sequence = 0
+        self.connected = False
+        self._applying = False
+        self._applied = threading.Condition()
+        self._stop = threading.Event()
+        self._socket: Optional[socket.socket] = None
+        # Nothing is kept on disk; the leader owns the store
+        super().__init__(reservation_file_path=None, archive_dir=archive_dir, thread_safe=True)
+
+        self._thread: Optional[threading.Thread] = None
+        if start:
+            self._thread = threading.Thread(target=self._run, name="reservation-replica", daemon=True)
+            self._thread.start()
+
+    def _begin_write(self, batch: bool = False) -> ReservationState:
+        if not self._applying:
+            raise ReadOnlyReplicaError("Reservations are read-only on a replica; send changes to the leader")
+        return super()._begin_write(batch)
+
+    def archive_reservations(self, before: Optional[str] = None) -> int:
+        # The leader archives and sends an "archived" change for each reservation
+        return 0
+
+    def close(self) -> None:
+        """Disconnect from the leader."""
+        self._stop.set()
+        sock = self._socket
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        super().close()
+
+    def wait_for(self, sequence: int, timeout: Optional[float] = None) -> bool:
+        """Wait until the replica has applied a change. Returns False on timeout."""
+        with self._applied:
+            return self._applied.wait_for(lambda: self.sequence >= sequence, timeout=timeout)
+
+    def _run(self) -> None:
+        reported = False
+        while not self._stop.is_set():
+            try:
+                self._follow()
+                reported = False
+            except (OSError, ValueError) as e:
+                if self.connected or not reported:
+                    print(f"Error following leader {self.leader_address}: {e}")
+                    reported = True
+            finally:
+                self.connected = False
+                self._socket = None
+            self._stop.wait(self.reconnect_interval)
+
+    def _follow(self) -> None:
+        """Connect to the leader and apply its changes until the connection ends."""
+        family, address = parse_address(self.leader_address)
+        with socket.socket(family, socket.SOCK_STREAM) as sock:
+            sock.settimeout(HEARTBEAT_INTERVAL * 3)
+            sock.connect(address)
+            self._socket = sock
+            if self._stop.is_set():
+                return
+            sock.sendall(serialization.dumps({"after": self.sequence}) + b"\n")
+            self.connected = True
+
+            with sock.makefile('rb') as reader:
+                for line in reader:
+                    message = serialization.loads(line)
+                    if "snapshot" in message:
+                        self._load_snapshot(message["snapshot"], message["seq"])
+                    elif "reservation" in message:
+                        self._apply(message)
+
+    def _load_snapshot(self, rows: List[Dict[str, Any]], sequence: int) -> None:
+        state = ReservationState([ReservationRecord.from_dict(row) for row in rows])
+        with self.write_lock:
+            self._rebuild_indexes(state)
+            self._state = state
+            self._set_sequence(sequence)
+
+    def _apply(self, change: Dict[str, Any]) -> None:
+        """Apply one change from the leader and notify listeners."""
+        reservation = ReservationRecord.from_dict(change["reservation"])
+        with self.write_lock:
+            self._applying = True
+            try:
+                state = self._begin_write()
+            finally:
+                self._applying = False
+            position = state.id_index.get(reservation.id)
+            if change["event"] == "archived":
+                # The leader dropped it from its hot set, so drop it here too
+                if position is not None:
+                    self._remove_reservation(state, position)
+            elif position is None:
+                self._add_reservation(state, reservation)
+            else:
+                previous = state.reservations[position]
+                state.reservations[position] = reservation
+                if previous.contact_info != reservation.contact_info:
+                    self._unindex_contact(state, previous)
+                    self._index_contact(state, reservation)
+            self._state = state
+            self._set_sequence(change["seq"])
+            self._dispatch(change["event"], [reservation])
+
+    def _remove_reservation(self, state: ReservationState, position: int) -> None:
+        """Remove the reservation at a position from the list and indexes."""
+        reservation = state.reservations.pop(position)
+        del state.id_index[reservation.id]
+        for moved in state.reservations[position:]:
+            state.id_index[moved.id] -= 1
+        self._unindex_contact(state, reservation)
+
+    def _set_sequence(self, sequence: int) -> None:
+        with self._applied:
+            self.sequence = sequence
+            self._applied.notify_all()
+
+
+def main():
+    """Follow a leader and print each change as it is applied."""
+    parser = argparse.ArgumentParser(description="Follow a reservation replication leader.")
+    parser.add_argument("leader", help="Leader address (host:port or Unix socket path)")
+    args = parser.parse_args()
+
+    replica = ReservationReplica(args.leader)
+    replica.add_listener(lambda event, reservation: print(
+        f"{replica.sequence:>8} {event:<10} {reservation.id} {reservation['date']} "
+        f"{reservation['time']} {reservation.status} ({len(replica.reservations)} reservations)"))
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        replica.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+import argparse
+from datetime import date as date_type
+from typing import List, Dict, Optional
+
+import numpy as np
+
+from reservation_record import ReservationRecord
+from reservation_service import ReservationService
+
+# Statuses that don't count as covers
+INACTIVE_STATUSES = ("cancelled",)
+
+
+class ReservationAnalytics:
+    """Column-oriented view of reservations for kitchen planning.
+
+    Reservations are kept as NumPy columns (date ordinal, time slot, party
+    size, status code) with one row per reservation, plus a flat pair of
+    columns (row, dish code) for pre-ordered dishes. Aggregations are
+    vectorized over those arrays. The columns are updated incrementally from
+    ReservationService change events, so there is no need to rebuild them
+    after each booking; archived reservations keep their rows.
+    """
+
+    def __init__(self, reservation_service: ReservationService, slot_minutes: int = 30):
+        self.reservation_service = reservation_service
+        self.slot_minutes = slot_minutes
+
+        # Row storage (grown by doubling)
+        self._size = 0
+        self._capacity = 0
+        self._dates = np.empty(0, dtype=np.int32)
+        self._slots = np.empty(0, dtype=np.int16)
+        self._party_sizes = np.empty(0, dtype=np.int16)
+        self._statuses = np.empty(0, dtype=np.int8)
+        self._rows: Dict[str, int] = {}
+
+        # Pre-ordered dishes as (row, dish code) pairs; stale pairs are masked out
+        self._dish_size = 0
+        self._dish_rows = np.empty(0, dtype=np.int32)
+        self._dish_codes = np.empty(0, dtype=np.int32)
+        self._dish_live = np.empty(0, dtype=bool)
+        self._dish_entries: Dict[int, List[int]] = {}
+
+        # Code tables for categorical columns
+        self._status_codes: Dict[str, int] = {}
+        self._dish_code_table: Dict[str, int] = {}
+        self._dish_ids: List[str] = []
+
+        for reservation in reservation_service.reservations:
+            self._upsert(reservation)
+        reservation_service.add_listener(self._on_change)
+
+    def close(self) -> None:
+        """Stop following reservation changes."""
+        self.reservation_service.remove_listener(self._on_change)
+
+    def _on_change(self, event: str, reservation: ReservationRecord) -> None:
+        """Apply a reservation change event to the columns."""
+        self._upsert(reservation)
+
+    def _status_code(self, status: str) -> int:
+        if status not in self._status_codes:
+            self._status_codes[status] = len(self._status_codes)
+        return self._status_codes[status]
+
+    def _dish_code(self, dish_id: str) -> int:
+        if dish_id not in self._dish_code_table:
+            self._dish_code_table[dish_id] = len(self._dish_ids)
+            self._dish_ids.append(dish_id)
+        return self._dish_code_table[dish_id]
+
+    def _grow_rows(self) -> None:
+        """Double the row capacity of every column."""
+        self._capacity = max(1024, self._capacity * 2)
+        for name in ("_dates", "_slots", "_party_sizes", "_statuses"):
+            column = getattr(self, name)
+            grown = np.zeros(self._capacity, dtype=column.dtype)
+            grown[:self._size] = column[:self._size]
+            setattr(self, name, grown)
+
+    def _grow_dishes(self, extra: int) -> None:
+        """Make room for extra dish pairs, dropping stale pairs and doubling capacity."""
+        live = self._dish_live[:self._dish_size]
+        rows = self._dish_rows[:self._dish_size][live]
+        codes = self._dish_codes[:self._dish_size][live]
+        capacity = max(1024, (len(rows) + extra) * 2)
+
+        self._dish_rows = np.zeros(capacity, dtype=np.int32)
+        self._dish_codes = np.zeros(capacity, dtype=np.int32)
+        self._dish_live = np.zeros(capacity, dtype=bool)
+        self._dish_size = len(rows)
+        self._dish_rows[:self._dish_size] = rows
+        self._dish_codes[:self._dish_size] = codes
+        self._dish_live[:self._dish_size] = True
+
+        self._dish_entries = {}
+        for entry, row in enumerate(rows.tolist()):
+            self._dish_entries.setdefault(row, []).append(entry)
+
+    def _upsert(self, reservation: ReservationRecord) -> None:
+        """Insert or overwrite the row for a reservation."""
+        row = self._rows.get(reservation.id)
+        if row is None:
+            if self._size == self._capacity:
+                self._grow_rows()
+            row = self._size
+            self._size += 1
+            self._rows[reservation.id] = row
+
+        date_ordinal = reservation.date_ordinal
+        time_minutes = reservation.time_minutes
+        self._dates[row] = date_ordinal if isinstance(date_ordinal, int) else -1
+        self._slots[row] = time_minutes // self.slot_minutes if isinstance(time_minutes, int) else -1
+        self._party_sizes[row] = reservation.party_size
+        self._statuses[row] = self._status_code(reservation.status)
+
+        # Replace the row's dishes
+        for entry in self._dish_entries.pop(row, []):
+            self._dish_live[entry] = False
+        if reservation.dish_ids:
+            if self._dish_size + len(reservation.dish_ids) > len(self._dish_live):
+                self._grow_dishes(len(reservation.dish_ids))
+            entries = []
+            for dish_id in reservation.dish_ids:
+                entry = self._dish_size
+                self._dish_rows[entry] = row
+                self._dish_codes[entry] = self._dish_code(dish_id)
+                self._dish_live[entry] = True
+                self._dish_size += 1
+                entries.append(entry)
+            self._dish_entries[row] = entries
+
+    def _active_mask(self) -> np.ndarray:
+        """Mask of rows whose status counts towards covers."""
+        statuses = self._statuses[:self._size]
+        inactive = [self._status_codes[s] for s in INACTIVE_STATUSES if s in self._status_codes]
+        return ~np.isin(statuses, inactive)
+
+    def _date_mask(self, date: Optional[str] = None,
+                   start_date: Optional[str] = None, end_date: Optional[str] = None) -> np.ndarray:
+        """Mask of rows on a date or within an inclusive date range."""
+        dates = self._dates[:self._size]
+        mask = dates >= 0
+        if date:
+            mask &= dates == date_type.fromisoformat(date).toordinal()
+        if start_date:
+            mask &= dates >= date_type.fromisoformat(start_date).toordinal()
+        if end_date:
+            mask &= dates <= date_type.fromisoformat(end_date).toordinal()
+        return mask
+
+    def covers_per_slot(self, date: str) -> Dict[str, int]:
+        """Get the number of guests (covers) per time slot on a date."""
+        mask = self._active_mask() & self._date_mask(date) & (self._slots[:self._size] >= 0)
+        slots = self._slots[:self._size][mask]
+        covers = np.bincount(slots, weights=self._party_sizes[:self._size][mask])
+
+        result = {}
+        for slot in np.flatnonzero(covers).tolist():
+            minutes = slot * self.slot_minutes
+            result[f"{minutes // 60:02d}:{minutes % 60:02d}"] = int(covers[slot])
+        return result
+
+    def dish_demand(self, date: str) -> Dict[str, int]:
+        """Get how many reservations pre-ordered each dish on a date."""
+        counts = self.dish_demand_by_day(date, date)
+        return {dish_id: int(count) for dish_id, count in zip(self._dish_ids, counts[0]) if count}
+
+    def dish_demand_by_day(self, start_date: str, end_date: str) -> np.ndarray:
+        """Get a (days x dishes) histogram of pre-orders over an inclusive date range.
+
+        Columns follow the order of ``dish_ids``.
+        """
+        first = date_type.fromisoformat(start_date).toordinal()
+        days = date_type.fromisoformat(end_date).toordinal() - first + 1
+        if days <= 0:
+            return np.zeros((0, len(self._dish_ids)), dtype=np.int64)
+
+        row_mask = self._active_mask() & self._date_mask(start_date=start_date, end_date=end_date)
+        live = self._dish_live[:self._dish_size]
+        rows = self._dish_rows[:self._dish_size][live]
+        codes = self._dish_codes[:self._dish_size][live]
+        keep = row_mask[rows]
+
+        day_index = self._dates[rows[keep]] - first
+        cells = day_index * len(self._dish_ids) + codes[keep]
+        counts = np.bincount(cells, minlength=days * len(self._dish_ids))
+        return counts.reshape(days, len(self._dish_ids))
+
+    @property
+    def dish_ids(self) -> List[str]:
+        """Dish IDs in the column order used by dish_demand_by_day."""
+        return list(self._dish_ids)
+
+    def no_show_rate(self, start_date: Optional[str] = None, end_date: Optional[str] = None) -> float:
+        """Get the share of past, non-cancelled reservations that were no-shows."""
+        today = date_type.today().toordinal()
+        mask = (self._active_mask() & self._date_mask(start_date=start_date, end_date=end_date)
+                & (self._dates[:self._size] < today))
+        total = int(np.count_nonzero(mask))
+        if total == 0:
+            return 0.0
+
+        no_show_code = self._status_codes.get("no_show")
+        if no_show_code is None:
+            return 0.0
+        no_shows = int(np.count_nonzero(self._statuses[:self._size][mask] == no_show_code))
+        return no_shows / total
+
+
+def main():
+    """Print a kitchen prep summary for a date."""
+    parser = argparse.ArgumentParser(description="Show covers and pre-ordered dishes for a date.")
+    parser.add_argument("date", help="Date (YYYY-MM-DD)")
+    parser.add_argument("--store", default="reservations.json", help="Reservation store file")
+    args = parser.parse_args()
+
+    analytics = ReservationAnalytics(ReservationService(args.store))
+
+    print(f"Covers per slot on {args.date}:")
+    for slot, covers in analytics.covers_per_slot(args.date).items():
+        print(f"  {slot}  {covers}")
+
+    print(f"Pre-ordered dishes on {args.date}:")
+    for dish_id, count in sorted(analytics.dish_demand(args.date).items(), key=lambda item: -item[1]):
+        print(f"  {dish_id}  {count}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+import gzip
+import json
+import os
+from typing import List, Dict, Any, Optional, Iterable, Iterator, Mapping, Callable
+
+
+class ReservationArchive:
+    """Cold storage for past and cancelled reservations.
+
+    Reservations are appended to gzip-compressed NDJSON shards, one per month
+    of the reservation date (e.g. ``reservations-2023-07.ndjson.gz``). A small
+    ``index.json`` maps reservation IDs to their shard and is only loaded the
+    first time an archived reservation is looked up by ID. ``contacts.json``
+    maps contacts (normalized with ``contact_key``) to reservation IDs in
+    the same way, for a guest's booking history.
+    """
+
+    def __init__(self, archive_dir: str = "reservation_archive",
+                 contact_key: Callable[[str], str] = str.strip):
+        self.archive_dir = archive_dir
+        self.contact_key = contact_key
+        self._index: Optional[Dict[str, str]] = None
+        self._contacts: Optional[Dict[str, List[str]]] = None
+        self._meta = self._load_json(self._meta_path(), {"max_sequence": 0, "count": 0})
+
+    def _meta_path(self) -> str:
+        return os.path.join(self.archive_dir, "meta.json")
+
+    def _index_path(self) -> str:
+        return os.path.join(self.archive_dir, "index.json")
+
+    def _contacts_path(self) -> str:
+        return os.path.join(self.archive_dir, "contacts.json")
+
+    def _shard_path(self, shard: str) -> str:
+        return os.path.join(self.archive_dir, f"reservations-{shard}.ndjson.gz")
+
+    @staticmethod
+    def _shard_for(reservation: Mapping[str, Any]) -> str:
+        """Get the shard (YYYY-MM of the reservation date) a reservation belongs to."""
+        return str(reservation.get("date", ""))[:7] or "undated"
+
+    @staticmethod
+    def _load_json(path: str, default: Any) -> Any:
+        """Load a JSON file, returning the default if it doesn't exist."""
+        if not os.path.exists(path):
+            return default
+        try:
+            with open(path, 'r') as file:
+                return json.load(file)
+        except Exception as e:
+            print(f"Error loading archive file {path}: {e}")
+            return default
+
+    @staticmethod
+    def _write_json(path: str, data: Any) -> None:
+        """Atomically replace a JSON file."""
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w') as file:
+            json.dump(data, file)
+        os.replace(temp_path, path)
+
+    def _get_index(self) -> Dict[str, str]:
+        """Get the ID -> shard index, loading it on first use."""
+        if self._index is None:
+            self._index = self._load_json(self._index_path(), {})
+        return self._index
+
+    def _get_contacts(self) -> Dict[str, List[str]]:
+        """Get the contact -> IDs index, loading it on first use.
+
+        Archives written before the index existed get it built from their
+        shards once.
+        """
+        if self._contacts is None:
+            contacts = self._load_json(self._contacts_path(), None)
+            if contacts is None:
+                contacts = {}
+                for shard in sorted(set(self._get_index().values())):
+                    for reservation in self._iter_shard(shard):
+                        self._add_contact(contacts, reservation)
+                if contacts:
+                    self._write_json(self._contacts_path(), contacts)
+            self._contacts = contacts
+        return self._contacts
+
+    def _add_contact(self, contacts: Dict[str, List[str]], reservation: Mapping[str, Any]) -> None:
+        key = self.contact_key(str(reservation.get("contact_info") or ""))
+        ids = contacts.setdefault(key, [])
+        if reservation["id"] not in ids:
+            ids.append(reservation["id"])
+
+    @property
+    def max_sequence(self) -> int:
+        """Highest numeric RESnnnn sequence ever archived."""
+        return self._meta.get("max_sequence", 0)
+
+    def __len__(self) -> int:
+        return self._meta.get("count", 0)
+
+    def __contains__(self, reservation_id: str) -> bool:
+        return reservation_id in self._get_index()
+
+    def archive(self, reservations: Iterable[Mapping[str, Any]]) -> int:
+        """Append reservations to their date shards. Returns the number archived."""
+        by_shard: Dict[str, List[Mapping[str, Any]]] = {}
+        for reservation in reservations:
+            by_shard.setdefault(self._shard_for(reservation), []).append(reservation)
+
+        if not by_shard:
+            return 0
+
+        os.makedirs(self.archive_dir, exist_ok=True)
+        index = self._get_index()
+        contacts = self._get_contacts()
+        count = 0
+
+        for shard, shard_reservations in by_shard.items():
+            # Appending to a gzip file adds a new member; readers see one stream
+            with gzip.open(self._shard_path(shard), 'at', encoding='utf-8') as file:
+                for reservation in shard_reservations:
+                    file.write(json.dumps(dict(reservation)) + "\n")
+                    index[reservation["id"]] = shard
+                    self._add_contact(contacts, reservation)
+                    count += 1
+
+                    reservation_id = reservation["id"]
+                    if reservation_id.startswith("RES") and reservation_id[3:].isdigit():
+                        self._meta["max_sequence"] = max(self.max_sequence, int(reservation_id[3:]))
+
+        self._meta["count"] = len(index)
+        self._write_json(self._index_path(), index)
+        self._write_json(self._contacts_path(), contacts)
+        self._write_json(self._meta_path(), self._meta)
+        return count
+
+    def _iter_shard(self, shard: str) -> Iterator[Dict[str, Any]]:
+        """Stream the reservations stored in one shard."""
+        path = self._shard_path(shard)
+        if not os.path.exists(path):
+            return
+        with gzip.open(path, 'rt', encoding='utf-8') as file:
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+
+    def iter_reservations(self) -> Iterator[Dict[str, Any]]:
+        """Stream the latest copy of every archived reservation, one shard at a time."""
+        index = self._get_index()
+        for shard in sorted(set(index.values())):
+            latest: Dict[str, Dict[str, Any]] = {}
+            for reservation in self._iter_shard(shard):
+                # A reservation archived again may have moved to another shard
+                if index.get(reservation["id"]) == shard:
+                    latest[reservation["id"]] = reservation
+            yield from latest.values()
+
+    def get(self, reservation_id: str) -> Optional[Dict[str, Any]]:
+        """Get an archived reservation by ID."""
+        shard = self._get_index().get(reservation_id)
+        if shard is None:
+            return None
+
+        # A reservation archived more than once keeps its latest copy
+        found = None
+        for reservation in self._iter_shard(shard):
+            if reservation["id"] == reservation_id:
+                found = reservation
+        return found
+
+    def get_by_date(self, date: str) -> List[Dict[str, Any]]:
+        """Get all archived reservations for a specific date."""
+        latest: Dict[str, Dict[str, Any]] = {}
+        for reservation in self._iter_shard(date[:7]):
+            if reservation["date"] == date:
+                latest[reservation["id"]] = reservation
+        return list(latest.values())
+
+    def get_by_contact(self, contact_info: str) -> List[Dict[str, Any]]:
+        """Get all archived reservations made with a phone number or email."""
+        key = self.contact_key(contact_info)
+        wanted = set(self._get_contacts().get(key, []))
+        if not wanted:
+            return []
+        index = self._get_index()
+        latest: Dict[str, Dict[str, Any]] = {}
+        for shard in sorted({index[reservation_id] for reservation_id in wanted if reservation_id in index}):
+            for reservation in self._iter_shard(shard):
+                if reservation["id"] in wanted:
+                    latest[reservation["id"]] = reservation
+        # A reservation archived again may have changed contact since
+        return [r for r in latest.values() if self.contact_key(str(r.get("contact_info") or "")) == key]
@@ -0,0 +1,115 @@
+import argparse
+import csv
+from typing import Iterator, Dict, Any, Callable, Optional, Tuple, List, Mapping
+
+import serialization
+from reservation_record import RESERVATION_FIELDS
+from reservation_service import ReservationService
+
+# Separator used for the dish_ids column in CSV files
+CSV_DISH_SEPARATOR = ";"
+
+
+def detect_format(path: str) -> str:
+    """Detect the file format ("ndjson" or "csv") from the file extension."""
+    if path.lower().endswith(".csv"):
+        return "csv"
+    if path.lower().endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    raise ValueError(f"Unsupported file format: {path} (use .ndjson, .jsonl or .csv)")
+
+
+def iter_ndjson(path: str) -> Iterator[Dict[str, Any]]:
+    """Stream reservations from a newline-delimited JSON file, one line at a time."""
+    with open(path, 'rb') as file:
+        for line in file:
+            line = line.strip()
+            if line:
+                yield serialization.loads(line)
+
+
+def iter_csv(path: str) -> Iterator[Dict[str, Any]]:
+    """Stream reservations from a CSV file, one row at a time."""
+    with open(path, 'r', newline='') as file:
+        for row in csv.DictReader(file):
+            dish_ids = row.get("dish_ids") or ""
+            row["dish_ids"] = [dish_id for dish_id in dish_ids.split(CSV_DISH_SEPARATOR) if dish_id]
+            yield row
+
+
+def iter_reservation_file(path: str, file_format: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """Stream reservations from an NDJSON or CSV file."""
+    file_format = file_format or detect_format(path)
+    if file_format == "csv":
+        return iter_csv(path)
+    return iter_ndjson(path)
+
+
+def import_reservations(service: ReservationService,
+                        path: str,
+                        file_format: Optional[str] = None) -> Tuple[int, List[str]]:
+    """Import reservations from an NDJSON or CSV file.
+
+    Rows are streamed straight into ReservationService.bulk_create, so the
+    input file is never read into memory at once and the store is saved once.
+    Returns the number of imported reservations and the errors for skipped rows.
+    """
+    created, errors = service.bulk_create(iter_reservation_file(path, file_format))
+    return len(created), errors
+
+
+def export_reservations(service: ReservationService,
+                        path: str,
+                        file_format: Optional[str] = None,
+                        predicate: Optional[Callable[[Mapping[str, Any]], bool]] = None) -> int:
+    """Export reservations to an NDJSON or CSV file, writing one record at a time.
+
+    An optional predicate selects which reservations to export. Returns the
+    number of exported reservations.
+    """
+    file_format = file_format or detect_format(path)
+    count = 0
+
+    with open(path, 'w', newline='') as file:
+        if file_format == "csv":
+            writer = csv.DictWriter(file, fieldnames=RESERVATION_FIELDS, extrasaction='ignore')
+            writer.writeheader()
+
+        for reservation in service.reservations:
+            if predicate and not predicate(reservation):
+                continue
+
+            if file_format == "csv":
+                writer.writerow({**reservation, "dish_ids": CSV_DISH_SEPARATOR.join(reservation["dish_ids"])})
+            else:
+                file.write(serialization.dumps(reservation.to_dict()).decode("utf-8") + "\n")
+            count += 1
+
+    return count
+
+
+def main():
+    """Command-line entry point for import/export jobs."""
+    parser = argparse.ArgumentParser(description="Import or export reservations as NDJSON or CSV.")
+    parser.add_argument("command", choices=["import", "export"])
+    parser.add_argument("path", help="NDJSON (.ndjson/.jsonl) or CSV (.csv) file")
+    parser.add_argument("--store", default="reservations.json", help="Reservation store file")
+    parser.add_argument("--format", choices=["ndjson", "csv"], help="Override the format detected from the extension")
+    parser.add_argument("--from-date", help="Only export reservations on or after this date (YYYY-MM-DD)")
+    args = parser.parse_args()
+
+    service = ReservationService(args.store)
+
+    if args.command == "import":
+        count, errors = import_reservations(service, args.path, args.format)
+        for error in errors:
+            print(f"Skipped {error}")
+        print(f"Imported {count} reservations ({len(errors)} skipped).")
+    else:
+        predicate = (lambda r: r["date"] >= args.from_date) if args.from_date else None
+        count = export_reservations(service, args.path, args.format, predicate)
+        print(f"Exported {count} reservations to {args.path}.")
+
+
+if __name__ == "__main__":
+    main()
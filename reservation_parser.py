@@ -0,0 +1,393 @@
+import re
+from datetime import datetime, timedelta, date as Date
+from typing import List, Dict, Any, Optional, Tuple
+
+import config
+from reservation_service import validate_reservation
+
+# Details a booking needs, in the order a chat asks for missing ones
+BOOKING_FIELDS = ("customer_name", "contact_info", "date", "time", "party_size")
+
+FIELD_LABELS = {
+    "customer_name": "your name",
+    "contact_info": "a phone number or email",
+    "date": "the date",
+    "time": "the time",
+    "party_size": "the number of people",
+}
+
+NUMBER_WORDS = {
+    "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6,
+    "seven": 7, "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12,
+}
+
+WEEKDAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+
+MONTHS = {
+    "january": 1, "february": 2, "march": 3, "april": 4, "may": 5, "june": 6, "july": 7,
+    "august": 8, "september": 9, "october": 10, "november": 11, "december": 12,
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "jun": 6, "jul": 7, "aug": 8,
+    "sep": 9, "sept": 9, "oct": 10, "nov": 11, "dec": 12,
+}
+
+# Words that are never part of a name: commands, filler and chat replies
+NOT_NAME_WORDS = frozenset("""
+reserve reservation book booking table a an the please i i'd id i'm im like would want to make
+can could get have we us me my our is are be will for at on in of with and party people guests
+tonight today tomorrow next this hi hello hey yes no ok okay sure thanks thank you proceed yeah
+yep name contact date time call text email phone reach
+""".split()) | frozenset(WEEKDAYS) | frozenset(MONTHS) | frozenset(NUMBER_WORDS)
+
+_NUMBER = rf"(\d{{1,3}}|{'|'.join(NUMBER_WORDS)})"
+_MONTH = "|".join(sorted(MONTHS, key=len, reverse=True))
+_NAME = r"[A-Za-z][A-Za-z'.-]*(?:\s+[A-Za-z][A-Za-z'.-]*){0,3}"
+
+# "Name: ..., Contact: ..." style fields; the value runs to the next separator
+_LABELED = re.compile(r"\b(name|contact|phone|email|e-mail|date|day|time|party(?:\s+size)?|guests|people)"
+                      r"\s*[:=]\s*([^,;\n]+)", re.IGNORECASE)
+_EMAIL = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+_PHONE = re.compile(r"(?<![\w-])\+?\d[\d\s().-]{5,}\d(?![\w-])")
+
+_ISO_DATE = re.compile(r"\b(\d{4})-(\d{1,2})-(\d{1,2})\b")
+_SLASH_DATE = re.compile(r"\b(\d{1,2})/(\d{1,2})(?:/(\d{2}|\d{4}))?\b")
+_MONTH_DAY = re.compile(rf"\b({_MONTH})\.?\s+(\d{{1,2}})(?:st|nd|rd|th)?(?:,?\s+(\d{{4}}))?\b", re.IGNORECASE)
+_DAY_MONTH = re.compile(rf"\b(\d{{1,2}})(?:st|nd|rd|th)?\s+(?:of\s+)?({_MONTH})\.?(?:,?\s+(\d{{4}}))?\b",
+                        re.IGNORECASE)
+_RELATIVE_DAY = re.compile(r"\b(day after tomorrow|tomorrow|today|tonight)\b", re.IGNORECASE)
+_IN_DAYS = re.compile(rf"\bin\s+{_NUMBER}\s+days?\b", re.IGNORECASE)
+_WEEKDAY = re.compile(rf"\b(?:(next|this)\s+)?({'|'.join(WEEKDAYS)})\b", re.IGNORECASE)
+
+_CLOCK_TIME = re.compile(r"\b([01]?\d|2[0-3]):([0-5]\d)(?:\s*([ap])\.?m\b\.?)?", re.IGNORECASE)
+_HOUR_TIME = re.compile(r"\b(1[0-2]|0?[1-9])\s*([ap])\.?m\b\.?", re.IGNORECASE)
+_NAMED_TIME = re.compile(r"\b(noon|midday)\b", re.IGNORECASE)
+_AT_HOUR = re.compile(r"\bat\s+(1[0-2]|0?[1-9])(?:\s*o'?clock)?\b(?!\s*(?:people|guests|persons))", re.IGNORECASE)
+
+_PARTY = re.compile(rf"\b(?:party\s+of|table\s+for|group\s+of)\s+{_NUMBER}\b"
+                    rf"|\b{_NUMBER}\s+(?:people|persons|guests|pax|adults|diners|of\s+us)\b", re.IGNORECASE)
+_FOR_NUMBER = re.compile(rf"\bfor\s+{_NUMBER}\b(?!\s*(?::|[ap]\.?m\b|o'?clock))", re.IGNORECASE)
+
+_NAME_INTRO = re.compile(rf"\b(?:my name is|name is|this is|under(?:\s+the\s+name)?)\s+({_NAME})",
+                         re.IGNORECASE)
+_NAME_ONLY = re.compile(rf"^{_NAME}$")
+_BARE_NUMBER = re.compile(rf"^(?:the\s+)?(\d{{1,3}}|{'|'.join(NUMBER_WORDS)})(?:st|nd|rd|th)?$", re.IGNORECASE)
+_SEPARATORS = re.compile(r"[,;:\n]+")
+_BOOKING_REQUEST = re.compile(r"\b(?:reserve|reservation|book)\b", re.IGNORECASE)
+
+
+def _number(value: str) -> Optional[int]:
+    value = value.lower()
+    if value.isdigit():
+        return int(value)
+    return NUMBER_WORDS.get(value)
+
+
+def _make_date(year: int, month: int, day: int) -> Optional[str]:
+    try:
+        return Date(year, month, day).isoformat()
+    except ValueError:
+        return None
+
+
+def _upcoming(month: int, day: int, year: Optional[str], today: Date) -> Optional[str]:
+    """Resolve a day of a month, in the next year if it has already passed this year."""
+    if year:
+        year_number = int(year)
+        return _make_date(year_number + 2000 if year_number < 100 else year_number, month, day)
+    resolved = _make_date(today.year, month, day)
+    if resolved is not None and resolved < today.isoformat():
+        resolved = _make_date(today.year + 1, month, day)
+    return resolved
+
+
+def _day_of_month(day: int, today: Date) -> Optional[str]:
+    """Resolve a bare day of the month to its next occurrence from today."""
+    year, month = today.year, today.month
+    for _ in range(12):
+        resolved = _make_date(year, month, day)
+        if resolved is not None and resolved >= today.isoformat():
+            return resolved
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return None
+
+
+def _clock(hour: int, minute: int, meridiem: Optional[str]) -> Optional[str]:
+    if meridiem:
+        if hour > 12:
+            return None
+        hour = hour % 12 + (12 if meridiem.lower() == "p" else 0)
+    return f"{hour:02d}:{minute:02d}"
+
+
+class _Text:
+    """The message being parsed; matched parts are blanked so later rules skip them."""
+
+    def __init__(self, text: str):
+        self.text = text
+
+    def take(self, pattern: "re.Pattern") -> Optional["re.Match"]:
+        match = pattern.search(self.text)
+        if match:
+            self.text = self.text[:match.start()] + " " * (match.end() - match.start()) + self.text[match.end():]
+        return match
+
+
+def _parse_date(text: _Text, today: Date) -> Optional[str]:
+    match = text.take(_ISO_DATE)
+    if match:
+        return _make_date(int(match.group(1)), int(match.group(2)), int(match.group(3)))
+    match = text.take(_MONTH_DAY)
+    if match:
+        return _upcoming(MONTHS[match.group(1).lower()], int(match.group(2)), match.group(3), today)
+    match = text.take(_DAY_MONTH)
+    if match:
+        return _upcoming(MONTHS[match.group(2).lower()], int(match.group(1)), match.group(3), today)
+    match = text.take(_SLASH_DATE)
+    if match:
+        return _upcoming(int(match.group(1)), int(match.group(2)), match.group(3), today)
+    match = text.take(_RELATIVE_DAY)
+    if match:
+        word = match.group(1).lower()
+        offset = 2 if word == "day after tomorrow" else 1 if word == "tomorrow" else 0
+        return (today + timedelta(days=offset)).isoformat()
+    match = text.take(_IN_DAYS)
+    if match:
+        return (today + timedelta(days=_number(match.group(1)))).isoformat()
+    match = text.take(_WEEKDAY)
+    if match:
+        days_ahead = (WEEKDAYS.index(match.group(2).lower()) - today.weekday()) % 7
+        if days_ahead == 0 and (match.group(1) or "").lower() == "next":
+            days_ahead = 7
+        return (today + timedelta(days=days_ahead)).isoformat()
+    return None
+
+
+def _parse_time(text: _Text) -> Optional[str]:
+    match = text.take(_CLOCK_TIME)
+    if match:
+        hour, meridiem = int(match.group(1)), match.group(3)
+        # Without am/pm, early hours mean the evening as with "at 7", unless
+        # written as a zero-padded 24-hour time like "09:30"
+        if not meridiem and 1 <= hour <= 10 and not match.group(1).startswith("0"):
+            hour += 12
+        return _clock(hour, int(match.group(2)), meridiem)
+    match = text.take(_HOUR_TIME)
+    if match:
+        return _clock(int(match.group(1)), 0, match.group(2))
+    if text.take(_NAMED_TIME):
+        return "12:00"
+    match = text.take(_AT_HOUR)
+    if match:
+        # Without am/pm, early hours mean the evening
+        hour = int(match.group(1))
+        return _clock(hour + 12 if hour <= 10 else hour, 0, None)
+    return None
+
+
+def _parse_party_size(text: _Text) -> Optional[int]:
+    match = text.take(_PARTY) or text.take(_FOR_NUMBER)
+    if match:
+        return _number(next(group for group in match.groups() if group))
+    return None
+
+
+def _clean_name(value: str, strict: bool = False) -> Optional[str]:
+    """Keep the words of a name, dropping commands and filler around it.
+
+    A name ends where the rest of the sentence starts; with ``strict``, text
+    that carries on after the name is not taken as a name at all.
+    """
+    words = value.split()
+    while words and words[0].lower() in NOT_NAME_WORDS:
+        words.pop(0)
+    while words and words[-1].lower() in NOT_NAME_WORDS:
+        words.pop()
+    for index, word in enumerate(words):
+        if word.lower() in NOT_NAME_WORDS:
+            if strict:
+                return None
+            words = words[:index]
+            break
+    name = " ".join(words)
+    return name if name and _NAME_ONLY.match(name) else None
+
+
+def _parse_field(field: str, value: str, today: Date) -> Optional[Any]:
+    """Parse the value of one labeled or expected field."""
+    text = _Text(value)
+    if field == "customer_name":
+        return _clean_name(value)
+    if field == "contact_info":
+        value = value.strip()
+        return value if "@" in value or any(ch.isdigit() for ch in value) else None
+    if field == "date":
+        return _parse_date(text, today)
+    if field == "time":
+        return _parse_time(text)
+    party_size = _parse_party_size(text)
+    if party_size is None and value.strip():
+        party_size = _number(value.strip().split()[0])
+    return party_size
+
+
+def _bare_answer(field: str, number: int, today: Date) -> Optional[Any]:
+    """Read a bare number as the field a chat asked for: "7" for a time is
+    7pm, "15" for a date is the 15th, anything else a party size."""
+    if field == "time":
+        # Without am/pm, early hours mean the evening, as with "at 7"
+        return _clock(number + 12 if 1 <= number <= 10 else number, 0, None) if number <= 23 else None
+    if field == "date":
+        return _day_of_month(number, today)
+    return number
+
+
+_LABEL_FIELDS = {
+    "name": "customer_name", "contact": "contact_info", "phone": "contact_info", "email": "contact_info",
+    "e-mail": "contact_info", "date": "date", "day": "date", "time": "time", "party": "party_size",
+    "party size": "party_size", "guests": "party_size", "people": "party_size",
+}
+
+
+def parse_reservation(message: str, expecting: Optional[str] = None,
+                      now: Optional[datetime] = None) -> Dict[str, Any]:
+    """Extract booking details from a chat message in one pass.
+
+    Understands labeled fields ("Name: Sam Lee, Party: 4"), emails and phone
+    numbers, dates ("2023-07-15", "July 15", "7/15", "tomorrow", "next
+    Friday", "in 3 days"), times ("19:00", "7pm", "noon", "at 8") and party
+    sizes ("party of 4", "table for two", "6 people"). Leftover
+    comma-separated parts are taken as the name or, if a bare number, the
+    party size. ``expecting`` names the field a chat just asked for, so a
+    bare answer like "Sam Lee" or "4" fills it first: "7" answers a
+    question about the time as 19:00, and "15" one about the date as the
+    15th.
+
+    Returns only the fields found, normalized for create_reservation
+    (date YYYY-MM-DD, time HH:MM, party size as an int).
+    """
+    today = (now or datetime.now()).date()
+    text = _Text(message)
+    found: Dict[str, Any] = {}
+
+    while True:
+        match = text.take(_LABELED)
+        if not match:
+            break
+        field = _LABEL_FIELDS[re.sub(r"\s+", " ", match.group(1).lower())]
+        value = _parse_field(field, match.group(2), today)
+        if value is not None:
+            found.setdefault(field, value)
+
+    if "contact_info" not in found:
+        match = text.take(_EMAIL)
+        if match:
+            found["contact_info"] = match.group(0)
+    if "date" not in found:
+        value = _parse_date(text, today)
+        if value is not None:
+            found["date"] = value
+    if "time" not in found:
+        value = _parse_time(text)
+        if value is not None:
+            found["time"] = value
+    if "contact_info" not in found:
+        match = text.take(_PHONE)
+        if match and sum(ch.isdigit() for ch in match.group(0)) >= 7:
+            found["contact_info"] = match.group(0).strip()
+    if "party_size" not in found:
+        value = _parse_party_size(text)
+        if value is not None:
+            found["party_size"] = value
+    if "customer_name" not in found:
+        match = text.take(_NAME_INTRO)
+        name = _clean_name(match.group(1)) if match else None
+        if name:
+            found["customer_name"] = name
+
+    # Whatever is left, split on separators
+    for part in _SEPARATORS.split(text.text):
+        part = part.strip(" .!?")
+        if not part:
+            continue
+        bare = _BARE_NUMBER.match(part)
+        if bare:
+            number = _number(bare.group(1))
+            if expecting in ("date", "time", "party_size") and expecting not in found:
+                value = _bare_answer(expecting, number, today)
+                if value is not None:
+                    found[expecting] = value
+            elif "party_size" not in found and 0 < number <= 100:
+                found["party_size"] = number
+        elif "customer_name" not in found:
+            name = _clean_name(part, strict=True)
+            if name:
+                found["customer_name"] = name
+
+    if expecting and not found:
+        value = _parse_field(expecting, message, today)
+        if value is not None:
+            found[expecting] = value
+    return found
+
+
+def merge_booking_answer(details: Dict[str, Any], message: str, expecting: Optional[str] = None,
+                         now: Optional[datetime] = None) -> Dict[str, Any]:
+    """Parse a chat reply into the booking details gathered so far, in place.
+
+    The detail the chat asked for (``expecting``) is replaced by the answer;
+    other details only fill gaps. Returns what was parsed from the message.
+    """
+    parsed = parse_reservation(message, expecting=expecting, now=now)
+    for field, value in parsed.items():
+        if field == expecting or details.get(field) in (None, ""):
+            details[field] = value
+    return parsed
+
+
+def missing_fields(details: Dict[str, Any]) -> List[str]:
+    """Get the booking fields that are still missing, in the order to ask for them."""
+    return [field for field in BOOKING_FIELDS if details.get(field) in (None, "")]
+
+
+def validate_booking(details: Dict[str, Any], now: Optional[datetime] = None) -> Optional[Tuple[str, str]]:
+    """Check the booking details a chat has gathered, before asking for more or booking.
+
+    Dates and times that have passed and parties that don't fit in a slot
+    (SLOT_CAPACITY) are rejected as soon as they are given; once nothing is
+    missing, ReservationService's checks are applied too. Returns the field
+    to ask for again and why, or None if the details are fine.
+    """
+    party_size = details.get("party_size")
+    if isinstance(party_size, int) and party_size < 1:
+        return "party_size", "party size must be at least 1"
+    if isinstance(party_size, int) and party_size > config.SLOT_CAPACITY:
+        return "party_size", f"we can seat at most {config.SLOT_CAPACITY} guests in one booking"
+
+    now = now or datetime.now()
+    date, time = details.get("date"), details.get("time")
+    if date and date < now.strftime("%Y-%m-%d"):
+        return "date", "that date has already passed"
+    if date == now.strftime("%Y-%m-%d") and time and time < now.strftime("%H:%M"):
+        return "time", "that time has already passed"
+
+    if not missing_fields(details):
+        error = validate_reservation(details)
+        if error:
+            # Its messages name the field, e.g. "invalid time '25:00'"
+            field = next((field for field in BOOKING_FIELDS
+                          if field in error or field.replace("_", " ") in error), "date")
+            return field, error
+    return None
+
+
+def describe_missing(details: Dict[str, Any]) -> str:
+    """Describe the missing booking fields, e.g. "the date and the time"."""
+    labels = [FIELD_LABELS[field] for field in missing_fields(details)]
+    if len(labels) <= 1:
+        return "".join(labels)
+    return ", ".join(labels[:-1]) + " and " + labels[-1]
+
+
+def is_booking_request(message: str) -> bool:
+    """Check whether a chat message asks to make a reservation."""
+    return (not message.strip().lower().startswith("my ")
+            and _BOOKING_REQUEST.search(message) is not None)
@@ -0,0 +1,135 @@
+import sys
+from collections.abc import Mapping
+from datetime import date as date_type, datetime, timedelta
+from typing import Dict, Any, Iterator, Union
+
+RESERVATION_FIELDS = ["id", "customer_name", "contact_info", "date", "time",
+                      "party_size", "dish_ids", "created_at", "status"]
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def encode_date(value: str) -> Union[int, str]:
+    """Encode a YYYY-MM-DD date as a day ordinal (unparseable values are kept as-is)."""
+    try:
+        return date_type.fromisoformat(value).toordinal()
+    except (TypeError, ValueError):
+        return value
+
+
+def decode_date(value: Union[int, str]) -> str:
+    """Decode a day ordinal back to YYYY-MM-DD."""
+    if isinstance(value, int):
+        return date_type.fromordinal(value).isoformat()
+    return value
+
+
+def encode_time(value: str) -> Union[int, str]:
+    """Encode an HH:MM time as minutes after midnight (unparseable values are kept as-is)."""
+    try:
+        hours, minutes = value.split(":")
+        if len(hours) == 2 and len(minutes) == 2:
+            return int(hours) * 60 + int(minutes)
+    except (AttributeError, ValueError):
+        pass
+    return value
+
+
+def decode_time(value: Union[int, str]) -> str:
+    """Decode minutes after midnight back to HH:MM."""
+    if isinstance(value, int):
+        return f"{value // 60:02d}:{value % 60:02d}"
+    return value
+
+
+def encode_timestamp(value: str) -> Union[int, str]:
+    """Encode an ISO timestamp as microseconds since the epoch (unparseable values are kept as-is)."""
+    try:
+        return (datetime.fromisoformat(value) - _EPOCH) // _MICROSECOND
+    except (TypeError, ValueError):
+        return value
+
+
+def decode_timestamp(value: Union[int, str]) -> str:
+    """Decode microseconds since the epoch back to an ISO timestamp."""
+    if isinstance(value, int):
+        return (_EPOCH + value * _MICROSECOND).isoformat()
+    return value
+
+
+class ReservationRecord(Mapping):
+    """Compact, immutable in-memory representation of a reservation.
+
+    Dates, times and creation timestamps are stored as integers, status and
+    dish ID strings are interned, and dish IDs are kept in a tuple. The record
+    is a read-only mapping with the same keys and value formats as the JSON
+    reservation dicts, so ``record["date"]`` still returns "YYYY-MM-DD".
+    Use ``replace`` to derive a changed copy and ``to_dict`` to serialize.
+    """
+
+    __slots__ = ("id", "customer_name", "contact_info", "date_ordinal", "time_minutes",
+                 "party_size", "dish_ids", "created_us", "status")
+
+    def __init__(self, id: str, customer_name: str, contact_info: str,
+                 date_ordinal: Union[int, str], time_minutes: Union[int, str],
+                 party_size: int, dish_ids: tuple, created_us: Union[int, str], status: str):
+        self.id = id
+        self.customer_name = customer_name
+        self.contact_info = contact_info
+        self.date_ordinal = date_ordinal
+        self.time_minutes = time_minutes
+        self.party_size = party_size
+        self.dish_ids = dish_ids
+        self.created_us = created_us
+        self.status = status
+
+    @classmethod
+    def from_dict(cls, data: Mapping) -> "ReservationRecord":
+        """Build a record from a reservation dict.
+
+        Raises ValueError or TypeError if the party size is not a whole number.
+        """
+        if isinstance(data, ReservationRecord):
+            return data
+        return cls(
+            id=data["id"],
+            customer_name=data["customer_name"],
+            contact_info=data["contact_info"],
+            date_ordinal=encode_date(data["date"]),
+            time_minutes=encode_time(data["time"]),
+            party_size=int(data["party_size"]),
+            dish_ids=tuple(sys.intern(dish_id) for dish_id in data.get("dish_ids") or []),
+            created_us=encode_timestamp(data.get("created_at", "")),
+            status=sys.intern(data.get("status") or "confirmed")
+        )
+
+    def replace(self, **changes: Any) -> "ReservationRecord":
+        """Return a copy of the record with some fields (by mapping key) changed."""
+        return ReservationRecord.from_dict({**self.to_dict(), **changes, "id": self.id})
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the record to a plain reservation dict."""
+        return {key: self[key] for key in RESERVATION_FIELDS}
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "date":
+            return decode_date(self.date_ordinal)
+        if key == "time":
+            return decode_time(self.time_minutes)
+        if key == "created_at":
+            return decode_timestamp(self.created_us)
+        if key == "dish_ids":
+            return list(self.dish_ids)
+        if key in ("id", "customer_name", "contact_info", "party_size", "status"):
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(RESERVATION_FIELDS)
+
+    def __len__(self) -> int:
+        return len(RESERVATION_FIELDS)
+
+    def __repr__(self) -> str:
+        return f"ReservationRecord({self.to_dict()!r})"
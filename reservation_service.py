@@ -1,32 +1,483 @@
-import json
+import atexit
 import os
+import threading
+from collections import Counter, OrderedDict
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from time import monotonic, time as wall_time
+from typing import List, Dict, Any, Optional, Iterable, Tuple, Callable, Set, TYPE_CHECKING
+import serialization
+from reservation_archive import ReservationArchive
+from reservation_record import ReservationRecord, encode_date
+from reservation_snapshot import write_snapshot
+
+if TYPE_CHECKING:
+    from dish_validation import DishPreorderValidator
+
+
+def normalize_contact(contact_info: str) -> str:
+    """Normalize contact info to a lookup key (lowercased email or phone digits)."""
+    contact = (contact_info or "").strip()
+    if "@" in contact:
+        return contact.lower()
+    digits = "".join(ch for ch in contact if ch.isdigit())
+    return digits or contact.lower()
+
+
+def derive_idempotency_key(contact_info: str, date: str, time: str, party_size: Any) -> str:
+    """Derive the idempotency key of a booking from who, when and how many."""
+    return f"{normalize_contact(contact_info)}|{date}|{time}|{party_size}"
+
+
+def validate_reservation(data: Dict[str, Any]) -> Optional[str]:
+    """Return an error message if reservation data is invalid, otherwise None."""
+    for field in ("customer_name", "contact_info", "date", "time", "party_size"):
+        if data.get(field) in (None, ""):
+            return f"missing {field}"
+
+    for field in ("customer_name", "contact_info", "date", "time", "id", "created_at", "status"):
+        if data.get(field) is not None and not isinstance(data[field], str):
+            return f"{field} must be a string"
+
+    try:
+        datetime.strptime(data["date"], "%Y-%m-%d")
+    except ValueError:
+        return f"invalid date '{data['date']}'"
+
+    try:
+        datetime.strptime(data["time"], "%H:%M")
+    except ValueError:
+        return f"invalid time '{data['time']}'"
+
+    if isinstance(data["party_size"], (bool, float)):
+        return f"invalid party size '{data['party_size']}'"
+    try:
+        if int(data["party_size"]) < 1:
+            return "party size must be at least 1"
+    except (TypeError, ValueError):
+        return f"invalid party size '{data['party_size']}'"
+
+    dish_ids = data.get("dish_ids") or []
+    if not isinstance(dish_ids, list) or not all(isinstance(dish_id, str) for dish_id in dish_ids):
+        return "dish_ids must be a list of strings"
+
+    return None
+
+
+def fsync_directory(path: str) -> None:
+    """Make a rename into a file's directory durable (not possible on Windows)."""
+    if os.name == "nt":
+        return
+    fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def covers_by_slot(reservations: Iterable[ReservationRecord], slot_minutes: int = 30) -> Dict[str, int]:
+    """Count the guests per time slot (HH:MM) in a set of reservations."""
+    covers: Dict[str, int] = {}
+    for reservation in reservations:
+        minutes = reservation.time_minutes
+        if not isinstance(minutes, int):
+            continue
+        start = minutes - minutes % slot_minutes
+        slot = f"{start // 60:02d}:{start % 60:02d}"
+        covers[slot] = covers.get(slot, 0) + reservation.party_size
+    return covers
+
+
+class ReservationState:
+    """One consistent version of the reservation list and its lookup indexes."""
+
+    __slots__ = ("reservations", "id_index", "contact_index")
+
+    def __init__(self,
+                 reservations: List[ReservationRecord],
+                 id_index: Optional[Dict[str, int]] = None,
+                 contact_index: Optional[Dict[str, List[str]]] = None):
+        self.reservations = reservations
+        self.id_index = id_index if id_index is not None else {}
+        self.contact_index = contact_index if contact_index is not None else {}
+
+    def copy(self) -> "ReservationState":
+        """Copy the list and indexes (records and contact ID lists are never mutated).
+
+        This is O(n) in the number of hot reservations, paid once per write.
+        """
+        return ReservationState(list(self.reservations), dict(self.id_index), dict(self.contact_index))
+
 
 class ReservationService:
-    def __init__(self, reservation_file_path: str = "reservations.json"):
+    def __init__(self,
+                 reservation_file_path: Optional[str] = "reservations.json",
+                 archive_dir: Optional[str] = None,
+                 dish_validator: Optional["DishPreorderValidator"] = None,
+                 write_behind: bool = False,
+                 flush_interval_ms: int = 200,
+                 flush_max_ops: int = 100,
+                 snapshot_path: Optional[str] = None,
+                 thread_safe: bool = False,
+                 idempotency_ttl: float = 600,
+                 idempotency_max_keys: int = 10000,
+                 idempotency_path: Optional[str] = None,
+                 archive_on_load: bool = True):
+        # None keeps the reservations in memory only (e.g. a replica)
         self.reservation_file_path = reservation_file_path
-        self.reservations = self._load_reservations()
+
+        # Optional read-optimized snapshot, rewritten after every save, for
+        # worker processes that open it with ReservationSnapshot
+        self.snapshot_path = snapshot_path
+
+        # Optional cold storage for past and cancelled reservations
+        self.archive = ReservationArchive(archive_dir, contact_key=normalize_contact) if archive_dir else None
+
+        # The reservation list and its lookup indexes. Readers take the current
+        # state once and never lock; writers are serialized by the write lock.
+        # In thread-safe mode writers change a copy and publish it with a
+        # single assignment (copy-on-write), so readers always see a
+        # consistent version; otherwise the state is changed in place. The
+        # copy makes each write O(n) in the hot reservations (shallow copies
+        # of the list and two dicts, a few milliseconds per 100,000), so
+        # archiving keeps n small for large stores.
+        self.thread_safe = thread_safe
+        # Reentrant, so components that must act atomically with a change
+        # (a waitlist booking freed seats, a replication snapshot) can hold it
+        self.write_lock = threading.RLock()
+        self._next_id = self.archive.max_sequence + 1 if self.archive is not None else 1
+        self._load_failed = False
+        self._state = ReservationState(self._load_reservations())
+        self._rebuild_indexes(self._state)
+
+        # Recent create_reservation keys -> (reservation ID, expiry), oldest
+        # first, so a repeated request returns the booking it already made
+        self.idempotency_ttl = idempotency_ttl
+        self.idempotency_max_keys = idempotency_max_keys
+        self._idempotency_index: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        # Optional file the keys are kept in, so processes sharing the store
+        # (and restarts) recognize each other's requests
+        self.idempotency_path = idempotency_path
+        if idempotency_path:
+            self._load_idempotency_keys()
+
+        # Callbacks notified of every change as listener(event, reservation)
+        self._listeners: List[Callable[[str, ReservationRecord], None]] = []
+        # Callbacks listeners deferred until the current change reaches them all
+        self._deferred: List[Callable[[], None]] = []
+        self._dispatching = 0
+
+        # Write-behind persistence: mutations mark records dirty and a background
+        # flusher coalesces them into one write every flush_interval_ms or
+        # flush_max_ops changes, whichever comes first
+        self.write_behind = write_behind
+        self.flush_interval = flush_interval_ms / 1000
+        self.flush_max_ops = flush_max_ops
+        self._dirty_ids: Set[str] = set()
+        self._pending_ops = 0
+        # Set when the file was written without fsync, so flush() still syncs it
+        self._unsynced = False
+        self._dirty_condition = threading.Condition()
+        self._flush_lock = threading.RLock()
+        self._closed = False
+        self._flusher = None
+        if write_behind:
+            self._flusher = threading.Thread(target=self._flush_loop, name="reservation-flusher", daemon=True)
+            self._flusher.start()
+            atexit.register(self.close)
+
+        # Optional check of pre-ordered dishes against the menu and portion limits
+        self.dish_validator = dish_validator
+        if dish_validator is not None:
+            dish_validator.attach(self)
+
+        # Keep only upcoming bookings in the hot working set. Callers that
+        # attach listeners (e.g. a change feed) pass archive_on_load=False and
+        # call archive_reservations() afterwards, so they see these events too.
+        if self.archive is not None and archive_on_load:
+            self.archive_reservations()
     
-    def _load_reservations(self) -> List[Dict[str, Any]]:
-        """Load reservations from JSON file."""
-        if not os.path.exists(self.reservation_file_path):
+    @property
+    def reservations(self) -> List[ReservationRecord]:
+        """The current reservations (don't modify; use the service methods)."""
+        return self._state.reservations
+
+    def _load_reservations(self) -> List[ReservationRecord]:
+        """Load reservations from a JSON file (or MessagePack for .msgpack paths).
+
+        Invalid rows are moved to a ``.rejected`` file next to the store
+        instead of failing the whole load. If the file can't be read at all,
+        the service starts empty but never saves over it.
+        """
+        if self.reservation_file_path is None or not os.path.exists(self.reservation_file_path):
             return []
-        
+
+        rejected: List[Tuple[Any, str]] = []
         try:
-            with open(self.reservation_file_path, 'r') as file:
-                return json.load(file)
+            with open(self.reservation_file_path, 'rb') as file:
+                rows = serialization.decode_reservations(
+                    file.read(), binary=serialization.is_binary_path(self.reservation_file_path), rejected=rejected)
         except Exception as e:
             print(f"Error loading reservations: {e}")
+            self._load_failed = True
             return []
+
+        reservations = []
+        for row in rows:
+            try:
+                reservations.append(ReservationRecord.from_dict(row))
+            except (TypeError, ValueError) as e:
+                rejected.append((row, str(e)))
+        if rejected:
+            self._quarantine(rejected)
+        return reservations
+
+    def _quarantine(self, rejected: List[Tuple[Any, str]]) -> None:
+        """Keep rows that failed to load in a side file, and never reuse their IDs."""
+        path = f"{self.reservation_file_path}.rejected"
+        try:
+            with open(path, 'ab') as file:
+                for row, error in rejected:
+                    file.write(serialization.dumps({"error": error, "reservation": row}) + b"\n")
+        except Exception as e:
+            print(f"Error saving rejected reservations: {e}")
+            self._load_failed = True
+            return
+        for row, _ in rejected:
+            if isinstance(row, dict) and isinstance(row.get("id"), str):
+                self._reserve_id(row["id"])
+        print(f"Error loading reservations: skipped {len(rejected)} invalid rows (kept in {path})")
     
-    def _save_reservations(self) -> None:
-        """Save reservations to JSON file."""
+    def _save_reservations(self, reservations: Optional[List[ReservationRecord]] = None, fsync: bool = False) -> bool:
+        """Save reservations to a JSON file (or MessagePack for .msgpack paths).
+
+        The file is written to a temporary path and swapped in, so readers never
+        see a partial file. With fsync the data is on disk when this returns.
+        """
+        if self.reservation_file_path is None:
+            return True
+        if self._load_failed:
+            print(f"Error saving reservations: {self.reservation_file_path} could not be loaded, "
+                  "so it is not being overwritten")
+            return False
+
+        reservations = self.reservations if reservations is None else reservations
+        temp_path = f"{self.reservation_file_path}.tmp"
+        # One save at a time, as they share the temporary file
+        with self._flush_lock:
+            try:
+                data = serialization.encode_reservations(
+                    [r.to_dict() for r in reservations], binary=serialization.is_binary_path(self.reservation_file_path))
+                with open(temp_path, 'wb') as file:
+                    file.write(data)
+                    if fsync:
+                        file.flush()
+                        os.fsync(file.fileno())
+                os.replace(temp_path, self.reservation_file_path)
+                if fsync:
+                    fsync_directory(self.reservation_file_path)
+                self._unsynced = not fsync
+            except Exception as e:
+                print(f"Error saving reservations: {e}")
+                return False
+
+            if self.snapshot_path:
+                self.write_snapshot(self.snapshot_path, reservations)
+        return True
+
+    def write_snapshot(self, path: str, reservations: Optional[List[ReservationRecord]] = None) -> None:
+        """Write the reservations to a memory-mappable snapshot file (see reservation_snapshot)."""
+        if self._load_failed:
+            return
         try:
-            with open(self.reservation_file_path, 'w') as file:
-                json.dump(self.reservations, file, indent=2)
+            write_snapshot(path, self.reservations if reservations is None else reservations)
         except Exception as e:
-            print(f"Error saving reservations: {e}")
+            print(f"Error writing reservation snapshot: {e}")
+
+    def _persist(self, reservation_ids: Iterable[str]) -> None:
+        """Persist changed reservations, immediately or via the write-behind flusher."""
+        if not self.write_behind:
+            self._save_reservations()
+            return
+
+        with self._dirty_condition:
+            self._dirty_ids.update(reservation_ids)
+            self._pending_ops += 1
+            if self._pending_ops >= self.flush_max_ops:
+                self._dirty_condition.notify()
+
+    def _flush_loop(self) -> None:
+        """Background flusher for write-behind mode."""
+        while True:
+            with self._dirty_condition:
+                if not self._closed and self._pending_ops < self.flush_max_ops:
+                    self._dirty_condition.wait(self.flush_interval)
+                if self._closed:
+                    return
+            self.flush(fsync=False)
+
+    def flush(self, fsync: bool = True) -> None:
+        """Write all pending changes to disk now.
+
+        This is the durability barrier for write-behind mode: when it returns
+        (with fsync) every change made before the call is on disk, including
+        changes the background flusher already wrote without syncing. In
+        write-through mode the file is already current and only needs syncing.
+        """
+        with self._flush_lock:
+            with self._dirty_condition:
+                if not self._dirty_ids:
+                    if fsync and self._unsynced:
+                        self._sync_file()
+                    return
+                dirty_ids = self._dirty_ids
+                self._dirty_ids = set()
+                self._pending_ops = 0
+                # Records are immutable, so a shallow copy is a consistent snapshot
+                snapshot = list(self.reservations)
+
+            if not self._save_reservations(snapshot, fsync=fsync):
+                # Keep the changes pending so the next flush retries them
+                with self._dirty_condition:
+                    self._dirty_ids.update(dirty_ids)
+                    self._pending_ops += 1
+
+    def _sync_file(self) -> None:
+        """Force an already written reservation file and its directory entry to disk."""
+        try:
+            with open(self.reservation_file_path, 'rb') as file:
+                os.fsync(file.fileno())
+            fsync_directory(self.reservation_file_path)
+            self._unsynced = False
+        except OSError as e:
+            print(f"Error syncing reservations: {e}")
+
+    def close(self) -> None:
+        """Stop the write-behind flusher and write any pending changes."""
+        if self._flusher is not None:
+            with self._dirty_condition:
+                self._closed = True
+                self._dirty_condition.notify()
+            self._flusher.join()
+            self._flusher = None
+            atexit.unregister(self.close)
+        self.flush()
+
+    def add_listener(self, listener: Callable[[str, ReservationRecord], None]) -> None:
+        """Register a callback for reservation changes.
+
+        The listener is called as ``listener(event, reservation)`` after each
+        change is applied, where event is one of "created", "updated",
+        "cancelled", "dish_added", "archived" or "imported" (rows added by
+        bulk_create, e.g. migrated bookings that guests shouldn't be
+        messaged about).
+        """
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[str, ReservationRecord], None]) -> None:
+        """Unregister a change callback."""
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _notify(self, event: str, reservation: ReservationRecord) -> None:
+        """Notify listeners of a change."""
+        for listener in self._listeners:
+            try:
+                listener(event, reservation)
+            except Exception as e:
+                print(f"Error in reservation listener: {e}")
+
+    def after_dispatch(self, callback: Callable[[], None]) -> None:
+        """Run a callback once the change being notified has reached every listener.
+
+        Listeners use this for follow-up writes (like booking a waiting
+        party), so other listeners never see the follow-up before the change
+        that caused it. Outside a notification the callback runs straight away.
+        """
+        with self.write_lock:
+            if self._dispatching:
+                self._deferred.append(callback)
+                return
+        callback()
+
+    def _dispatch(self, event: str, reservations: List[ReservationRecord]) -> None:
+        """Notify listeners of changed reservations, then run the callbacks they deferred.
+
+        Must be called with the write lock held.
+        """
+        self._dispatching += 1
+        try:
+            for reservation in reservations:
+                self._notify(event, reservation)
+        finally:
+            self._dispatching -= 1
+        while self._deferred and not self._dispatching:
+            callback = self._deferred.pop(0)
+            try:
+                callback()
+            except Exception as e:
+                print(f"Error in reservation listener: {e}")
+
+    def _begin_write(self, batch: bool = False) -> ReservationState:
+        """Get the state a writer should change (a copy in thread-safe mode).
+
+        Batches always get a copy, so a row that fails part way leaves the
+        published state untouched. Must be called with the write lock held.
+        """
+        return self._state.copy() if self.thread_safe or batch else self._state
+
+    def _commit(self, state: ReservationState, event: str, changed: List[ReservationRecord]) -> None:
+        """Publish a changed state, persist it and notify listeners.
+
+        Must be called with the write lock held.
+        """
+        self._state = state
+        self._persist([r.id for r in changed])
+        self._dispatch(event, changed)
+
+    def _rebuild_indexes(self, state: ReservationState) -> None:
+        """Rebuild the ID and contact indexes from the reservation list."""
+        state.id_index = {}
+        state.contact_index = {}
+        for position, reservation in enumerate(state.reservations):
+            state.id_index[reservation["id"]] = position
+            self._index_contact(state, reservation)
+            self._reserve_id(reservation["id"])
+
+    def _reserve_id(self, reservation_id: str) -> None:
+        """Make sure generated IDs never collide with an existing RESnnnn ID."""
+        if reservation_id.startswith("RES") and reservation_id[3:].isdigit():
+            self._next_id = max(self._next_id, int(reservation_id[3:]) + 1)
+
+    def _generate_id(self) -> str:
+        """Generate the next sequential reservation ID."""
+        reservation_id = f"RES{self._next_id:04d}"
+        self._next_id += 1
+        return reservation_id
+
+    def _add_reservation(self, state: ReservationState, reservation: ReservationRecord) -> None:
+        """Append a reservation and add it to the indexes."""
+        state.reservations.append(reservation)
+        state.id_index[reservation["id"]] = len(state.reservations) - 1
+        self._index_contact(state, reservation)
+        self._reserve_id(reservation["id"])
+
+    def _index_contact(self, state: ReservationState, reservation: ReservationRecord) -> None:
+        """Add a reservation to the contact index."""
+        key = normalize_contact(reservation.contact_info)
+        if key:
+            # Replace rather than append, so older states keep their list
+            state.contact_index[key] = state.contact_index.get(key, []) + [reservation["id"]]
+
+    def _unindex_contact(self, state: ReservationState, reservation: ReservationRecord) -> None:
+        """Remove a reservation from the contact index."""
+        key = normalize_contact(reservation.contact_info)
+        ids = state.contact_index.get(key)
+        if ids and reservation.id in ids:
+            ids = [reservation_id for reservation_id in ids if reservation_id != reservation.id]
+            if ids:
+                state.contact_index[key] = ids
+            else:
+                del state.contact_index[key]
     
     def create_reservation(self, 
                           customer_name: str, 
@@ -34,72 +485,414 @@ class ReservationService:
                           date: str,
                           time: str,
                           party_size: int,
-                          dish_ids: List[str] = None) -> Dict[str, Any]:
-        """Create a new reservation."""
-        # Generate a simple reservation ID
-        reservation_id = f"RES{len(self.reservations) + 1:04d}"
-        
-        # Create reservation object
-        reservation = {
-            "id": reservation_id,
-            "customer_name": customer_name,
-            "contact_info": contact_info,
-            "date": date,
-            "time": time,
-            "party_size": party_size,
-            "dish_ids": dish_ids or [],
-            "created_at": datetime.now().isoformat(),
-            "status": "confirmed"
-        }
-        
-        # Add to reservations list
-        self.reservations.append(reservation)
-        
-        # Save to file
-        self._save_reservations()
+                          dish_ids: List[str] = None,
+                          idempotency_key: Optional[str] = None) -> ReservationRecord:
+        """Create a new reservation.
+
+        Repeating a request (same ``idempotency_key``, or by default the same
+        contact, date, time and party size) within ``idempotency_ttl``
+        seconds returns the reservation it made instead of booking again,
+        unless that reservation has been cancelled.
+
+        Raises DishValidationError if a dish validator is configured and a
+        pre-ordered dish is unknown, unavailable or sold out for the date.
+        """
+        key = idempotency_key or derive_idempotency_key(contact_info, date, time, party_size)
+        with self.write_lock:
+            existing = self._find_idempotent(key)
+            if existing is not None:
+                return existing
+
+            if self.dish_validator is not None and dish_ids:
+                self.dish_validator.validate(dish_ids, date, time=time)
+
+            # Generate a simple reservation ID
+            reservation_id = self._generate_id()
+            
+            # Create reservation object
+            reservation = ReservationRecord.from_dict({
+                "id": reservation_id,
+                "customer_name": customer_name,
+                "contact_info": contact_info,
+                "date": date,
+                "time": time,
+                "party_size": party_size,
+                "dish_ids": dish_ids or [],
+                "created_at": datetime.now().isoformat(),
+                "status": "confirmed"
+            })
+            
+            # Add to reservations list and indexes, then save
+            state = self._begin_write()
+            self._add_reservation(state, reservation)
+            self._commit(state, "created", [reservation])
+            self._remember_idempotent(key, reservation_id)
         
         return reservation
+
+    def _find_idempotent(self, key: str) -> Optional[ReservationRecord]:
+        """Get the live reservation a recent request with this key made.
+
+        Must be called with the write lock held.
+        """
+        now = monotonic()
+        index = self._idempotency_index
+        # Keys expire in insertion order, so expired ones are at the front
+        while index and next(iter(index.values()))[1] <= now:
+            index.popitem(last=False)
+
+        entry = index.get(key)
+        if entry is None:
+            return None
+        position = self._state.id_index.get(entry[0])
+        reservation = self._state.reservations[position] if position is not None else None
+        if reservation is None or reservation.status == "cancelled":
+            del index[key]
+            return None
+        return reservation
+
+    def _remember_idempotent(self, key: str, reservation_id: str) -> None:
+        """Record the reservation a request made. Must be called with the write lock held."""
+        index = self._idempotency_index
+        index.pop(key, None)
+        index[key] = (reservation_id, monotonic() + self.idempotency_ttl)
+        while len(index) > self.idempotency_max_keys:
+            index.popitem(last=False)
+        if self.idempotency_path:
+            self._save_idempotency_keys()
+
+    def _load_idempotency_keys(self) -> None:
+        """Load unexpired idempotency keys saved as [key, reservation ID, expiry time] rows."""
+        if not os.path.exists(self.idempotency_path):
+            return
+        try:
+            rows = serialization.load_file(self.idempotency_path)
+        except Exception as e:
+            print(f"Error loading idempotency keys: {e}")
+            return
+        # Expiry is saved as wall-clock time, as monotonic time is per process
+        offset = monotonic() - wall_time()
+        for key, reservation_id, expires_at in rows:
+            if expires_at > wall_time():
+                self._idempotency_index[key] = (reservation_id, expires_at + offset)
+
+    def _save_idempotency_keys(self) -> None:
+        """Save the idempotency keys, oldest first."""
+        offset = wall_time() - monotonic()
+        rows = [[key, reservation_id, expires + offset]
+                for key, (reservation_id, expires) in self._idempotency_index.items()]
+        temp_path = f"{self.idempotency_path}.tmp"
+        try:
+            with open(temp_path, 'wb') as file:
+                file.write(serialization.dumps(rows))
+            os.replace(temp_path, self.idempotency_path)
+        except Exception as e:
+            print(f"Error saving idempotency keys: {e}")
+
+    def bulk_create(self, reservations: Iterable[Dict[str, Any]]) -> Tuple[List[ReservationRecord], List[str]]:
+        """Create many reservations, validating each one and saving once at the end.
+
+        Rows may carry their own "id", "created_at" and "status" (e.g. when
+        migrating from another system); a missing or already-used ID is replaced
+        with a newly generated one. Listeners get an "imported" event rather
+        than "created" for each row. Returns the created reservations and a
+        list of error messages for the rows that were skipped.
+        """
+        created = []
+        errors = []
+        # Portions claimed by this batch before it is saved, per date
+        pending: Dict[str, Counter] = {}
+
+        with self.write_lock:
+            state = self._begin_write(batch=True)
+            for row_number, data in enumerate(reservations, start=1):
+                error = validate_reservation(data)
+                if error:
+                    errors.append(f"Row {row_number}: {error}")
+                    continue
+
+                dish_ids = list(data.get("dish_ids") or [])
+                if self.dish_validator is not None and dish_ids:
+                    try:
+                        self.dish_validator.validate(dish_ids, data["date"], pending=pending.get(data["date"]),
+                                                     time=data["time"])
+                    except ValueError as e:
+                        errors.append(f"Row {row_number}: {e}")
+                        continue
+                    pending.setdefault(data["date"], Counter()).update(dish_ids)
+
+                reservation_id = data.get("id")
+                if (not reservation_id or reservation_id in state.id_index
+                        or (self.archive is not None and reservation_id in self.archive)):
+                    reservation_id = self._generate_id()
+
+                reservation = ReservationRecord.from_dict({
+                    "id": reservation_id,
+                    "customer_name": data["customer_name"],
+                    "contact_info": data["contact_info"],
+                    "date": data["date"],
+                    "time": data["time"],
+                    "party_size": data["party_size"],
+                    "dish_ids": dish_ids,
+                    "created_at": data.get("created_at") or datetime.now().isoformat(),
+                    "status": data.get("status") or "confirmed"
+                })
+                self._add_reservation(state, reservation)
+                created.append(reservation)
+
+            if created:
+                self._commit(state, "imported", created)
+
+        return created, errors
     
-    def get_reservation(self, reservation_id: str) -> Optional[Dict[str, Any]]:
-        """Get a reservation by ID."""
-        for reservation in self.reservations:
-            if reservation["id"] == reservation_id:
-                return reservation
-        return None
+    def get_reservation(self, reservation_id: str) -> Optional[ReservationRecord]:
+        """Get a reservation by ID, falling through to the archive for older ones."""
+        state = self._state
+        position = state.id_index.get(reservation_id)
+        if position is not None:
+            return state.reservations[position]
+
+        archived = self.archive.get(reservation_id) if self.archive is not None else None
+        return ReservationRecord.from_dict(archived) if archived else None
+
+    def get_reservations_by_contact(self, contact_info: str, upcoming_only: bool = False) -> List[ReservationRecord]:
+        """Get all reservations made with a phone number or email, oldest first.
+
+        Archived (past and cancelled) reservations are included unless
+        ``upcoming_only`` is set, so this reads the archive's shards for the
+        guest's history.
+        """
+        state = self._state
+        key = normalize_contact(contact_info)
+        reservations = [state.reservations[state.id_index[reservation_id]]
+                        for reservation_id in state.contact_index.get(key, [])]
+        if self.archive is not None and not upcoming_only:
+            reservations += [ReservationRecord.from_dict(r) for r in self.archive.get_by_contact(contact_info)
+                             if r["id"] not in state.id_index]
+
+        if upcoming_only:
+            now = datetime.now().strftime("%Y-%m-%d %H:%M")
+            reservations = [r for r in reservations
+                            if r["status"] != "cancelled" and f"{r['date']} {r['time']}" >= now]
+
+        return sorted(reservations, key=lambda r: (r["date"], r["time"]))
     
-    def update_reservation(self, reservation_id: str, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    def update_reservation(self, reservation_id: str, updates: Dict[str, Any]) -> Optional[ReservationRecord]:
         """Update an existing reservation."""
-        for i, reservation in enumerate(self.reservations):
-            if reservation["id"] == reservation_id:
-                # Update reservation with new values
-                self.reservations[i] = {**reservation, **updates}
-                # Save changes
-                self._save_reservations()
-                return self.reservations[i]
-        return None
+        with self.write_lock:
+            position = self._state.id_index.get(reservation_id)
+            if position is None:
+                return None
+
+            reservation = self._state.reservations[position]
+            if self.dish_validator is not None and ("dish_ids" in updates or "date" in updates or "time" in updates):
+                self.dish_validator.validate(updates.get("dish_ids", reservation["dish_ids"]),
+                                             updates.get("date", reservation["date"]),
+                                             reservation_id=reservation_id,
+                                             time=updates.get("time", reservation["time"]))
+
+            # Update reservation with new values (the ID is immutable)
+            updated = reservation.replace(**updates)
+            state = self._begin_write()
+            state.reservations[position] = updated
+
+            if "contact_info" in updates:
+                self._unindex_contact(state, reservation)
+                self._index_contact(state, updated)
+
+            # Save changes
+            self._commit(state, "updated", [updated])
+        return updated
+    
+    def bulk_update(self, updates: Dict[str, Dict[str, Any]]) -> Tuple[List[ReservationRecord], List[str]]:
+        """Apply updates to many reservations (ID -> changed fields) and save once.
+
+        Returns the updated reservations and a list of error messages for the
+        updates that were skipped.
+        """
+        updated = []
+        errors = []
+
+        with self.write_lock:
+            state = self._begin_write(batch=True)
+            for reservation_id, changes in updates.items():
+                position = state.id_index.get(reservation_id)
+                if position is None:
+                    errors.append(f"{reservation_id}: reservation not found")
+                    continue
+
+                reservation = state.reservations[position]
+                candidate = {**reservation, **changes, "id": reservation_id}
+                error = validate_reservation(candidate)
+                if error:
+                    errors.append(f"{reservation_id}: {error}")
+                    continue
+
+                if self.dish_validator is not None and ("dish_ids" in changes or "date" in changes or "time" in changes):
+                    try:
+                        self.dish_validator.validate(candidate["dish_ids"], candidate["date"],
+                                                     reservation_id=reservation_id, time=candidate["time"])
+                    except ValueError as e:
+                        errors.append(f"{reservation_id}: {e}")
+                        continue
+
+                record = ReservationRecord.from_dict(candidate)
+                state.reservations[position] = record
+                if "contact_info" in changes:
+                    self._unindex_contact(state, reservation)
+                    self._index_contact(state, record)
+                updated.append(record)
+
+            if updated:
+                self._commit(state, "updated", updated)
+
+        return updated, errors
     
     def cancel_reservation(self, reservation_id: str) -> bool:
         """Cancel a reservation."""
-        for i, reservation in enumerate(self.reservations):
-            if reservation["id"] == reservation_id:
-                # Update status to cancelled
-                self.reservations[i]["status"] = "cancelled"
-                # Save changes
-                self._save_reservations()
-                return True
-        return False
+        with self.write_lock:
+            position = self._state.id_index.get(reservation_id)
+            if position is None:
+                return False
+
+            # Update status to cancelled
+            state = self._begin_write()
+            state.reservations[position] = state.reservations[position].replace(status="cancelled")
+            # Save changes
+            self._commit(state, "cancelled", [state.reservations[position]])
+        return True
     
-    def get_reservations_by_date(self, date: str) -> List[Dict[str, Any]]:
+    def get_reservations_by_date(self, date: str) -> List[ReservationRecord]:
         """Get all reservations for a specific date."""
-        return [r for r in self.reservations if r["date"] == date and r["status"] != "cancelled"]
+        state = self._state
+        date_key = encode_date(date)
+        reservations = [r for r in state.reservations if r.date_ordinal == date_key and r.status != "cancelled"]
+        if self.archive is not None and date < datetime.now().strftime("%Y-%m-%d"):
+            reservations += [ReservationRecord.from_dict(r) for r in self.archive.get_by_date(date)
+                             if r["status"] != "cancelled" and r["id"] not in state.id_index]
+        return reservations
+
+    def get_covers_by_slot(self, date: str, slot_minutes: int = 30) -> Dict[str, int]:
+        """Get the number of guests booked per time slot (HH:MM) on a date."""
+        return covers_by_slot(self.get_reservations_by_date(date), slot_minutes)
+
+    def archive_reservations(self, before: Optional[str] = None) -> int:
+        """Move past and cancelled reservations into the archive.
+
+        Reservations dated before ``before`` (YYYY-MM-DD, default today) or
+        cancelled are appended to the archive and dropped from the hot working
+        set. Archived reservations can still be read with get_reservation but
+        are no longer updated. Returns the number of reservations archived.
+        """
+        if self.archive is None:
+            return 0
+
+        before = before or datetime.now().strftime("%Y-%m-%d")
+        with self.write_lock:
+            archived = []
+            kept = []
+            for reservation in self._state.reservations:
+                if reservation["date"] < before or reservation["status"] == "cancelled":
+                    archived.append(reservation)
+                else:
+                    kept.append(reservation)
+
+            if not archived:
+                return 0
+
+            # Write the archive before shrinking the hot file so nothing is lost
+            self.archive.archive(archived)
+            state = ReservationState(kept)
+            self._rebuild_indexes(state)
+            self._state = state
+            self._save_reservations()
+            self._dispatch("archived", archived)
+        return len(archived)
     
     def add_dish_to_reservation(self, reservation_id: str, dish_id: str) -> bool:
-        """Add a dish to an existing reservation."""
-        for i, reservation in enumerate(self.reservations):
-            if reservation["id"] == reservation_id:
-                if dish_id not in reservation["dish_ids"]:
-                    self.reservations[i]["dish_ids"].append(dish_id)
-                    # Save changes
-                    self._save_reservations()
-                return True
-        return False
+        """Add a dish to an existing reservation.
+
+        Raises DishValidationError if a dish validator is configured and the
+        dish is unknown, unavailable or sold out for the reservation's date.
+        """
+        return self.add_dishes_to_reservation(reservation_id, [dish_id]) is not None
+
+    def add_dishes_to_reservation(self, reservation_id: str, dish_ids: List[str]) -> Optional[ReservationRecord]:
+        """Add several dishes to an existing reservation, saving once.
+
+        Dishes already on the reservation are skipped. Returns the updated
+        reservation, or None if it doesn't exist. Raises DishValidationError
+        if a dish validator is configured and any new dish is rejected.
+        """
+        with self.write_lock:
+            position = self._state.id_index.get(reservation_id)
+            if position is None:
+                return None
+
+            reservation = self._state.reservations[position]
+            existing = set(reservation.dish_ids)
+            new_dish_ids = [dish_id for dish_id in dict.fromkeys(dish_ids) if dish_id not in existing]
+            if not new_dish_ids:
+                return reservation
+
+            if self.dish_validator is not None:
+                self.dish_validator.validate(new_dish_ids, reservation["date"], reservation_id=reservation_id,
+                                             time=reservation["time"])
+
+            updated = reservation.replace(dish_ids=reservation["dish_ids"] + new_dish_ids)
+            state = self._begin_write()
+            state.reservations[position] = updated
+            # Save changes
+            self._commit(state, "dish_added", [updated])
+        return updated
+
+    def remove_dishes_from_reservation(self, reservation_id: str, dish_ids: List[str]) -> Optional[ReservationRecord]:
+        """Remove several dishes from an existing reservation, saving once.
+
+        Returns the updated reservation, or None if it doesn't exist.
+        """
+        with self.write_lock:
+            position = self._state.id_index.get(reservation_id)
+            if position is None:
+                return None
+
+            reservation = self._state.reservations[position]
+            removed = set(dish_ids)
+            if removed.isdisjoint(reservation.dish_ids):
+                return reservation
+
+            updated = reservation.replace(
+                dish_ids=[dish_id for dish_id in reservation.dish_ids if dish_id not in removed])
+            state = self._begin_write()
+            state.reservations[position] = updated
+            # Save changes
+            self._commit(state, "updated", [updated])
+        return updated
+
+    def replace_reservation_dishes(self, reservation_id: str, dish_ids: List[str]) -> Optional[ReservationRecord]:
+        """Replace all pre-ordered dishes on a reservation, saving once.
+
+        Returns the updated reservation, or None if it doesn't exist. Raises
+        DishValidationError if a dish validator is configured and any dish is
+        rejected.
+        """
+        with self.write_lock:
+            position = self._state.id_index.get(reservation_id)
+            if position is None:
+                return None
+
+            reservation = self._state.reservations[position]
+            dish_ids = list(dict.fromkeys(dish_ids))
+            if dish_ids == list(reservation.dish_ids):
+                return reservation
+
+            if self.dish_validator is not None:
+                self.dish_validator.validate(dish_ids, reservation["date"], reservation_id=reservation_id,
+                                             time=reservation["time"])
+
+            updated = reservation.replace(dish_ids=dish_ids)
+            state = self._begin_write()
+            state.reservations[position] = updated
+            # Save changes
+            self._commit(state, "updated", [updated])
+        return updated
@@ -0,0 +1,184 @@
+import mmap
+import os
+import struct
+from typing import List, Iterable, Iterator, Optional
+
+import serialization
+from reservation_record import ReservationRecord, encode_date
+
+# File layout (all integers little-endian):
+#   header      magic, version, id width, record count and section positions
+#   offsets     (count + 1) x uint64 record start offsets; the last is the end
+#   id index    count x (id padded to id width, uint32 record number), sorted by id
+#   date index  count x (int32 date ordinal, uint32 record number), sorted by date
+#   records     compact JSON, one per record
+MAGIC = b"RESSNAP1"
+VERSION = 1
+HEADER = struct.Struct("<8sHHIQQQQ")
+OFFSET = struct.Struct("<Q")
+DATE_ENTRY = struct.Struct("<iI")
+RECORD_NUMBER = struct.Struct("<I")
+
+
+def write_snapshot(path: str, reservations: Iterable[ReservationRecord]) -> int:
+    """Write reservations to a read-optimized snapshot file.
+
+    The file is written to a temporary path and swapped in, so open readers
+    keep their (old) mapping and new readers see the complete new file.
+    Returns the number of records written.
+    """
+    reservations = list(reservations)
+    records = [serialization.dumps(r.to_dict()) for r in reservations]
+    ids = [r.id.encode("utf-8") for r in reservations]
+    id_width = max((len(i) for i in ids), default=1)
+    count = len(records)
+
+    offsets = bytearray()
+    position = 0
+    for record in records:
+        offsets += OFFSET.pack(position)
+        position += len(record)
+    offsets += OFFSET.pack(position)
+
+    id_index = bytearray()
+    for number in sorted(range(count), key=lambda n: ids[n]):
+        id_index += ids[number].ljust(id_width, b"\0") + RECORD_NUMBER.pack(number)
+
+    dates = [r.date_ordinal if isinstance(r.date_ordinal, int) else -1 for r in reservations]
+    date_index = bytearray()
+    for number in sorted(range(count), key=lambda n: (dates[n], n)):
+        date_index += DATE_ENTRY.pack(dates[number], number)
+
+    offsets_pos = HEADER.size
+    id_index_pos = offsets_pos + len(offsets)
+    date_index_pos = id_index_pos + len(id_index)
+    data_pos = date_index_pos + len(date_index)
+
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, VERSION, id_width, count,
+                               offsets_pos, id_index_pos, date_index_pos, data_pos))
+        file.write(offsets)
+        file.write(id_index)
+        file.write(date_index)
+        for record in records:
+            file.write(record)
+    os.replace(temp_path, path)
+    return count
+
+
+class ReservationSnapshot:
+    """Read-only, memory-mapped view of a reservation snapshot file.
+
+    Opening only reads the fixed-size header; lookups binary-search the id
+    and date indexes inside the mapping and decode just the matching
+    records. Because the file is mapped rather than parsed, worker processes
+    reading the same snapshot share the operating system's page cache.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+        self._map = None
+        self._stat = None
+        self._open()
+
+    def _open(self) -> None:
+        """Map the snapshot file and read its header."""
+        self._file = open(self.path, 'rb')
+        self._stat = os.fstat(self._file.fileno())
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (magic, version, self._id_width, self._count, self._offsets_pos,
+         self._id_index_pos, self._date_index_pos, self._data_pos) = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{self.path} is not a reservation snapshot")
+        self._id_entry_size = self._id_width + RECORD_NUMBER.size
+
+    def close(self) -> None:
+        """Unmap the snapshot file."""
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def is_stale(self) -> bool:
+        """Check whether the file has been replaced since it was mapped."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+        return (stat.st_ino, stat.st_mtime_ns) != (self._stat.st_ino, self._stat.st_mtime_ns)
+
+    def refresh(self) -> bool:
+        """Re-open the snapshot if the file has been replaced. Returns True if it was."""
+        if not self.is_stale():
+            return False
+        self.close()
+        self._open()
+        return True
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _record_at(self, number: int) -> ReservationRecord:
+        """Decode the record with the given record number."""
+        position = self._offsets_pos + number * OFFSET.size
+        start, = OFFSET.unpack_from(self._map, position)
+        end, = OFFSET.unpack_from(self._map, position + OFFSET.size)
+        data = self._map[self._data_pos + start:self._data_pos + end]
+        return ReservationRecord.from_dict(serialization.loads(data))
+
+    def __iter__(self) -> Iterator[ReservationRecord]:
+        for number in range(self._count):
+            yield self._record_at(number)
+
+    def get_reservation(self, reservation_id: str) -> Optional[ReservationRecord]:
+        """Get a reservation by ID."""
+        key = reservation_id.encode("utf-8")
+        if len(key) > self._id_width:
+            return None
+        key = key.ljust(self._id_width, b"\0")
+
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            position = self._id_index_pos + middle * self._id_entry_size
+            entry_key = self._map[position:position + self._id_width]
+            if entry_key < key:
+                low = middle + 1
+            elif entry_key > key:
+                high = middle
+            else:
+                number, = RECORD_NUMBER.unpack_from(self._map, position + self._id_width)
+                return self._record_at(number)
+        return None
+
+    def get_reservations_by_date(self, date: str) -> List[ReservationRecord]:
+        """Get all non-cancelled reservations for a specific date."""
+        date_key = encode_date(date)
+        if not isinstance(date_key, int):
+            return []
+
+        # Find the first index entry for the date
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            entry_date, _ = DATE_ENTRY.unpack_from(self._map, self._date_index_pos + middle * DATE_ENTRY.size)
+            if entry_date < date_key:
+                low = middle + 1
+            else:
+                high = middle
+
+        reservations = []
+        for entry in range(low, self._count):
+            entry_date, number = DATE_ENTRY.unpack_from(self._map, self._date_index_pos + entry * DATE_ENTRY.size)
+            if entry_date != date_key:
+                break
+            reservation = self._record_at(number)
+            if reservation.status != "cancelled":
+                reservations.append(reservation)
+        return reservations
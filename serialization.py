@@ -0,0 +1,134 @@
+import json
+from typing import List, Dict, Any, Optional, Tuple
+
+# Use the fastest codec that is installed: orjson or msgspec for JSON and
+# msgspec or msgpack for the binary reservation format. None of them is
+# required; JSON falls back to the stdlib json module.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# File extensions stored in the binary (MessagePack) snapshot format
+BINARY_EXTENSIONS = (".msgpack", ".mpk")
+
+REQUIRED_RESERVATION_FIELDS = ("id", "customer_name", "contact_info", "date", "time", "party_size")
+
+if msgspec is not None:
+    class ReservationSchema(msgspec.Struct):
+        """Typed reservation schema, validated while decoding."""
+        id: str
+        customer_name: str
+        contact_info: str
+        date: str
+        time: str
+        party_size: int
+        dish_ids: List[str] = msgspec.field(default_factory=list)
+        created_at: str = ""
+        status: str = "confirmed"
+
+    _json_reservation_decoder = msgspec.json.Decoder(List[ReservationSchema], strict=False)
+    _msgpack_reservation_decoder = msgspec.msgpack.Decoder(List[ReservationSchema], strict=False)
+
+
+def dumps(obj: Any) -> bytes:
+    """Encode an object as compact JSON."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    if msgspec is not None:
+        return msgspec.json.encode(obj)
+    return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+
+def loads(data: Any) -> Any:
+    """Decode JSON from bytes or str."""
+    if orjson is not None:
+        return orjson.loads(data)
+    if msgspec is not None:
+        return msgspec.json.decode(data)
+    return json.loads(data)
+
+
+def load_file(path: str) -> Any:
+    """Load a JSON file."""
+    with open(path, 'rb') as file:
+        return loads(file.read())
+
+
+def is_binary_path(path: str) -> bool:
+    """Check whether a reservation file uses the binary snapshot format."""
+    return path.lower().endswith(BINARY_EXTENSIONS)
+
+
+def _unpack(data: bytes, binary: bool) -> Any:
+    """Decode JSON or MessagePack without any schema."""
+    if not binary:
+        return loads(data)
+    if msgspec is not None:
+        return msgspec.msgpack.decode(data)
+    if msgpack is not None:
+        return msgpack.unpackb(data, raw=False)
+    raise ImportError("The binary reservation format requires msgspec or msgpack to be installed")
+
+
+def _check_reservation(row: Any) -> Dict[str, Any]:
+    """Validate one decoded reservation, dropping nulls in the optional fields."""
+    if not isinstance(row, dict):
+        raise ValueError(f"Invalid reservation entry: {row!r}")
+    missing = [field for field in REQUIRED_RESERVATION_FIELDS if row.get(field) is None]
+    if missing:
+        raise ValueError(f"Reservation {row.get('id', '?')} is missing {', '.join(missing)}")
+    row = {key: value for key, value in row.items() if value is not None}
+    if msgspec is not None:
+        return msgspec.structs.asdict(msgspec.convert(row, ReservationSchema, strict=False))
+    return row
+
+
+def encode_reservations(rows: List[Dict[str, Any]], binary: bool = False) -> bytes:
+    """Encode reservation dicts as JSON or MessagePack."""
+    if not binary:
+        return dumps(rows)
+    if msgspec is not None:
+        return msgspec.msgpack.encode(rows)
+    if msgpack is not None:
+        return msgpack.packb(rows, use_bin_type=True)
+    raise ImportError("The binary reservation format requires msgspec or msgpack to be installed")
+
+
+def decode_reservations(data: bytes, binary: bool = False,
+                        rejected: Optional[List[Tuple[Any, str]]] = None) -> List[Dict[str, Any]]:
+    """Decode and validate reservation dicts from JSON or MessagePack.
+
+    Invalid rows are skipped, not fatal: each is added to ``rejected`` as a
+    (row, error) pair when a list is passed. Raises ValueError only if the
+    data can't be decoded at all.
+    """
+    if msgspec is not None:
+        # Fast path: decode and validate the whole file in one go
+        decoder = _msgpack_reservation_decoder if binary else _json_reservation_decoder
+        try:
+            return [msgspec.structs.asdict(row) for row in decoder.decode(data)]
+        except msgspec.ValidationError:
+            pass
+
+    rows = _unpack(data, binary)
+    if not isinstance(rows, list):
+        raise ValueError("Reservation file must contain a list of reservations")
+    valid = []
+    for row in rows:
+        try:
+            valid.append(_check_reservation(row))
+        except ValueError as e:
+            if rejected is not None:
+                rejected.append((row, str(e)))
+    return valid
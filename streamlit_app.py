@@ -4,6 +4,12 @@ import os
 from datetime import datetime
 from menu_service import MenuService
 from reservation_service import ReservationService
+from dish_validation import DishPreorderValidator, DishValidationError
+from chat_session_store import ChatSessionStore
+from dish_recommender import DishRecommender
+from change_feed import ChangeFeed
+from reservation_parser import (merge_booking_answer, missing_fields, describe_missing, is_booking_request,
+                                validate_booking, BOOKING_FIELDS, FIELD_LABELS)
 import config
 
 # Check for environment variables (useful for Docker)
@@ -11,8 +17,32 @@ if os.environ.get("OPENAI_API_KEY"):
     config.OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
 
 # Initialize services
-menu_service = MenuService()
-reservation_service = ReservationService()
+@st.cache_resource(show_spinner=False)
+def get_services():
+    """Menu and reservation services shared by every session of the server process.
+
+    Keeping one reservation service (rather than reloading it on every rerun)
+    lets it recognize a repeated booking, e.g. from a double-clicked form.
+    """
+    menu_service = MenuService()
+    dish_validator = DishPreorderValidator(menu_service)
+    reservation_service = ReservationService(archive_dir=config.RESERVATION_ARCHIVE_DIR,
+                                             dish_validator=dish_validator, thread_safe=True,
+                                             archive_on_load=False)
+    if config.CHANGE_FEED_DIR:
+        ChangeFeed(config.CHANGE_FEED_DIR).attach(reservation_service)
+    # Archive after attaching the feed, so its followers see these changes
+    reservation_service.archive_reservations()
+    dish_recommender = DishRecommender(reservation_service, menu_service)
+    return menu_service, dish_validator, reservation_service, dish_recommender
+
+menu_service, dish_validator, reservation_service, dish_recommender = get_services()
+
+
+@st.cache_resource
+def get_chat_store():
+    """Chat histories for every browser session, kept once per server process."""
+    return ChatSessionStore(page_size=config.CHAT_WINDOW)
 
 # Set page config
 st.set_page_config(
@@ -153,14 +183,14 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Initialize session state
-if 'messages' not in st.session_state:
-    st.session_state.messages = []
+# Initialize session state (chat history lives in the server-side store)
+if 'chat_session_id' not in st.session_state:
+    st.session_state.chat_session_id = None
+chat_session = get_chat_store().get(st.session_state.chat_session_id)
+st.session_state.chat_session_id = chat_session.session_id
+if len(chat_session) == 0:
     # Add welcome message
-    st.session_state.messages.append({
-        "role": "assistant",
-        "content": "Welcome to our restaurant! I can help you browse our menu, search for dishes, and make reservations. How can I assist you today?"
-    })
+    chat_session.append("assistant", "Welcome to our restaurant! I can help you browse our menu, search for dishes, and make reservations. How can I assist you today?")
 
 if 'reservation_data' not in st.session_state:
     st.session_state.reservation_data = {
@@ -176,10 +206,14 @@ if 'reservation_data' not in st.session_state:
 if 'reservation_process' not in st.session_state:
     st.session_state.reservation_process = {
         "active": False,
-        "step": 0,
+        "asking": None,
         "data": {}
     }
 
+# Pending reservation lookup ("add dishes" / "my reservations")
+if 'reservation_lookup' not in st.session_state:
+    st.session_state.reservation_lookup = None
+
 # Page navigation state
 if 'current_page' not in st.session_state:
     st.session_state.current_page = "Chat"
@@ -227,6 +261,7 @@ with st.sidebar:
             <li><code>search [query]</code> - Search for dishes</li>
             <li><code>reserve</code> - Make a reservation</li>
             <li><code>add dishes</code> - Add dishes to a reservation</li>
+            <li><code>my reservations</code> - Look up your bookings</li>
             <li><code>help</code> - Show all commands</li>
         </ul>
     </div>
@@ -294,6 +329,17 @@ def format_menu_items(items, title):
 
     return result
 
+def format_reservations(reservations, title):
+    """Format reservations for display."""
+    result = f"### {title}\n\n"
+
+    for reservation in reservations:
+        result += f"**{reservation['id']}** - {reservation['date']} at {reservation['time']}  \n"
+        result += f"Name: {reservation['customer_name']}, Party Size: {reservation['party_size']}  \n"
+        result += f"Status: {reservation['status']}  \n\n"
+
+    return result
+
 def display_menu_items_cards(items, title):
     """Display menu items as cards."""
     if not items:
@@ -327,6 +373,7 @@ def display_menu_items_cards(items, title):
 
 def process_message(message):
     """Process a user message and return a response."""
+    text = message
     message = message.lower()
 
     # Menu-related commands
@@ -371,6 +418,10 @@ def process_message(message):
         items = menu_service.get_items_by_category("Desserts")
         return format_menu_items(items, "Desserts"), None
 
+    # Recommendations from other guests' pre-orders
+    elif message.startswith("recommend"):
+        return recommend_dishes(message.replace("recommend", "", 1).strip()), None
+
     # Search functionality
     elif "search" in message:
         query = message.replace("search", "").strip()
@@ -381,41 +432,35 @@ def process_message(message):
             return "Please specify what you'd like to search for. For example: 'search salmon'", None
 
     # Reservation functionality
-    elif message == "reserve" or message == "reservation" or message == "book":
-        # Start the reservation process
-        st.session_state.reservation_process = {
-            "active": True,
-            "step": 1,
-            "data": {
-                "customer_name": "",
-                "contact_info": "",
-                "date": datetime.now().strftime("%Y-%m-%d"),
-                "time": "19:00",
-                "party_size": 2,
-                "dish_ids": []
-            }
-        }
-
-        return """Let's make a reservation for you! Please provide the following information:
-
-1. Your name
-2. Contact information (phone or email)
-3. Date (YYYY-MM-DD)
-4. Time (HH:MM)
-5. Number of people in your party
-
-You can provide this information in a single message like this:
-"Name: John Doe, Contact: john@example.com, Date: 2023-07-15, Time: 19:00, Party: 4"
-
-Or I can guide you through the process step by step. Would you like to proceed?""", None
+    elif is_booking_request(message):
+        # Start the reservation process with whatever details the message gives
+        st.session_state.reservation_process = {"active": True, "asking": None, "data": {}}
+        if parse_reservation(text):
+            return handle_reservation_chat(text), None
+
+        st.session_state.reservation_process["asking"] = "customer_name"
+        return f"""Let's make a reservation for you! Tell me your name, phone or email, the date, the time and the number of people, all in one message if you like:
+"Sam Lee, sam@example.com, tomorrow at 7pm, party of 4"
+
+Or I can ask for each detail in turn. {RESERVATION_QUESTIONS["customer_name"]}""", None
 
     # Handle active reservation process
     elif st.session_state.reservation_process["active"]:
-        return handle_reservation_chat(message), None
+        return handle_reservation_chat(text), None
+
+    # Handle a pending reservation lookup
+    elif st.session_state.reservation_lookup:
+        return handle_reservation_lookup(message)
 
     # Handle adding dishes to a reservation
     elif message == "add dishes" or message == "add dish":
-        return "To add dishes to your reservation, please provide your reservation ID:", "add_dishes"
+        st.session_state.reservation_lookup = "add_dishes"
+        return "To add dishes to your reservation, please provide your reservation ID or the phone number/email you booked with:", None
+
+    # Look up existing reservations
+    elif message in ["my reservations", "my reservation", "my booking", "my bookings"]:
+        st.session_state.reservation_lookup = "list"
+        return "Please provide the phone number or email you booked with:", None
 
     # Help command
     elif message == "help":
@@ -425,153 +470,80 @@ Here are the commands you can use:
 - 'vegetarian', 'vegan', 'gluten-free' - View dietary options
 - 'appetizers', 'main courses', 'desserts' - View specific categories
 - 'search [query]' - Search for dishes (e.g., 'search salmon')
+- 'recommend [dish or diet]' - Dishes other guests pre-ordered (e.g., 'recommend salmon', 'recommend vegan')
 - 'reserve' - Make a reservation directly in the chat
 - 'add dishes' - Add dishes to an existing reservation
+- 'my reservations' - Look up your reservations by phone or email
 - 'cancel' - Cancel the current reservation process
 - 'help' - Show this help message
 
 When making a reservation, you can provide all information at once like this:
-"Name: John Doe, Contact: john@example.com, Date: 2023-07-15, Time: 19:00, Party: 4"
+"Book a table for Sam Lee, sam@example.com, tomorrow at 7pm, party of 4"
 
-Or follow the step-by-step process when prompted.
+Anything you leave out, I'll ask for.
         """, None
 
     # Default response
     else:
         return "I'm not sure how to respond to that. Type 'help' to see available commands.", None
 
+RESERVATION_QUESTIONS = {
+    "customer_name": "What name should I put the reservation under?",
+    "contact_info": "What phone number or email can we reach you at?",
+    "date": "What date would you like? (e.g. 'tomorrow', 'Friday' or 'July 15')",
+    "time": "What time would you like? (e.g. 19:00 or 7pm)",
+    "party_size": "How many people will be in your party?",
+}
+
 def handle_reservation_chat(message):
-    """Handle the reservation process in the chat."""
-    message = message.lower()
+    """Handle the reservation process in the chat.
+
+    Every detail in the message is taken in one pass by the reservation
+    parser; only details that are still missing are asked for, one at a time.
+    """
     process = st.session_state.reservation_process
 
     # Check for cancel command
-    if message in ["cancel", "stop", "quit"]:
+    if message.strip().lower() in ["cancel", "stop", "quit"]:
         st.session_state.reservation_process["active"] = False
         return "Reservation process cancelled. How else can I help you today?"
 
-    # Check if the user provided all information in one message
-    if "name:" in message and "contact:" in message and "date:" in message and "time:" in message and "party:" in message:
-        # Parse the message for reservation details
-        try:
-            # Extract name
-            name_start = message.find("name:") + 5
-            name_end = message.find(",", name_start)
-            name = message[name_start:name_end].strip() if name_end != -1 else message[name_start:].strip()
-
-            # Extract contact
-            contact_start = message.find("contact:") + 8
-            contact_end = message.find(",", contact_start)
-            contact = message[contact_start:contact_end].strip() if contact_end != -1 else message[contact_start:].strip()
-
-            # Extract date
-            date_start = message.find("date:") + 5
-            date_end = message.find(",", date_start)
-            date_str = message[date_start:date_end].strip() if date_end != -1 else message[date_start:].strip()
-
-            # Extract time
-            time_start = message.find("time:") + 5
-            time_end = message.find(",", time_start)
-            time_str = message[time_start:time_end].strip() if time_end != -1 else message[time_start:].strip()
-
-            # Extract party size
-            party_start = message.find("party:") + 6
-            party_end = message.find(",", party_start)
-            party_str = message[party_start:party_end].strip() if party_end != -1 else message[party_start:].strip()
-            party_size = int(party_str)
-
-            # Create the reservation
-            reservation = reservation_service.create_reservation(
-                customer_name=name,
-                contact_info=contact,
-                date=date_str,
-                time=time_str,
-                party_size=party_size,
-                dish_ids=[]
-            )
-
-            # Reset the reservation process
-            st.session_state.reservation_process["active"] = False
-
-            # Return confirmation message
-            return f"""Reservation confirmed!
-
-Name: {name}
-Contact: {contact}
-Date: {date_str}
-Time: {time_str}
-Party Size: {party_size}
-
-Your reservation ID is {reservation['id']}.
-Would you like to add any dishes to your reservation? Type 'add dishes' to select dishes."""
-
-        except Exception:
-            return f"""I couldn't process your reservation information. Please make sure it's in the correct format:
-"Name: John Doe, Contact: john@example.com, Date: 2023-07-15, Time: 19:00, Party: 4"
-
-Or let me guide you through the process step by step. Just answer the questions as I ask them."""
-
-    # Handle step-by-step reservation process
-    step = process["step"]
+    # A bare answer fills the detail that was just asked for
+    asking = process.get("asking")
     data = process["data"]
-
-    if step == 1:  # Name
-        data["customer_name"] = message
-        process["step"] = 2
-        return "Great! Now, please provide your contact information (phone or email):"
-
-    elif step == 2:  # Contact
-        data["contact_info"] = message
-        process["step"] = 3
-        return f"Thank you! What date would you like to make the reservation for? (YYYY-MM-DD, default is {data['date']}):"
-
-    elif step == 3:  # Date
-        if message != "":
-            try:
-                # Validate date format
-                datetime.strptime(message, "%Y-%m-%d")
-                data["date"] = message
-            except ValueError:
-                return "Invalid date format. Please use YYYY-MM-DD format:"
-
-        process["step"] = 4
-        return f"What time would you like to make the reservation for? (HH:MM, default is {data['time']}):"
-
-    elif step == 4:  # Time
-        if message != "":
-            try:
-                # Validate time format
-                datetime.strptime(message, "%H:%M")
-                data["time"] = message
-            except ValueError:
-                return "Invalid time format. Please use HH:MM format (24-hour):"
-
-        process["step"] = 5
-        return "How many people will be in your party?"
-
-    elif step == 5:  # Party size
-        try:
-            party_size = int(message)
-            if party_size < 1:
-                return "Party size must be at least 1. Please enter a valid number:"
-
-            data["party_size"] = party_size
-
-            # Create the reservation
-            reservation = reservation_service.create_reservation(
-                customer_name=data["customer_name"],
-                contact_info=data["contact_info"],
-                date=data["date"],
-                time=data["time"],
-                party_size=data["party_size"],
-                dish_ids=[]
-            )
-
-            # Reset the reservation process
-            st.session_state.reservation_process["active"] = False
-
-            # Return confirmation message
-            return f"""Reservation confirmed!
+    parsed = merge_booking_answer(data, message, expecting=asking)
+
+    problem = validate_booking(data)
+    if problem:
+        field, reason = problem
+        data.pop(field, None)
+        process["asking"] = field
+        return f"Sorry, {reason}. " + RESERVATION_QUESTIONS[field]
+
+    missing = missing_fields(data)
+    if missing:
+        process["asking"] = missing[0]
+        if asking and not parsed:
+            return f"Sorry, I didn't catch {FIELD_LABELS[asking]}. {RESERVATION_QUESTIONS[asking]}"
+        if len(missing) > 1 and len(missing) < len(BOOKING_FIELDS):
+            return f"Thanks! I still need {describe_missing(data)}. {RESERVATION_QUESTIONS[missing[0]]}"
+        return RESERVATION_QUESTIONS[missing[0]]
+
+    # Create the reservation
+    reservation = reservation_service.create_reservation(
+        customer_name=data["customer_name"],
+        contact_info=data["contact_info"],
+        date=data["date"],
+        time=data["time"],
+        party_size=data["party_size"],
+        dish_ids=[]
+    )
+
+    # Reset the reservation process
+    st.session_state.reservation_process["active"] = False
+
+    # Return confirmation message
+    return f"""Reservation confirmed!
 
 Name: {data["customer_name"]}
 Contact: {data["contact_info"]}
@@ -582,10 +554,68 @@ Party Size: {data["party_size"]}
 Your reservation ID is {reservation['id']}.
 Would you like to add any dishes to your reservation? Type 'add dishes' to select dishes."""
 
-        except ValueError:
-            return "Invalid party size. Please enter a number:"
+def find_reservations(message):
+    """Find reservations by reservation ID or by the phone/email they were booked with."""
+    reservation = reservation_service.get_reservation(message.strip().upper())
+    if reservation:
+        return [reservation]
+    return reservation_service.get_reservations_by_contact(message, upcoming_only=True)
+
+def handle_reservation_lookup(message):
+    """Handle a reservation lookup by ID or contact information in the chat."""
+    purpose = st.session_state.reservation_lookup
 
-    return "I'm sorry, there was an error processing your reservation. Please try again or type 'cancel' to stop."
+    # Check for cancel command
+    if message in ["cancel", "stop", "quit"]:
+        st.session_state.reservation_lookup = None
+        return "Okay, no problem. How else can I help you today?", None
+
+    reservations = find_reservations(message)
+    if not reservations:
+        return f"I couldn't find any upcoming reservations for '{message}'. Please check your reservation ID, phone number or email and try again, or type 'cancel'.", None
+
+    if purpose == "add_dishes":
+        if len(reservations) == 1:
+            reservation = reservations[0]
+            st.session_state.reservation_lookup = None
+            st.session_state.current_reservation_id = reservation["id"]
+            return f"Found reservation {reservation['id']} for {reservation['party_size']} people on {reservation['date']} at {reservation['time']}. Let's add some dishes!", "add_dishes"
+
+        return format_reservations(reservations, "Your Upcoming Reservations") + "Which reservation would you like to add dishes to? Please reply with its reservation ID.", None
+
+    st.session_state.reservation_lookup = None
+    return format_reservations(reservations, "Your Upcoming Reservations"), None
+
+def recommend_dishes(query):
+    """Suggest dishes based on what other guests pre-ordered together."""
+    if query in menu_service.menu.items_by_tag:
+        dish_ids = dish_recommender.popular(query)
+        title = f"Popular {query} dishes"
+    elif query:
+        matches = menu_service.search_items(query)
+        if not matches:
+            return f"I couldn't find a dish matching '{query}'. Try 'recommend' on its own for our most popular dishes."
+        dish_ids = dish_recommender.also_ordered(matches[0]["id"])
+        title = f"Guests who ordered {matches[0]['name']} also ordered"
+    else:
+        dish_ids = dish_recommender.popular()
+        title = "Our most pre-ordered dishes"
+
+    if not dish_ids:
+        return "There aren't enough pre-orders yet to make a recommendation. Type 'menu' to see everything we serve."
+    return format_menu_items(menu_service.get_items_by_ids(dish_ids), title)
+
+def display_dish_recommendations(dish_ids):
+    """Show dishes often pre-ordered with the given ones (or the most popular dishes)."""
+    if dish_ids:
+        suggestions = dish_recommender.recommend_for(dish_ids, k=3)
+        label = "Guests who ordered your dishes also ordered"
+    else:
+        suggestions = dish_recommender.popular(k=3)
+        label = "Popular pre-orders"
+    if suggestions:
+        names = ", ".join(item["name"] for item in menu_service.get_items_by_ids(suggestions))
+        st.caption(f"💡 {label}: {names}")
 
 def display_full_menu():
     """Display the full menu."""
@@ -610,6 +640,30 @@ def display_full_menu():
     - Special dietary options are marked in each dish description
     """)
 
+    # Combined filters; counts show how many dishes match with each option added
+    all_facets = menu_service.query_items()["facets"]
+    with st.expander("🔎 Filter the menu"):
+        filter_cols = st.columns(4)
+        with filter_cols[0]:
+            dietary = st.multiselect("Dietary", list(all_facets["dietary"]),
+                                     format_func=lambda tag: f"{tag} ({all_facets['dietary'][tag]})")
+        with filter_cols[1]:
+            categories = st.multiselect("Category", list(all_facets["category"]),
+                                        format_func=lambda name: f"{name} ({all_facets['category'][name]})")
+        with filter_cols[2]:
+            max_price = st.number_input("Max price ($)", min_value=0.0, value=0.0, step=5.0,
+                                        help="0 means no limit")
+        with filter_cols[3]:
+            available_only = st.checkbox("Available now", value=False)
+
+    if dietary or categories or max_price or available_only:
+        result = menu_service.query_items(dietary=dietary, categories=categories,
+                                          available=True if available_only else None,
+                                          max_price=max_price or None)
+        counts = ", ".join(f"{tag}: {count}" for tag, count in result["facets"]["dietary"].items())
+        st.caption(f"{len(result['items'])} matching dishes" + (f" ({counts})" if counts else ""))
+        display_menu_items_cards(result["items"], "Matching Dishes")
+        return
 
     for category in menu.get('categories', []):
         display_menu_items_cards(category.get('items', []), category['name'])
@@ -648,28 +702,40 @@ Here are the commands you can use:
 - 'vegetarian', 'vegan', 'gluten-free' - View dietary options
 - 'appetizers', 'main courses', 'desserts' - View specific categories
 - 'search [query]' - Search for dishes (e.g., 'search salmon')
+- 'recommend [dish or diet]' - Dishes other guests pre-ordered (e.g., 'recommend salmon', 'recommend vegan')
 - 'reserve' - Make a reservation directly in the chat
 - 'add dishes' - Add dishes to an existing reservation
+- 'my reservations' - Look up your reservations by phone or email
 - 'cancel' - Cancel the current reservation process
 - 'help' - Show all commands
 
 When making a reservation, you can provide all information at once like this:
-"Name: John Doe, Contact: john@example.com, Date: 2023-07-15, Time: 19:00, Party: 4"
+"Book a table for Sam Lee, sam@example.com, tomorrow at 7pm, party of 4"
 
-Or follow the step-by-step process when prompted.
+Anything you leave out, I'll ask for.
             """
-            st.session_state.messages.append({"role": "assistant", "content": help_message})
+            chat_session.append("assistant", help_message)
             st.rerun()
 
+    # Older messages are collapsed into pre-rendered pages; only the recent window is rendered live
+    history_pages = chat_session.history_pages(config.CHAT_WINDOW)
+    if history_pages:
+        with st.expander(f"Earlier messages ({len(history_pages) * chat_session.page_size})"):
+            page = history_pages[-1]
+            if len(history_pages) > 1:
+                page = st.select_slider("Page", options=list(history_pages), value=page,
+                                        format_func=lambda p: p - history_pages[0] + 1)
+            st.markdown(chat_session.render_page(page))
+
     # Display chat messages
-    for message in st.session_state.messages:
-        with st.chat_message(message["role"]):
-            st.markdown(message["content"])
+    for message in chat_session.live_messages(config.CHAT_WINDOW):
+        with st.chat_message(message.role):
+            st.markdown(message.content)
 
     # Chat input
     if prompt := st.chat_input("Type your message here..."):
         # Add user message to chat history
-        st.session_state.messages.append({"role": "user", "content": prompt})
+        chat_session.append("user", prompt)
 
         # Display user message
         with st.chat_message("user"):
@@ -682,45 +748,97 @@ Or follow the step-by-step process when prompted.
                 response, action = process_message(prompt)
 
                 # Add assistant response to chat history
-                st.session_state.messages.append({"role": "assistant", "content": response})
+                chat_session.append("assistant", response)
 
                 # Display assistant response
                 st.markdown(response)
 
         # Handle special actions
         if action == "add_dishes":
-            # Store the last message for reference (should be the reservation ID)
-            if len(st.session_state.messages) >= 2:
-                last_user_message = st.session_state.messages[-2]["content"]
-                # Try to find a reservation with this ID
-                try:
-                    reservation_id = last_user_message.strip()
-                    reservation = reservation_service.get_reservation(reservation_id)
-                    if reservation:
-                        # Store the reservation ID in session state
-                        st.session_state.current_reservation_id = reservation_id
-                        # Switch to the Make Reservation page
-                        st.session_state.current_page = "Make Reservation"
-                        st.rerun()
-                    else:
-                        # Add error message to chat
-                        st.session_state.messages.append({
-                            "role": "assistant",
-                            "content": f"I couldn't find a reservation with ID: {reservation_id}. Please check the ID and try again."
-                        })
-                        with st.chat_message("assistant"):
-                            st.markdown(f"I couldn't find a reservation with ID: {reservation_id}. Please check the ID and try again.")
-                except Exception:
-                    # Add error message to chat
-                    st.session_state.messages.append({
-                        "role": "assistant",
-                        "content": "Invalid reservation ID. Please provide a valid reservation ID."
-                    })
-                    with st.chat_message("assistant"):
-                        st.markdown("Invalid reservation ID. Please provide a valid reservation ID.")
+            # Switch to the Make Reservation page for the selected reservation
+            st.session_state.current_page = "Make Reservation"
+            st.rerun()
+
+def select_dishes(selected_ids):
+    """Display available menu items as checkboxes grouped by category and return the checked IDs."""
+    available_items = menu_service.get_available_items()
+
+    # Group items by category
+    items_by_category = {}
+    for item in available_items:
+        category = item.get("category", "Other")
+        if category not in items_by_category:
+            items_by_category[category] = []
+        items_by_category[category].append(item)
+
+    # Display items by category with checkboxes
+    selected_dishes = []
+    for category, items in items_by_category.items():
+        st.markdown(f"<p style='font-weight: bold; color: #2C3E50; margin-bottom: 5px;'>{category}</p>", unsafe_allow_html=True)
+        cols = st.columns(3)
+        for i, item in enumerate(items):
+            with cols[i % 3]:
+                if st.checkbox(f"{item['name']} (${item['price']:.2f})", value=item['id'] in selected_ids):
+                    selected_dishes.append(item['id'])
+
+    return selected_dishes
+
+def display_add_dishes_form(reservation_id):
+    """Display the form for changing the dishes pre-ordered on an existing reservation."""
+    reservation = reservation_service.get_reservation(reservation_id)
+
+    st.markdown(f"""
+    <div style="text-align: center; margin-bottom: 30px;">
+        <h1 style="color: #2C3E50; font-family: 'Georgia', serif;">Add Dishes</h1>
+        <p style="color: #7F8C8D; font-style: italic; font-size: 1.2rem;">
+            Reservation {reservation_id}
+        </p>
+        <div style="height: 3px; width: 100px; background: linear-gradient(to right, #E74C3C, #3498DB); margin: 10px auto;"></div>
+    </div>
+    """, unsafe_allow_html=True)
+
+    if not reservation:
+        st.error(f"I couldn't find a reservation with ID: {reservation_id}.")
+        st.session_state.current_reservation_id = None
+        return
+
+    st.info(f"""
+    📅 **Your Reservation:** {reservation['party_size']} people on {reservation['date']} at {reservation['time']}
+    - Check the dishes you'd like to pre-order and uncheck any you no longer want
+    """)
+
+    with st.form("add_dishes_form"):
+        display_dish_recommendations(reservation["dish_ids"])
+        selected_dishes = select_dishes(reservation["dish_ids"])
+
+        _, center_col, _ = st.columns([1, 2, 1])
+        with center_col:
+            submitted = st.form_submit_button("Update Dishes")
+
+        if submitted:
+            # Apply all changes in a single batch
+            try:
+                reservation = reservation_service.replace_reservation_dishes(reservation_id, selected_dishes)
+            except DishValidationError as e:
+                st.error("Some of the selected dishes can't be pre-ordered: " + "; ".join(e.errors))
+                return
+
+            dish_names = dish_validator.resolve_names(reservation["dish_ids"])
+            dishes_text = ", ".join(dish_names) if dish_names else "no dishes"
+            st.success(f"Reservation {reservation_id} now includes {dishes_text}.")
+            chat_session.append("assistant", f"Your reservation {reservation_id} has been updated with {dishes_text}.")
+
+    if st.button("Make a new reservation instead", key="new_reservation_btn"):
+        st.session_state.current_reservation_id = None
+        st.rerun()
 
 def display_reservation_form():
     """Display the reservation form."""
+    # Changing dishes on an existing reservation (from the chat "add dishes" flow)
+    if st.session_state.get("current_reservation_id"):
+        display_add_dishes_form(st.session_state.current_reservation_id)
+        return
+
     # Enhanced header with styling
     st.markdown("""
     <div style="text-align: center; margin-bottom: 30px;">
@@ -772,25 +890,8 @@ def display_reservation_form():
             <p style="color: #7F8C8D; font-size: 0.9rem;">Check the dishes you'd like to pre-order with your reservation.</p>
             """, unsafe_allow_html=True)
 
-            available_items = menu_service.get_available_items()
-
-            # Group items by category
-            items_by_category = {}
-            for item in available_items:
-                category = item.get("category", "Other")
-                if category not in items_by_category:
-                    items_by_category[category] = []
-                items_by_category[category].append(item)
-
-            # Display items by category with checkboxes
-            selected_dishes = []
-            for category, items in items_by_category.items():
-                st.markdown(f"<p style='font-weight: bold; color: #2C3E50; margin-bottom: 5px;'>{category}</p>", unsafe_allow_html=True)
-                cols = st.columns(3)
-                for i, item in enumerate(items):
-                    with cols[i % 3]:
-                        if st.checkbox(f"{item['name']} (${item['price']:.2f})", value=item['id'] in st.session_state.reservation_data["dish_ids"]):
-                            selected_dishes.append(item['id'])
+            display_dish_recommendations(st.session_state.reservation_data["dish_ids"])
+            selected_dishes = select_dishes(st.session_state.reservation_data["dish_ids"])
 
             # Divider
             st.markdown('<div style="height: 2px; background: linear-gradient(to right, #E5E7E9, #F8F9F9, #E5E7E9); margin: 20px 0;"></div>', unsafe_allow_html=True)
@@ -812,18 +913,25 @@ def display_reservation_form():
                 }
 
                 # Validate form
+                problem = validate_booking(st.session_state.reservation_data)
                 if not customer_name or not contact_info:
                     st.error("Please provide your name and contact information.")
+                elif problem:
+                    st.error(f"Sorry, {problem[1]}.")
                 else:
                     # Create reservation
-                    reservation = reservation_service.create_reservation(
-                        customer_name=customer_name,
-                        contact_info=contact_info,
-                        date=date.strftime("%Y-%m-%d"),
-                        time=time.strftime("%H:%M"),
-                        party_size=party_size,
-                        dish_ids=selected_dishes
-                    )
+                    try:
+                        reservation = reservation_service.create_reservation(
+                            customer_name=customer_name,
+                            contact_info=contact_info,
+                            date=date.strftime("%Y-%m-%d"),
+                            time=time.strftime("%H:%M"),
+                            party_size=party_size,
+                            dish_ids=selected_dishes
+                        )
+                    except DishValidationError as e:
+                        st.error("Some of the selected dishes can't be pre-ordered: " + "; ".join(e.errors))
+                        return
 
                     # Show success message with styling
                     st.success(f"Reservation confirmed! Your reservation ID is {reservation['id']}.")
@@ -843,11 +951,7 @@ def display_reservation_form():
                     # Add message to chat history
                     dishes_text = ""
                     if selected_dishes:
-                        dish_names = []
-                        for dish_id in selected_dishes:
-                            dish = menu_service.get_item_by_id(dish_id)
-                            if dish:
-                                dish_names.append(dish['name'])
+                        dish_names = dish_validator.resolve_names(selected_dishes)
                         dishes_text = f" with the following dishes: {', '.join(dish_names)}"
 
                         # Display selected dishes
@@ -861,7 +965,7 @@ def display_reservation_form():
                         """, unsafe_allow_html=True)
 
                     reservation_message = f"Your reservation has been confirmed for {party_size} people on {date.strftime('%Y-%m-%d')} at {time.strftime('%H:%M')}{dishes_text}. Your reservation ID is {reservation['id']}."
-                    st.session_state.messages.append({"role": "assistant", "content": reservation_message})
+                    chat_session.append("assistant", reservation_message)
 
 # Main content based on selected page
 if st.session_state.current_page == "Chat":
@@ -0,0 +1,189 @@
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Callable
+
+from menu_service import MenuService
+from reservation_service import ReservationService
+
+# Tenant and menu names map to directory and file names, so keep them plain
+_NAME_PATTERN = re.compile(r"^[A-Za-z0-9_-]+$")
+
+
+def _check_name(kind: str, name: str) -> str:
+    """Reject names that could escape the tenants directory."""
+    if not isinstance(name, str) or not _NAME_PATTERN.match(name):
+        raise ValueError(f"Invalid {kind} '{name}'")
+    return name
+
+
+def _file_size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+class _LoadedTenant:
+    """Services loaded for one tenant, plus the bytes they were loaded from."""
+
+    def __init__(self, tenant_id: str):
+        self.tenant_id = tenant_id
+        self.menus: Dict[str, MenuService] = {}
+        self.reservation_service: Optional[ReservationService] = None
+        self.size_bytes = 0
+
+
+class TenantRegistry:
+    """Per-location MenuService and ReservationService factory with an LRU cache.
+
+    Each tenant (location) has its own directory::
+
+        <tenants_dir>/<tenant_id>/menus/<menu_name>.json
+        <tenants_dir>/<tenant_id>/reservations.json
+
+    Services are loaded on first access and kept in least-recently-used
+    order. When more than ``max_tenants`` tenants are loaded, or the data
+    they were loaded from exceeds ``max_bytes``, the least recently used
+    tenants are evicted; their reservation services are closed first so
+    pending writes are flushed. Extra keyword arguments are passed to every
+    ReservationService (e.g. ``write_behind=True``).
+
+    ``menu_factory`` builds a menu service from a menu file path (e.g.
+    ScheduledMenuService). ``reservation_factory``, if given, is called as
+    ``reservation_factory(tenant_id, path, archive_dir)`` instead of creating
+    a ReservationService, e.g. to share the file between processes; what it
+    returns must have a ``close`` method.
+    """
+
+    def __init__(self,
+                 tenants_dir: str = "tenants",
+                 max_tenants: int = 8,
+                 max_bytes: Optional[int] = None,
+                 archive: bool = False,
+                 menu_factory: Callable[[str], MenuService] = MenuService,
+                 reservation_factory: Optional[Callable[[str, str, Optional[str]], Any]] = None,
+                 **reservation_options: Any):
+        self.tenants_dir = tenants_dir
+        self.max_tenants = max_tenants
+        self.max_bytes = max_bytes
+        self.archive = archive
+        self.menu_factory = menu_factory
+        self.reservation_factory = reservation_factory
+        self.reservation_options = reservation_options
+        self._loaded: "OrderedDict[str, _LoadedTenant]" = OrderedDict()
+        self._lock = threading.RLock()
+
+    def _tenant_dir(self, tenant_id: str) -> str:
+        return os.path.join(self.tenants_dir, _check_name("tenant ID", tenant_id))
+
+    def tenant_ids(self) -> List[str]:
+        """Get the IDs of all tenants on disk (loaded or not)."""
+        if not os.path.isdir(self.tenants_dir):
+            return []
+        return sorted(name for name in os.listdir(self.tenants_dir)
+                      if _NAME_PATTERN.match(name) and os.path.isdir(os.path.join(self.tenants_dir, name)))
+
+    def menu_names(self, tenant_id: str) -> List[str]:
+        """Get the names of a tenant's menus (e.g. lunch, dinner)."""
+        menus_dir = os.path.join(self._tenant_dir(tenant_id), "menus")
+        if not os.path.isdir(menus_dir):
+            return []
+        return sorted(name[:-len(".json")] for name in os.listdir(menus_dir)
+                      if name.endswith(".json") and _NAME_PATTERN.match(name[:-len(".json")]))
+
+    def _get_tenant(self, tenant_id: str) -> _LoadedTenant:
+        """Get a tenant's cache entry, marking it most recently used."""
+        tenant = self._loaded.get(tenant_id)
+        if tenant is None:
+            if not os.path.isdir(self._tenant_dir(tenant_id)):
+                raise KeyError(f"Unknown tenant '{tenant_id}'")
+            tenant = _LoadedTenant(tenant_id)
+            self._loaded[tenant_id] = tenant
+        else:
+            self._loaded.move_to_end(tenant_id)
+        return tenant
+
+    def get_menu_service(self, tenant_id: str, menu_name: Optional[str] = None) -> MenuService:
+        """Get the MenuService for one of a tenant's menus, loading it if needed.
+
+        Without a menu name the tenant's "default" menu is used, or its first
+        menu if there is no menu called "default".
+        """
+        with self._lock:
+            tenant = self._get_tenant(tenant_id)
+            if menu_name is None:
+                names = self.menu_names(tenant_id)
+                if not names:
+                    raise KeyError(f"Tenant '{tenant_id}' has no menus")
+                menu_name = "default" if "default" in names else names[0]
+
+            menu_service = tenant.menus.get(_check_name("menu name", menu_name))
+            if menu_service is None:
+                path = os.path.join(self._tenant_dir(tenant_id), "menus", f"{menu_name}.json")
+                if not os.path.exists(path):
+                    raise KeyError(f"Tenant '{tenant_id}' has no menu '{menu_name}'")
+                menu_service = self.menu_factory(path)
+                tenant.menus[menu_name] = menu_service
+                tenant.size_bytes += _file_size(path)
+                self._evict_over_limit()
+            return menu_service
+
+    def get_reservation_service(self, tenant_id: str) -> ReservationService:
+        """Get a tenant's ReservationService (or reservation_factory result), loading it if needed."""
+        with self._lock:
+            tenant = self._get_tenant(tenant_id)
+            if tenant.reservation_service is None:
+                tenant_dir = self._tenant_dir(tenant_id)
+                path = os.path.join(tenant_dir, "reservations.json")
+                archive_dir = os.path.join(tenant_dir, "archive") if self.archive else None
+                if self.reservation_factory is not None:
+                    tenant.reservation_service = self.reservation_factory(tenant_id, path, archive_dir)
+                else:
+                    tenant.reservation_service = ReservationService(
+                        path, archive_dir=archive_dir, **self.reservation_options)
+                tenant.size_bytes += _file_size(path)
+                self._evict_over_limit()
+            return tenant.reservation_service
+
+    def loaded_tenants(self) -> List[str]:
+        """Get the IDs of loaded tenants, least recently used first."""
+        with self._lock:
+            return list(self._loaded)
+
+    def loaded_bytes(self) -> int:
+        """Get the total size of the data files behind the loaded services."""
+        with self._lock:
+            return sum(tenant.size_bytes for tenant in self._loaded.values())
+
+    def _over_limit(self) -> bool:
+        if len(self._loaded) > self.max_tenants:
+            return True
+        return self.max_bytes is not None and self.loaded_bytes() > self.max_bytes
+
+    def _evict_over_limit(self) -> None:
+        """Evict least recently used tenants, always keeping the most recent one."""
+        while len(self._loaded) > 1 and self._over_limit():
+            self.evict(next(iter(self._loaded)))
+
+    def evict(self, tenant_id: str) -> bool:
+        """Unload a tenant, flushing its reservations. Returns True if it was loaded."""
+        with self._lock:
+            tenant = self._loaded.pop(tenant_id, None)
+            if tenant is None:
+                return False
+            if tenant.reservation_service is not None:
+                tenant.reservation_service.close()
+            for menu_service in tenant.menus.values():
+                # Scheduled menus run a timer
+                close = getattr(menu_service, "close", None)
+                if close is not None:
+                    close()
+            return True
+
+    def close(self) -> None:
+        """Unload every tenant."""
+        with self._lock:
+            for tenant_id in list(self._loaded):
+                self.evict(tenant_id)
@@ -0,0 +1,83 @@
+import threading
+
+import pytest
+
+from reservation_service import ReservationService, normalize_contact
+
+WRITERS = 8
+READERS = 8
+BOOKINGS_PER_WRITER = 50
+
+
+def _check_state(state):
+    """Assert that one published state is internally consistent."""
+    assert len(state.id_index) == len(state.reservations)
+    for reservation_id, position in state.id_index.items():
+        assert state.reservations[position].id == reservation_id
+    for key, reservation_ids in state.contact_index.items():
+        for reservation_id in reservation_ids:
+            reservation = state.reservations[state.id_index[reservation_id]]
+            assert normalize_contact(reservation.contact_info) == key
+
+
+@pytest.mark.parametrize("write_behind", [False, True])
+def test_concurrent_writers_and_readers(tmp_path, write_behind):
+    path = tmp_path / "reservations.json"
+    service = ReservationService(str(path), thread_safe=True, write_behind=write_behind, flush_interval_ms=10)
+    stop = threading.Event()
+    errors = []
+    created = [[] for _ in range(WRITERS)]
+
+    def write(writer):
+        try:
+            for number in range(BOOKINGS_PER_WRITER):
+                reservation = service.create_reservation(
+                    customer_name=f"Guest {writer}-{number}",
+                    contact_info=f"guest{writer}@example.com",
+                    date="2030-01-01",
+                    time=f"{17 + number % 5:02d}:00",
+                    party_size=1 + number % 6,
+                    idempotency_key=f"{writer}-{number}")
+                created[writer].append(reservation.id)
+                if number % 3 == 0:
+                    service.update_reservation(reservation.id, {"party_size": 2})
+                if number % 5 == 0:
+                    service.cancel_reservation(reservation.id)
+                if number % 7 == 0:
+                    service.update_reservation(reservation.id, {"contact_info": f"moved{writer}@example.com"})
+        except Exception as e:
+            errors.append(e)
+
+    def read():
+        try:
+            while not stop.is_set():
+                _check_state(service._state)
+                for reservation in service.get_reservations_by_contact("guest0@example.com"):
+                    assert reservation.contact_info == "guest0@example.com"
+                covers = service.get_covers_by_slot("2030-01-01")
+                assert all(count > 0 for count in covers.values())
+                stop.wait(0.001)
+        except Exception as e:
+            errors.append(e)
+
+    readers = [threading.Thread(target=read) for _ in range(READERS)]
+    writers = [threading.Thread(target=write, args=(writer,)) for writer in range(WRITERS)]
+    for thread in readers + writers:
+        thread.start()
+    for thread in writers:
+        thread.join()
+    stop.set()
+    for thread in readers:
+        thread.join()
+    service.close()
+
+    assert errors == []
+    all_ids = [reservation_id for ids in created for reservation_id in ids]
+    assert len(all_ids) == len(set(all_ids)) == WRITERS * BOOKINGS_PER_WRITER
+    _check_state(service._state)
+
+    # Everything written is in the file, including the last updates
+    reloaded = ReservationService(str(path))
+    assert sorted(r.id for r in reloaded.reservations) == sorted(all_ids)
+    for reservation in reloaded.reservations:
+        assert reservation == service.get_reservation(reservation.id)
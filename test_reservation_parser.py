@@ -0,0 +1,44 @@
+from datetime import datetime
+
+import pytest
+
+from reservation_parser import parse_reservation, merge_booking_answer, missing_fields
+
+NOW = datetime(2030, 1, 7, 12, 0)
+
+
+@pytest.mark.parametrize("message", [
+    "Book dinner for 2 at 7:30 tomorrow, Sam Lee, 555-123-4567",
+    "Book dinner for 2 at 7 tomorrow, Sam Lee, 555-123-4567",
+])
+def test_hours_without_am_pm_mean_the_evening(message):
+    details = parse_reservation(message, now=NOW)
+    assert details["time"] == ("19:30" if "7:30" in message else "19:00")
+    assert details["date"] == "2030-01-08"
+    assert details["party_size"] == 2
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("at 7:30am", "07:30"),
+    ("at 09:30", "09:30"),
+    ("at 11:15", "11:15"),
+    ("at 19:45", "19:45"),
+    ("at 7pm", "19:00"),
+])
+def test_explicit_times_are_kept(text, expected):
+    assert parse_reservation(f"book a table {text}", now=NOW)["time"] == expected
+
+
+def test_bare_answer_fills_the_expected_field():
+    assert parse_reservation("7", expecting="time", now=NOW) == {"time": "19:00"}
+    assert parse_reservation("15", expecting="date", now=NOW) == {"date": "2030-01-15"}
+    assert parse_reservation("7", now=NOW) == {"party_size": 7}
+
+
+def test_follow_up_answer_completes_a_pending_booking():
+    details = parse_reservation("book a table for 4 tomorrow at 7pm", now=NOW)
+    assert missing_fields(details) == ["customer_name", "contact_info"]
+    merge_booking_answer(details, "Sam Lee, 555-123-4567", expecting="customer_name", now=NOW)
+    assert details["customer_name"] == "Sam Lee"
+    assert details["contact_info"] == "555-123-4567"
+    assert (details["date"], details["time"], details["party_size"]) == ("2030-01-08", "19:00", 4)
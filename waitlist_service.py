@@ -0,0 +1,284 @@
+import heapq
+import os
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Callable, Tuple
+
+import config
+import serialization
+from reservation_record import ReservationRecord, encode_time
+from reservation_service import ReservationService, validate_reservation
+
+
+class WaitlistService:
+    """Waitlist for full time slots, promoting guests when seats free up.
+
+    Each slot (date and SLOT_MINUTES-aligned time) has one min-heap per party
+    size, ordered by join sequence. When a reservation in a slot is
+    cancelled or moved, the largest waiting party that fits the free seats is
+    booked through the ReservationService (earliest joiner first among equal
+    sizes): a scan over party sizes plus an O(log n) heap pop. Booked covers
+    per slot are kept current from the service's change events, so checking
+    free seats never scans the reservations. Guests who leave are marked and
+    skipped lazily when they reach the top of a heap. Waitlist entries are
+    saved to their own JSON file.
+    """
+
+    def __init__(self,
+                 reservation_service: ReservationService,
+                 waitlist_file_path: str = "waitlist.json",
+                 slot_capacity: int = config.SLOT_CAPACITY,
+                 slot_minutes: int = config.SLOT_MINUTES):
+        self.reservation_service = reservation_service
+        self.waitlist_file_path = waitlist_file_path
+        self.slot_capacity = slot_capacity
+        self.slot_minutes = slot_minutes
+
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        # (date, slot) -> party size -> heap of (join sequence, entry ID)
+        self._heaps: Dict[Tuple[str, str], Dict[int, List[Tuple[int, str]]]] = {}
+        self._next_sequence = 1
+        self._listeners: List[Callable[[str, Dict[str, Any]], None]] = []
+        # Promotions run inside the reservation service's writes, so share its
+        # lock rather than taking a second one in the opposite order
+        self._lock = reservation_service.write_lock
+
+        # (date, slot) -> guests booked, and reservation ID -> the (slot,
+        # guests) it is counted in, updated from reservation changes
+        self._covers: Dict[Tuple[str, str], int] = {}
+        self._counted: Dict[str, Tuple[Tuple[str, str], int]] = {}
+
+        for entry in self._load_entries():
+            self.entries[entry["id"]] = entry
+            self._next_sequence = max(self._next_sequence, entry["sequence"] + 1)
+            if entry["status"] == "waiting":
+                self._push(entry)
+
+        with self._lock:
+            for reservation in reservation_service.reservations:
+                self._count(reservation)
+            reservation_service.add_listener(self._on_reservation_change)
+
+    def _load_entries(self) -> List[Dict[str, Any]]:
+        """Load waitlist entries from a JSON file."""
+        if not os.path.exists(self.waitlist_file_path):
+            return []
+        try:
+            return serialization.load_file(self.waitlist_file_path)
+        except Exception as e:
+            print(f"Error loading waitlist: {e}")
+            return []
+
+    def _save_entries(self) -> None:
+        """Save waitlist entries to a JSON file."""
+        temp_path = f"{self.waitlist_file_path}.tmp"
+        try:
+            with open(temp_path, 'wb') as file:
+                file.write(serialization.dumps(list(self.entries.values())))
+            os.replace(temp_path, self.waitlist_file_path)
+        except Exception as e:
+            print(f"Error saving waitlist: {e}")
+
+    def close(self) -> None:
+        """Stop following reservation changes."""
+        self.reservation_service.remove_listener(self._on_reservation_change)
+
+    def add_listener(self, listener: Callable[[str, Dict[str, Any]], None]) -> None:
+        """Register a callback for waitlist changes.
+
+        The listener is called as ``listener(event, entry)`` where event is
+        one of "joined", "left" or "promoted". Promoted entries carry the
+        ``reservation_id`` they were booked as.
+        """
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[str, Dict[str, Any]], None]) -> None:
+        """Unregister a change callback."""
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _notify(self, event: str, entry: Dict[str, Any]) -> None:
+        """Notify listeners of a change."""
+        for listener in self._listeners:
+            try:
+                listener(event, dict(entry))
+            except Exception as e:
+                print(f"Error in waitlist listener: {e}")
+
+    def _slot_key(self, date: str, time: str) -> Tuple[str, str]:
+        """Get the (date, slot start) key a booking time falls into."""
+        minutes = encode_time(time)
+        start = minutes - minutes % self.slot_minutes
+        return date, f"{start // 60:02d}:{start % 60:02d}"
+
+    def _push(self, entry: Dict[str, Any]) -> None:
+        """Queue a waiting entry in its slot's heap for its party size."""
+        heaps = self._heaps.setdefault(self._slot_key(entry["date"], entry["time"]), {})
+        heapq.heappush(heaps.setdefault(entry["party_size"], []), (entry["sequence"], entry["id"]))
+
+    def _uncount(self, reservation_id: str) -> Optional[Tuple[Tuple[str, str], int]]:
+        """Stop counting a reservation's guests. Returns the (slot, guests) it had."""
+        counted = self._counted.pop(reservation_id, None)
+        if counted is not None:
+            key, party_size = counted
+            self._covers[key] -= party_size
+            if self._covers[key] <= 0:
+                del self._covers[key]
+        return counted
+
+    def _count(self, reservation: ReservationRecord) -> Optional[Tuple[Tuple[str, str], int]]:
+        """Count a reservation's guests in its current slot. Returns what it was counted as before."""
+        previous = self._uncount(reservation.id)
+        if reservation.status != "cancelled" and isinstance(reservation.time_minutes, int):
+            key = self._slot_key(reservation["date"], reservation["time"])
+            self._covers[key] = self._covers.get(key, 0) + reservation.party_size
+            self._counted[reservation.id] = (key, reservation.party_size)
+        return previous
+
+    def free_seats(self, date: str, time: str) -> int:
+        """Get the number of unbooked seats in the slot a time falls into."""
+        return max(0, self.slot_capacity - self._covers.get(self._slot_key(date, time), 0))
+
+    def join(self,
+             customer_name: str,
+             contact_info: str,
+             date: str,
+             time: str,
+             party_size: int) -> Dict[str, Any]:
+        """Add a party to the waitlist for a slot.
+
+        If the slot already has room the party is booked straight away, so
+        check the returned entry's status ("waiting" or "promoted"). Raises
+        ValueError for invalid details or a party larger than a whole slot.
+        """
+        error = validate_reservation({"customer_name": customer_name, "contact_info": contact_info,
+                                       "date": date, "time": time, "party_size": party_size})
+        if error:
+            raise ValueError(error)
+        if int(party_size) > self.slot_capacity:
+            raise ValueError(f"party size must be at most {self.slot_capacity}")
+
+        with self._lock:
+            entry = self._add_entry(customer_name, contact_info, date, time, int(party_size))
+            self.promote(date, time)
+            return dict(entry)
+
+    def _add_entry(self, customer_name: str, contact_info: str, date: str, time: str,
+                   party_size: int) -> Dict[str, Any]:
+        """Record a new waiting party and queue it for its slot."""
+        entry = {
+            "id": f"WL{self._next_sequence:04d}",
+            "customer_name": customer_name,
+            "contact_info": contact_info,
+            "date": date,
+            "time": time,
+            "party_size": party_size,
+            "sequence": self._next_sequence,
+            "joined_at": datetime.now().isoformat(),
+            "status": "waiting",
+            "reservation_id": None,
+        }
+        self._next_sequence += 1
+        self.entries[entry["id"]] = entry
+        self._push(entry)
+        self._save_entries()
+        self._notify("joined", entry)
+        return entry
+
+    def leave(self, entry_id: str) -> bool:
+        """Take a party off the waitlist. Returns False if it wasn't waiting."""
+        with self._lock:
+            entry = self.entries.get(entry_id)
+            if not entry or entry["status"] != "waiting":
+                return False
+            # The heap entry is skipped when it comes up
+            entry["status"] = "left"
+            self._save_entries()
+            self._notify("left", entry)
+        return True
+
+    def get_entry(self, entry_id: str) -> Optional[Dict[str, Any]]:
+        """Get a waitlist entry by ID."""
+        entry = self.entries.get(entry_id)
+        return dict(entry) if entry else None
+
+    def position(self, entry_id: str) -> Optional[int]:
+        """Get a waiting party's place in its slot's queue (1 = joined first), or None."""
+        entry = self.entries.get(entry_id)
+        if not entry or entry["status"] != "waiting":
+            return None
+        heaps = self._heaps.get(self._slot_key(entry["date"], entry["time"]), {})
+        ahead = sum(1 for heap in heaps.values() for sequence, other_id in heap
+                    if sequence < entry["sequence"] and self.entries[other_id]["status"] == "waiting")
+        return ahead + 1
+
+    def get_waiting(self, date: str, time: str) -> List[Dict[str, Any]]:
+        """Get the parties waiting for a slot, in join order."""
+        heaps = self._heaps.get(self._slot_key(date, time), {})
+        waiting = [self.entries[entry_id] for heap in heaps.values() for _, entry_id in heap
+                   if self.entries[entry_id]["status"] == "waiting"]
+        return [dict(entry) for entry in sorted(waiting, key=lambda entry: entry["sequence"])]
+
+    def _pop_best_fit(self, key: Tuple[str, str], free: int) -> Optional[Dict[str, Any]]:
+        """Remove and return the largest waiting party of at most ``free`` guests, earliest first."""
+        heaps = self._heaps.get(key)
+        if not heaps:
+            return None
+        for party_size in sorted((size for size in heaps if size <= free), reverse=True):
+            heap = heaps[party_size]
+            while heap:
+                _, entry_id = heapq.heappop(heap)
+                if self.entries[entry_id]["status"] == "waiting":
+                    if not heap:
+                        del heaps[party_size]
+                    return self.entries[entry_id]
+            del heaps[party_size]
+        return None
+
+    def promote(self, date: str, time: str) -> List[Dict[str, Any]]:
+        """Book waiting parties into a slot while they fit. Returns the promoted entries."""
+        with self._lock:
+            key = self._slot_key(date, time)
+            promoted = []
+            while True:
+                entry = self._pop_best_fit(key, self.free_seats(date, time))
+                if entry is None:
+                    break
+                try:
+                    reservation = self.reservation_service.create_reservation(
+                        customer_name=entry["customer_name"],
+                        contact_info=entry["contact_info"],
+                        date=entry["date"],
+                        time=entry["time"],
+                        party_size=entry["party_size"])
+                except Exception as e:
+                    print(f"Error promoting waitlist entry {entry['id']}: {e}")
+                    self._push(entry)
+                    break
+                entry["status"] = "promoted"
+                entry["reservation_id"] = reservation.id
+                promoted.append(entry)
+
+            if promoted:
+                self._save_entries()
+                for entry in promoted:
+                    self._notify("promoted", entry)
+        return [dict(entry) for entry in promoted]
+
+    def _on_reservation_change(self, event: str, reservation: ReservationRecord) -> None:
+        """Keep slot covers current and offer seats freed by a change to the waitlist."""
+        if event == "archived":
+            # Past or already cancelled, so no seats anyone could still book
+            self._uncount(reservation.id)
+            return
+
+        previous = self._count(reservation)
+        if previous is None:
+            return
+        key, party_size = previous
+        current = self._counted.get(reservation.id)
+        if (current is not None and current[0] == key and current[1] >= party_size) or not self._heaps.get(key):
+            return
+        # Book once every listener has seen this change, so none of them
+        # sees the promoted booking before the cancellation that freed it
+        date, slot = key
+        self.reservation_service.after_dispatch(lambda: self.promote(date, slot))